@@ -0,0 +1,526 @@
+"""
+Benchmarks do EndpointTester contra o servidor local de stub_server.py.
+
+    python bench.py transport --requests 200
+    python bench.py load --duration 5 --max-processes 4
+    python bench.py startup --runs 10
+    python bench.py hedge --requests 500 --slow-fraction 0.05 --slow-latency 0.2
+    python bench.py send --requests 100 --size 65536 --chunk-size 8192
+    python bench.py format
+    python bench.py store --sizes 100 1000 10000
+    python bench.py suite --save-baseline
+
+Resultados sao impressos e anexados (uma linha JSON por execucao) em bench_output.txt, junto com a
+variacao (%) de cada metrica em relacao a bench_baseline.json, gravado com --save-baseline.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from curlbatch import batch_supported, run_batch
+from endpoints import EndpointStore
+from formatting import _format_uncached, format_response_text
+from loadtest import DEFAULT_PROCESSES, LoadTest, MultiProcessLoadTest
+from resilience import HEDGE_MIN_SAMPLES, LatencyTracker, ResilientTransport
+from stub_server import start_server, start_server_processes
+from timing import render_waterfall
+from transport import TRANSPORTS, RequestControl, StreamBuffer, create_transport, get_transport
+
+BENCH_DIR = Path(__file__).resolve().parent
+BENCH_OUTPUT = BENCH_DIR / "bench_output.txt"
+BENCH_BASELINE = BENCH_DIR / "bench_baseline.json"
+FORMAT_SIZES = (1024, 64 * 1024, 1024 * 1024, 8 * 1024 * 1024)
+STORE_SIZES = (100, 1000, 10000)
+REGRESSION_PCT = 10.0  # variacao (para pior) acima disso e marcada na comparacao
+LOWER_IS_BETTER = ("_ms", "_pct")
+HIGHER_IS_BETTER = ("throughput", "_mb_s", "_per_s")
+
+
+def bench_transport(requests: int, size: int) -> dict:
+    """
+    Latencia por requisicao de cada transporte contra o mesmo servidor local.
+    "curl --parallel" envia as mesmas requisicoes em sequencia num unico processo (mean_ms = tempo total / n).
+    """
+    server = start_server(size=size)
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+    payload = {"name": "bench", "url": url, "method": "GET", "headers": {}, "body": ""}
+    results = {}
+    try:
+        for name in TRANSPORTS:
+            transport = get_transport(name)
+            transport.execute(payload, RequestControl(10))  # aquece (conexao/pool)
+            samples = []
+            for _ in range(requests):
+                start = time.perf_counter()
+                _, _, exit_code = transport.execute(payload, RequestControl(10))
+                samples.append(time.perf_counter() - start)
+                if exit_code != 0:
+                    raise RuntimeError(f"{name} retornou codigo {exit_code}")
+            samples.sort()
+            results[name] = _latency_summary(samples, statistics.fmean(samples))
+        if batch_supported():
+            samples = []
+            start = time.perf_counter()
+            run_batch(
+                [payload] * requests, 1, 10, None, lambda index, output, code, timing: samples.append(timing["time_total"])
+            )
+            elapsed = time.perf_counter() - start
+            if len(samples) != requests:
+                raise RuntimeError("curl --parallel nao devolveu todas as respostas")
+            samples.sort()
+            results["curl --parallel"] = _latency_summary(samples, elapsed / requests)
+    finally:
+        server.shutdown()
+    return results
+
+
+def _latency_summary(samples: list[float], mean: float) -> dict:
+    return {
+        "requests": len(samples),
+        "mean_ms": mean * 1000,
+        "p50_ms": samples[len(samples) // 2] * 1000,
+        "p99_ms": samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000,
+    }
+
+
+def bench_load(duration: float, max_processes: int, workers_per_process: int) -> dict:
+    """
+    Vazao do gerador de carga com 1..max_processes processos contra um stub com varios processos.
+    """
+    port, server_procs = start_server_processes(max_processes)
+    url = f"http://127.0.0.1:{port}/"
+    payload = {"name": "bench", "url": url, "method": "GET", "headers": {}, "body": ""}
+    results = {}
+    try:
+        for processes in range(1, max_processes + 1):
+            test = LoadTest(payload, workers=workers_per_process * processes, duration=duration)
+            runner = MultiProcessLoadTest(test, processes=processes)
+            runner.start()
+            while runner.is_running():
+                time.sleep(0.2)
+            snap = runner.snapshot()
+            results[str(processes)] = {
+                "requests": snap["requests"],
+                "throughput": snap["throughput"],
+                "p99_ms": snap["p99_ms"],
+                "errors": snap["errors"],
+            }
+    finally:
+        for proc in server_procs:
+            proc.terminate()
+    return results
+
+
+def bench_startup(runs: int) -> dict:
+    """
+    Partida a frio da CLI (`endpoint_tester.py run`): tempo ate o servidor receber a requisicao e ate o fim.
+    """
+    server = start_server()
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = Path(tmp) / "endpoints.json"
+        data_file.write_text(json.dumps([{"name": "bench", "url": url, "method": "GET", "headers": {}, "body": ""}]))
+        try:
+            for name in TRANSPORTS:
+                first_byte, total = [], []
+                cmd = [sys.executable, str(BENCH_DIR / "endpoint_tester.py"), "--file", str(data_file)]
+                cmd += ["run", "bench", "--transport", name]
+                for _ in range(runs):
+                    server.last_request_at = None
+                    start = time.perf_counter()
+                    subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+                    total.append(time.perf_counter() - start)
+                    first_byte.append(server.last_request_at - start)
+                results[name] = {
+                    "runs": runs,
+                    "first_byte_ms": statistics.median(first_byte) * 1000,
+                    "total_ms": statistics.median(total) * 1000,
+                }
+        finally:
+            server.shutdown()
+    return results
+
+
+def bench_hedge(requests: int, slow_fraction: float, slow_latency: float) -> dict:
+    """
+    Cauda de latencia com e sem hedge contra um stub em que uma fracao das respostas e lenta.
+    Cada modo comeca com um historico proprio de latencias (aquecido com HEDGE_MIN_SAMPLES envios).
+    """
+    server = start_server(latency=0.002, slow_fraction=slow_fraction, slow_latency=slow_latency)
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+    results = {}
+    try:
+        for label, policy in (("sem hedge", None), ("hedge p95", {"retries": 0, "hedge": True})):
+            payload = {"name": "bench", "url": url, "method": "GET", "headers": {}, "body": ""}
+            if policy is not None:
+                payload["resilience"] = policy
+            transport = ResilientTransport(create_transport("http.client").inner, LatencyTracker())
+            for _ in range(HEDGE_MIN_SAMPLES):
+                transport.execute(payload, RequestControl(10))
+            samples, hedges = [], 0
+            for _ in range(requests):
+                control = RequestControl(10)
+                start = time.perf_counter()
+                _, _, exit_code = transport.execute(payload, control)
+                samples.append(time.perf_counter() - start)
+                if exit_code != 0:
+                    raise RuntimeError(f"{label}: codigo {exit_code}")
+                hedges += sum(1 for attempt in control.attempts or () if attempt["hedge"])
+            transport.close()
+            samples.sort()
+            results[label] = {
+                **_latency_summary(samples, statistics.fmean(samples)),
+                "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000,
+                "max_ms": samples[-1] * 1000,
+                "extra_requests_pct": hedges / requests * 100,
+            }
+    finally:
+        server.shutdown()
+    return results
+
+
+def bench_send(requests: int, size: int, chunk_size: int) -> dict:
+    """
+    Envio de ponta a ponta como na UI: transporte envolvido (ResilientTransport), resposta num StreamBuffer,
+    formatacao (com o cache de formatacao, como na tela) e waterfall.
+    """
+    server = start_server(size=size, chunk_size=chunk_size)
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+    payload = {"name": "bench", "url": url, "method": "GET", "headers": {}, "body": ""}
+    results = {}
+    try:
+        for name in TRANSPORTS:
+            transport = create_transport(name)
+            samples = []
+            for i in range(requests + 1):
+                control = RequestControl(10)
+                sink = StreamBuffer()
+                start = time.perf_counter()
+                _, trailer, exit_code = transport.execute(payload, control, sink)
+                sink.finish()
+                format_response_text((sink.text() or "") + trailer)
+                if control.timing:
+                    render_waterfall(control.timing)
+                elapsed = time.perf_counter() - start
+                sink.close()
+                if exit_code != 0:
+                    raise RuntimeError(f"{name} retornou codigo {exit_code}")
+                if i:  # a primeira so aquece (conexao/pool)
+                    samples.append(elapsed)
+            transport.close()
+            samples.sort()
+            results[name] = _latency_summary(samples, statistics.fmean(samples))
+    finally:
+        server.shutdown()
+    return results
+
+
+def _json_response(size: int) -> str:
+    """
+    Resposta `curl -i` com um corpo JSON compacto (lista de objetos) de aproximadamente `size` bytes.
+    """
+    item = {"id": 0, "name": "item", "tags": ["a", "b"], "active": True, "score": 1.5, "meta": {"x": None}}
+    one = len(json.dumps(item, separators=(",", ":"))) + 1
+    items = [dict(item, id=i) for i in range(max(1, size // one))]
+    body = json.dumps(items, separators=(",", ":"))
+    return f"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n{body}"
+
+
+def bench_format(sizes: tuple[int, ...] = FORMAT_SIZES, budget: float = 1.0) -> dict:
+    """
+    Vazao da formatacao de JSON por tamanho de corpo. Usa a funcao sem o cache (que esconderia o custo).
+    Cada tamanho roda ate `budget` segundos (no minimo 3 vezes); vale a mediana.
+    """
+    results = {}
+    for size in sizes:
+        raw = _json_response(size)
+        samples = []
+        started = time.perf_counter()
+        while len(samples) < 3 or time.perf_counter() - started < budget:
+            start = time.perf_counter()
+            _format_uncached(raw)
+            samples.append(time.perf_counter() - start)
+        median = statistics.median(samples)
+        results[_size_label(size)] = {
+            "bytes": len(raw),
+            "runs": len(samples),
+            "median_ms": median * 1000,
+            "throughput_mb_s": len(raw) / median / 1e6,
+        }
+    return results
+
+
+def _size_label(size: int) -> str:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024 or unit == "MB":
+            return f"{size:g}{unit}"
+        size /= 1024
+    return str(size)
+
+
+def bench_store(sizes: tuple[int, ...] = STORE_SIZES, runs: int = 20) -> dict:
+    """
+    Persistencia e lista por tamanho da colecao: carregar endpoints.json, gravar uma alteracao (log),
+    compactar, buscar digitando uma consulta letra a letra e montar as linhas da lista (refresh_listbox).
+    Com display, mede tambem o delete/insert num Listbox real; sem display, essa metrica fica de fora.
+    """
+    listbox = _listbox()
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            data_file = Path(tmp) / f"endpoints-{size}.json"
+            endpoints = [
+                {
+                    "name": f"endpoint-{i:05d}",
+                    "url": f"https://api.example.com/v1/recurso{i}?page=1",
+                    "method": ("GET", "POST", "PUT", "DELETE")[i % 4],
+                    "headers": {"Accept": "application/json", "Authorization": "Bearer token"},
+                    "body": "" if i % 4 == 0 else json.dumps({"id": i, "value": "x" * 32}),
+                }
+                for i in range(size)
+            ]
+            data_file.write_text(json.dumps(endpoints, indent=2), encoding="utf-8")
+            load, upsert, compact, search, rows, insert = [], [], [], [], [], []
+            query = f"recurso{size // 2}"
+            for run in range(runs):
+                store = EndpointStore(data_file)
+                start = time.perf_counter()
+                store.load()
+                load.append(time.perf_counter() - start)
+
+                changed = dict(store.items[run % size], body=f"alterado {run}")
+                start = time.perf_counter()
+                store.upsert(changed)
+                upsert.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                store.compact()
+                compact.append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                for end in range(1, len(query) + 1):
+                    store.search(query[:end])
+                search.append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                names = [ep.get("name", "<sem nome>") for ep in store.items]
+                rows.append(time.perf_counter() - start)
+                if listbox is not None:
+                    start = time.perf_counter()
+                    listbox.delete(0, "end")
+                    listbox.insert("end", *names)
+                    listbox.update_idletasks()
+                    insert.append(time.perf_counter() - start)
+            result = {
+                "load_ms": statistics.median(load) * 1000,
+                "upsert_ms": statistics.median(upsert) * 1000,
+                "compact_ms": statistics.median(compact) * 1000,
+                "search_ms": statistics.median(search) * 1000,
+                "rows_ms": statistics.median(rows) * 1000,
+            }
+            if insert:
+                result["listbox_ms"] = statistics.median(insert) * 1000
+            results[str(size)] = result
+    if listbox is not None:
+        listbox.winfo_toplevel().destroy()
+    return results
+
+
+def _listbox():
+    try:
+        import tkinter as tk
+
+        root = tk.Tk()
+    except Exception:  # sem tkinter ou sem display
+        return None
+    root.withdraw()
+    listbox = tk.Listbox(root)
+    listbox.pack()
+    return listbox
+
+
+def _metrics(result: dict, prefix: str = "") -> dict[str, float]:
+    """
+    Achata o resultado em {"grupo.metrica": valor}, so com as metricas de sentido conhecido.
+    """
+    flat = {}
+    for key, value in result.items():
+        if isinstance(value, dict):
+            flat.update(_metrics(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)) and _direction(key):
+            flat[prefix + key] = float(value)
+    return flat
+
+
+def _direction(metric: str) -> int:
+    """
+    -1 se menor e melhor, 1 se maior e melhor, 0 se a metrica nao entra na comparacao.
+    """
+    if metric.endswith(LOWER_IS_BETTER):
+        return -1
+    if metric.endswith(HIGHER_IS_BETTER):
+        return 1
+    return 0
+
+
+def _load_baseline() -> dict:
+    try:
+        return json.loads(BENCH_BASELINE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def compare(name: str, result: dict, baseline: dict) -> dict[str, float]:
+    """
+    Variacao (%) de cada metrica em relacao ao baseline do mesmo bench; positiva = mais lento/menor vazao.
+    """
+    if name not in baseline:
+        return {}
+    before = _metrics(baseline[name])
+    deltas = {}
+    for metric, value in _metrics(result).items():
+        old = before.get(metric)
+        if not old:
+            continue
+        change = (value - old) / old * 100
+        deltas[metric] = round(change * -_direction(metric.rsplit(".", 1)[-1]), 2)
+    return deltas
+
+
+def _write_result(name: str, result: dict, deltas: dict | None = None) -> None:
+    record = {"bench": name, "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "result": result}
+    if deltas:
+        record["vs_baseline_pct"] = deltas
+    with open(BENCH_OUTPUT, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def _report(name: str, result: dict, save_baseline: bool) -> None:
+    """
+    Imprime o resultado e a comparacao com o baseline, anexa em bench_output.txt e, se pedido, grava o baseline.
+    """
+    _print_result(name, result)
+    baseline = _load_baseline()
+    deltas = compare(name, result, baseline)
+    for metric, change in deltas.items():
+        flag = "  <-- piorou" if change > REGRESSION_PCT else ""
+        print(f"  vs baseline {metric:36} {change:+7.1f}%{flag}")
+    _write_result(name, result, deltas)
+    if save_baseline:
+        baseline[name] = result
+        BENCH_BASELINE.write_text(json.dumps(baseline, indent=2), encoding="utf-8")
+
+
+def _print_result(name: str, result: dict) -> None:
+    if name == "load":
+        for processes, stats in result.items():
+            print(
+                f"{processes:>3} processo(s): {stats['throughput']:10.1f} req/s  "
+                f"p99 {stats['p99_ms']:8.3f} ms  erros {stats['errors']}"
+            )
+    elif name in ("transport", "send"):
+        for label, stats in result.items():
+            print(
+                f"{name} {label:16} media {stats['mean_ms']:8.3f} ms  "
+                f"p50 {stats['p50_ms']:8.3f} ms  p99 {stats['p99_ms']:8.3f} ms"
+            )
+    elif name == "startup":
+        for label, stats in result.items():
+            print(f"{label:12} primeiro byte {stats['first_byte_ms']:8.1f} ms  total {stats['total_ms']:8.1f} ms")
+    elif name == "hedge":
+        for label, stats in result.items():
+            print(
+                f"{label:10} p50 {stats['p50_ms']:8.3f} ms  p95 {stats['p95_ms']:8.3f} ms  "
+                f"p99 {stats['p99_ms']:8.3f} ms  max {stats['max_ms']:8.3f} ms  "
+                f"extras {stats['extra_requests_pct']:.1f}%"
+            )
+    elif name == "format":
+        for label, stats in result.items():
+            print(
+                f"format {label:6} {stats['median_ms']:10.3f} ms  {stats['throughput_mb_s']:8.1f} MB/s  "
+                f"({stats['runs']} execucoes)"
+            )
+    elif name == "store":
+        for size, stats in result.items():
+            line = (
+                f"store {size:>6} endpoints: carregar {stats['load_ms']:8.2f} ms  gravar {stats['upsert_ms']:6.2f} ms  "
+                f"compactar {stats['compact_ms']:8.2f} ms  buscar {stats['search_ms']:6.2f} ms  "
+                f"linhas {stats['rows_ms']:6.2f} ms"
+            )
+            if "listbox_ms" in stats:
+                line += f"  listbox {stats['listbox_ms']:7.2f} ms"
+            print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks do EndpointTester.")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "--save-baseline", action="store_true", help="grava este resultado como baseline (bench_baseline.json)"
+    )
+    sub = parser.add_subparsers(dest="bench", required=True)
+    transport_parser = sub.add_parser("transport", parents=[common], help="overhead por requisicao de cada transporte")
+    transport_parser.add_argument("--requests", type=int, default=200)
+    transport_parser.add_argument("--size", type=int, default=64)
+    load_parser = sub.add_parser("load", parents=[common], help="escala do gerador de carga por numero de processos")
+    load_parser.add_argument("--duration", type=float, default=5)
+    load_parser.add_argument("--max-processes", type=int, default=DEFAULT_PROCESSES)
+    load_parser.add_argument("--workers", type=int, default=8, help="workers por processo")
+    startup_parser = sub.add_parser(
+        "startup", parents=[common], help="partida a frio da CLI ate o primeiro byte enviado"
+    )
+    startup_parser.add_argument("--runs", type=int, default=10)
+    hedge_parser = sub.add_parser(
+        "hedge", parents=[common], help="p99 com e sem hedge contra um servidor com cauda lenta"
+    )
+    hedge_parser.add_argument("--requests", type=int, default=500)
+    hedge_parser.add_argument("--slow-fraction", type=float, default=0.05)
+    hedge_parser.add_argument("--slow-latency", type=float, default=0.2)
+    send_parser = sub.add_parser(
+        "send", parents=[common], help="envio de ponta a ponta (transporte, formatacao, tempos)"
+    )
+    send_parser.add_argument("--requests", type=int, default=100)
+    send_parser.add_argument("--size", type=int, default=64 * 1024)
+    send_parser.add_argument("--chunk-size", type=int, default=0, help="resposta chunked, em pedacos desse tamanho")
+    format_parser = sub.add_parser("format", parents=[common], help="vazao da formatacao de JSON por tamanho")
+    format_parser.add_argument("--sizes", type=int, nargs="+", default=list(FORMAT_SIZES))
+    store_parser = sub.add_parser("store", parents=[common], help="persistencia e lista por tamanho da colecao")
+    store_parser.add_argument("--sizes", type=int, nargs="+", default=list(STORE_SIZES))
+    store_parser.add_argument("--runs", type=int, default=20)
+    sub.add_parser("suite", parents=[common], help="transport, send, format e store com os valores padrao")
+    args = parser.parse_args()
+
+    if args.bench == "load":
+        result = bench_load(args.duration, args.max_processes, args.workers)
+    elif args.bench == "transport":
+        result = bench_transport(args.requests, args.size)
+    elif args.bench == "startup":
+        result = bench_startup(args.runs)
+    elif args.bench == "hedge":
+        result = bench_hedge(args.requests, args.slow_fraction, args.slow_latency)
+    elif args.bench == "send":
+        result = bench_send(args.requests, args.size, args.chunk_size)
+    elif args.bench == "format":
+        result = bench_format(tuple(args.sizes))
+    elif args.bench == "store":
+        result = bench_store(tuple(args.sizes), args.runs)
+    else:
+        for name, run in (
+            ("transport", lambda: bench_transport(200, 64)),
+            ("send", lambda: bench_send(100, 64 * 1024, 0)),
+            ("format", bench_format),
+            ("store", bench_store),
+        ):
+            _report(name, run(), args.save_baseline)
+        return
+    _report(args.bench, result, args.save_baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+"""
+Cache de respostas do lado do cliente (opcional), para GET/HEAD.
+- Chave: hash de metodo, URL, headers normalizados (nome em minusculas, ordenados) e hash do body.
+- LRU limitado em bytes na memoria; o que sai da memoria vai para cache/<chave>.json, tambem limitado em bytes.
+- Resposta fresca (Cache-Control max-age / Expires) e servida na hora; vencida, com ETag/Last-Modified,
+  e revalidada com If-None-Match/If-Modified-Since e um 304 conta como acerto.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+from timing import TIMING_MARKER
+from transport import ATTEMPTS_MARKER
+
+CACHE_MARKER = "\n[cache]"
+MEMORY_MAX_BYTES = 32 * 1024 * 1024
+DISK_MAX_BYTES = 256 * 1024 * 1024
+ENTRY_MAX_BYTES = 8 * 1024 * 1024
+CACHEABLE_METHODS = ("GET", "HEAD")
+TRAILER_MARKERS = ("\n[stderr]\n", ATTEMPTS_MARKER, TIMING_MARKER)
+VALIDATOR_HEADERS = ("etag", "last-modified", "cache-control", "expires", "date", "age")
+
+
+def fingerprint(payload: dict) -> str:
+    headers = sorted((key.strip().lower(), str(value).strip()) for key, value in payload["headers"].items())
+    body_hash = hashlib.sha256(payload["body"].encode("utf-8")).hexdigest()
+    parts = [payload["method"].upper(), payload["url"], headers, body_hash]
+    if payload.get("body_file") or payload.get("form"):
+        parts.append([payload.get("body_file"), payload.get("form")])  # referencia, nao o conteudo do arquivo
+    material = json.dumps(parts, ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()[:32]
+
+
+def parse_response(text: str) -> tuple[int | None, dict[str, str], int]:
+    """
+    (status, headers em minusculas, inicio do corpo) da resposta final de uma saida `curl -i`.
+    """
+    status, headers, pos = None, {}, 0
+    # O curl sem stream (modo texto) entrega os headers com \n em vez de \r\n.
+    separator = "\r\n\r\n" if "\r\n\r\n" in text else "\n\n"
+    while text.startswith("HTTP/", pos):
+        end = text.find(separator, pos)
+        block = text[pos:] if end == -1 else text[pos:end]
+        lines = block.splitlines()
+        fields = lines[0].split(None, 2)
+        if len(fields) < 2 or not fields[1].isdigit():
+            break
+        status, headers = int(fields[1]), {}
+        for line in lines[1:]:
+            key, sep, value = line.partition(":")
+            if sep:
+                headers[key.strip().lower()] = value.strip()
+        pos = len(text) if end == -1 else end + len(separator)
+        if not 100 <= status < 200:
+            break
+    return status, headers, pos
+
+
+def _http_date(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def _cache_control(headers: dict) -> dict[str, str]:
+    directives = {}
+    for part in headers.get("cache-control", "").split(","):
+        key, _, value = part.strip().partition("=")
+        if key:
+            directives[key.lower()] = value.strip('"')
+    return directives
+
+
+def fresh_until(headers: dict, now: float) -> float | None:
+    """
+    Instante ate o qual a resposta pode ser usada sem revalidar; None se nao pode ser guardada (no-store).
+    """
+    directives = _cache_control(headers)
+    if "no-store" in directives:
+        return None
+    if "no-cache" in directives:
+        return 0.0
+    try:
+        age = float(headers.get("age") or 0)
+    except ValueError:
+        age = 0.0
+    if "max-age" in directives:
+        try:
+            return now + float(directives["max-age"]) - age
+        except ValueError:
+            return 0.0
+    expires = _http_date(headers.get("expires"))
+    if expires is not None:
+        date = _http_date(headers.get("date")) or now
+        return now + expires - date - age
+    return 0.0
+
+
+class CacheEntry:
+    __slots__ = ("key", "output", "headers", "fresh_until", "stored_at", "size")
+
+    def __init__(self, key: str, output: str, headers: dict, fresh_until: float, stored_at: float) -> None:
+        self.key = key
+        self.output = output
+        self.headers = headers
+        self.fresh_until = fresh_until
+        self.stored_at = stored_at
+        self.size = len(output.encode("utf-8"))
+
+    def validators(self) -> dict:
+        conditional = {}
+        if "etag" in self.headers:
+            conditional["If-None-Match"] = self.headers["etag"]
+        if "last-modified" in self.headers:
+            conditional["If-Modified-Since"] = self.headers["last-modified"]
+        return conditional
+
+    def to_json(self) -> dict:
+        return {
+            "key": self.key,
+            "output": self.output,
+            "headers": self.headers,
+            "fresh_until": self.fresh_until,
+            "stored_at": self.stored_at,
+        }
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        directory: Path | None = None,
+        memory_max_bytes: int = MEMORY_MAX_BYTES,
+        disk_max_bytes: int = DISK_MAX_BYTES,
+    ) -> None:
+        self.directory = Path(directory) if directory is not None else None
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self._memory: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: OrderedDict[str, int] = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        if self.directory is not None:
+            self._scan_disk()
+
+    def _scan_disk(self) -> None:
+        files = []
+        try:
+            for item in os.scandir(self.directory):
+                if item.name.endswith(".json"):
+                    stat = item.stat()
+                    files.append((stat.st_mtime, item.name[:-5], stat.st_size))
+        except FileNotFoundError:
+            return
+        # Mais antigo primeiro: a ordem do OrderedDict e a ordem de descarte.
+        for _, key, size in sorted(files):
+            self._disk[key] = size
+            self._disk_bytes += size
+
+    def _disk_path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> CacheEntry | None:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+            if key not in self._disk:
+                return None
+            self._disk_bytes -= self._disk.pop(key)
+            path = self._disk_path(key)
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                path.unlink()
+                entry = CacheEntry(data["key"], data["output"], data["headers"], data["fresh_until"], data["stored_at"])
+            except (OSError, ValueError, KeyError):
+                return None
+            self._put_memory(entry)
+            return entry
+
+    def put(self, entry: CacheEntry) -> None:
+        if entry.size > ENTRY_MAX_BYTES:
+            return
+        with self._lock:
+            self._remove(entry.key)
+            self._put_memory(entry)
+
+    def _remove(self, key: str) -> None:
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= old.size
+        if key in self._disk:
+            self._disk_bytes -= self._disk.pop(key)
+            self._disk_path(key).unlink(missing_ok=True)
+
+    def _put_memory(self, entry: CacheEntry) -> None:
+        self._memory[entry.key] = entry
+        self._memory_bytes += entry.size
+        while self._memory_bytes > self.memory_max_bytes and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted.size
+            self._spill(evicted)
+
+    def _spill(self, entry: CacheEntry) -> None:
+        if self.directory is None or entry.size > self.disk_max_bytes:
+            return
+        data = json.dumps(entry.to_json(), ensure_ascii=False).encode("utf-8")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._disk_path(entry.key).with_suffix(".tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, self._disk_path(entry.key))
+        except OSError:
+            return
+        self._disk[entry.key] = len(data)
+        self._disk_bytes += len(data)
+        while self._disk_bytes > self.disk_max_bytes and self._disk:
+            key, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            self._disk_path(key).unlink(missing_ok=True)
+
+    def close(self) -> None:
+        """
+        Grava no disco o que esta so na memoria, para a proxima sessao.
+        """
+        with self._lock:
+            while self._memory:
+                _, entry = self._memory.popitem(last=False)
+                self._memory_bytes -= entry.size
+                self._spill(entry)
+
+    def stats_text(self) -> str:
+        saved = self.bytes_saved
+        for unit in ("B", "KB", "MB", "GB"):
+            if saved < 1024 or unit == "GB":
+                break
+            saved /= 1024
+        return (
+            f"cache: {self.hits + self.revalidated} acerto(s) ({self.revalidated} por 304), "
+            f"{self.misses} falta(s), {saved:.1f} {unit} economizados"
+        )
+
+    def execute(self, transport, payload: dict, control, sink=None) -> tuple[str, str, int]:
+        """
+        Mesmo contrato de transport.execute; `control.cache_result` recebe hit/revalidated/miss (ou None
+        quando o metodo nao e cacheavel).
+        """
+        if payload["method"].upper() not in CACHEABLE_METHODS:
+            return transport.execute(payload, control, sink)
+        key = fingerprint(payload)
+        entry = self.get(key)
+        now = time.time()
+        if entry is not None and entry.fresh_until > now:
+            with self._lock:
+                self.hits += 1
+                self.bytes_saved += entry.size
+            control.cache_result = "hit"
+            age = now - entry.stored_at
+            return self._serve(transport, payload, entry, sink, f"HIT: resposta guardada ha {age:.0f}s, ainda fresca")
+
+        conditional = entry.validators() if entry is not None else {}
+        if not conditional:
+            cmd, output, exit_code = transport.execute(payload, control, sink)
+            text = sink.text() if sink is not None else output
+            if text is not None and sink is None:
+                text = _strip_trailer(text)
+            self._store(key, text, exit_code, now)
+            with self._lock:
+                self.misses += 1
+            control.cache_result = "miss"
+            return cmd, output, exit_code
+
+        # Vencida, com validadores: pergunta ao servidor sem stream (um 304 nao deve aparecer na tela).
+        revalidation = dict(payload, headers={**payload["headers"], **conditional})
+        cmd, output, exit_code = transport.execute(revalidation, control)
+        response = _strip_trailer(output)
+        status, headers, _ = parse_response(response)
+        if exit_code == 0 and status == 304:
+            merged = {**entry.headers, **{k: v for k, v in headers.items() if k in VALIDATOR_HEADERS}}
+            refreshed = CacheEntry(key, entry.output, merged, fresh_until(merged, now) or 0.0, now)
+            self.put(refreshed)
+            with self._lock:
+                self.revalidated += 1
+                self.bytes_saved += max(0, entry.size - len(response.encode("utf-8")))
+            control.cache_result = "revalidated"
+            note = "HIT: servidor respondeu 304 (nao modificado)"
+            return self._serve(transport, payload, refreshed, sink, note, output[len(response) :])
+        self._store(key, response, exit_code, now)
+        with self._lock:
+            self.misses += 1
+        control.cache_result = "miss"
+        if sink is None:
+            return cmd, output, exit_code
+        sink.write(response, len(response.encode("utf-8")))
+        return cmd, output[len(response) :], exit_code
+
+    def _serve(
+        self, transport, payload: dict, entry: CacheEntry, sink, note: str, trailer: str = ""
+    ) -> tuple[str, str, int]:
+        cmd = transport.describe(payload)
+        block = f"{CACHE_MARKER}\n{note}\n{trailer}"
+        if sink is None:
+            return cmd, entry.output + block, 0
+        sink.write(entry.output, entry.size)
+        return cmd, block, 0
+
+    def _store(self, key: str, text: str | None, exit_code: int, now: float) -> None:
+        if exit_code != 0 or not text:
+            return
+        status, headers, _ = parse_response(text)
+        if status != 200:
+            return
+        until = fresh_until(headers, now)
+        if until is None:
+            return
+        if until <= now and "etag" not in headers and "last-modified" not in headers:
+            return  # sem frescor nem validador, guardar nao economiza nada
+        self.put(CacheEntry(key, text, {k: v for k, v in headers.items() if k in VALIDATOR_HEADERS}, until, now))
+
+
+def _strip_trailer(output: str) -> str:
+    """
+    Tira os blocos que o transporte acrescenta ao fim da saida ([tentativas], [stderr], [tempos]), a partir
+    do primeiro deles: uma resposta do cache nao deve repetir as tentativas do envio que a gravou.
+    """
+    found = [at for at in (output.find(marker) for marker in TRAILER_MARKERS) if at != -1]
+    return output[: min(found)] if found else output
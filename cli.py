@@ -0,0 +1,294 @@
+"""
+Uso sem interface (scripts, cron), sem importar o Tk:
+
+    python endpoint_tester.py run "Nome do endpoint" [--transport http.client] [--timeout 10] [--raw] [--timing]
+    python endpoint_tester.py run "Nome do endpoint" --spans    # tempo de cada etapa (JSON) no stderr
+    python endpoint_tester.py run "Nome do endpoint" --record   # grava a troca em recordings.jsonl
+    python endpoint_tester.py list
+    python endpoint_tester.py collection [NOME ...] [--parallel 8] [--transport http.client] [--timeout 10]
+    python endpoint_tester.py data "Nome do endpoint" linhas.csv -o saida.jsonl [--parallel 8] [--resume]
+    python endpoint_tester.py import captura.har|openapi.yaml|comandos.sh [--format har] [--dry-run]
+    python endpoint_tester.py replay [--port 8099] [--latency] [--processes 4]
+
+O codigo de saida de `run` e o do transporte (0 = requisicao concluida; demais seguem os codigos do curl).
+`collection` e `data` saem com 1 se algum endpoint/linha falhou (ou foi pulado); `import`, se alguma entrada
+teve erro.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+from endpoints import EndpointStore
+from paths import CACHE_DIR, DATA_FILE, RECORDING_FILE
+from spans import Trace, span
+
+DEFAULT_TIMEOUT = 30
+EXIT_NOT_FOUND = 2
+EXIT_INTERRUPTED = 130
+STDERR_BLOCK = "\n[stderr]\n"
+
+
+def _load_store(data_file: Path) -> EndpointStore:
+    store = EndpointStore(data_file, data_file.with_suffix(".log"))
+    store.load()
+    return store
+
+
+def run(args: argparse.Namespace) -> int:
+    trace = Trace(f"run {args.name} ({args.transport})") if args.spans else None
+    with span(trace, "carregar"):
+        store = _load_store(args.file)
+    idx = store.index_of(args.name)
+    if idx is None:
+        print(f"Endpoint nao encontrado: {args.name}", file=sys.stderr)
+        return EXIT_NOT_FOUND
+    payload = store.items[idx]
+
+    # Importados aqui: `list` e erros de uso nao pagam o custo do transporte/formatacao.
+    from transport import RequestControl, get_transport
+
+    control = RequestControl(args.timeout)
+    control.trace = trace
+    start = time.perf_counter()
+    if args.cache:
+        from cache import CACHE_MARKER, ResponseCache
+
+        cache = ResponseCache(CACHE_DIR)
+        cmd, output, exit_code = cache.execute(get_transport(args.transport), payload, control)
+        cache.close()
+    else:
+        cmd, output, exit_code = get_transport(args.transport).execute(payload, control)
+    if trace is not None:
+        trace.add("rede", time.perf_counter() - start - trace.stages.get("spawn", 0.0))
+    if args.verbose:
+        print(f"$ {cmd}\n", file=sys.stderr)
+    # Resposta no stdout; o bloco [stderr] (progresso/erros do curl) vai para o stderr.
+    stderr_at = output.find(STDERR_BLOCK)
+    if stderr_at != -1:
+        output, stderr = output[:stderr_at], output[stderr_at + len(STDERR_BLOCK) :]
+        sys.stderr.write(stderr)
+    if args.cache:
+        cache_at = output.find(CACHE_MARKER)
+        if cache_at != -1:
+            output, note = output[:cache_at], output[cache_at + 1 :]
+            sys.stderr.write(note)
+    if "resilience" in payload:
+        from resilience import ATTEMPTS_MARKER
+
+        attempts_at = output.find(ATTEMPTS_MARKER)
+        if attempts_at != -1:
+            output, note = output[:attempts_at], output[attempts_at + 1 :]
+            sys.stderr.write(note)
+    if args.record and exit_code == 0 and control.cache_result not in ("hit", "revalidated"):
+        from replay import Recorder
+
+        elapsed = time.perf_counter() - start
+        if Recorder(args.recording).record(payload, output, control.timing, elapsed):
+            print(f"Gravado em {args.recording}", file=sys.stderr)
+    if not args.raw:
+        from formatting import format_response_text
+
+        with span(trace, "formatar"):
+            output = format_response_text(output)
+    sys.stdout.write(output)
+    if output and not output.endswith("\n"):
+        sys.stdout.write("\n")
+    if args.timing and control.timing is not None:
+        from timing import render_waterfall
+
+        print(render_waterfall(control.timing), file=sys.stderr)
+    if trace is not None:
+        stages = dict(trace.stages, total=trace.total())
+        spans_ms = {stage: round(seconds * 1000, 3) for stage, seconds in stages.items()}
+        print(json.dumps({"spans_ms": spans_ms}), file=sys.stderr)
+    return exit_code
+
+
+def collection(args: argparse.Namespace) -> int:
+    store = _load_store(args.file)
+    from runner import CollectionRunner, select_with_dependencies
+
+    missing = [name for name in args.names if store.index_of(name) is None]
+    if missing:
+        print(f"Endpoint nao encontrado: {', '.join(missing)}", file=sys.stderr)
+        return EXIT_NOT_FOUND
+    endpoints = select_with_dependencies(store.items, args.names) if args.names else store.items
+    try:
+        runner = CollectionRunner(endpoints, args.parallel, args.timeout, args.transport)
+    except ValueError as exc:
+        print(exc, file=sys.stderr)
+        return EXIT_NOT_FOUND
+    runner.start()
+    for _ in range(len(runner.endpoints)):
+        result = runner.results.get()
+        line = f"{result['result']:7} {result['name']}"
+        if "latency_ms" in result:
+            line += f"  {result.get('status') or '-'}  {result['latency_ms']:.1f} ms"
+        if result.get("reason"):
+            line += f"  ({result['reason']})"
+        print(line, flush=True)
+    summary = runner.summary()
+    print(
+        f"{summary['total']} endpoints em {summary['elapsed_s']:.2f}s: "
+        f"{summary['passed']} ok, {summary['failed']} falharam, {summary['skipped']} pulados"
+    )
+    return 0 if summary["passed"] == summary["total"] else 1
+
+
+def data_run(args: argparse.Namespace) -> int:
+    store = _load_store(args.file)
+    idx = store.index_of(args.name)
+    if idx is None:
+        print(f"Endpoint nao encontrado: {args.name}", file=sys.stderr)
+        return EXIT_NOT_FOUND
+    if not args.dataset.is_file():
+        print(f"Arquivo de dados nao encontrado: {args.dataset}", file=sys.stderr)
+        return EXIT_NOT_FOUND
+    from datarun import DataRun
+
+    def _progress(summary: dict) -> None:
+        print(
+            f"{summary['rows']} linhas ({summary['failed']} falharam), {summary['rows_per_s']:.0f}/s",
+            file=sys.stderr,
+            flush=True,
+        )
+
+    try:
+        data = DataRun(
+            store.items[idx],
+            args.dataset,
+            args.output,
+            parallelism=args.parallel,
+            timeout=args.timeout,
+            transport=args.transport,
+            start_row=args.start_row,
+            resume=args.resume,
+            save_responses=args.responses,
+            on_progress=_progress,
+        )
+        summary = data.run()
+    except ValueError as exc:
+        print(exc, file=sys.stderr)
+        return EXIT_NOT_FOUND
+    except KeyboardInterrupt:
+        data.stop()
+        summary = data.summary()
+        print("Interrompido; use --resume para continuar.", file=sys.stderr)
+        exit_code = EXIT_INTERRUPTED
+    else:
+        exit_code = 0 if summary["failed"] == 0 else 1
+    print(
+        f"{summary['rows']} linhas em {summary['elapsed_s']:.2f}s ({summary['rows_per_s']:.0f}/s): "
+        f"{summary['passed']} ok, {summary['failed']} falharam"
+    )
+    return exit_code
+
+
+def import_file(args: argparse.Namespace) -> int:
+    if not args.source.is_file():
+        print(f"Arquivo nao encontrado: {args.source}", file=sys.stderr)
+        return EXIT_NOT_FOUND
+    from importers import ImportBatch, read_file
+
+    store = _load_store(args.file)
+    batch = ImportBatch()
+    try:
+        batch.extend(read_file(args.source, args.format, args.include_static, args.base_url, batch.errors))
+    except (OSError, ValueError) as exc:
+        print(exc, file=sys.stderr)
+        return EXIT_NOT_FOUND
+    for error in batch.errors:
+        print(error, file=sys.stderr)
+    new = batch.new_payloads(store) if args.dry_run else batch.commit(store)
+    for payload in new:
+        print(f"{payload['method']:7} {payload['name']}  {payload['url']}")
+    print(batch.summary() + (" (simulacao, nada gravado)" if args.dry_run else ""))
+    return 1 if batch.errors else 0
+
+
+def replay(args: argparse.Namespace) -> int:
+    if not args.recording.is_file():
+        print(f"Gravacao nao encontrada: {args.recording} (grave com `run --record` ou \"Gravar\")", file=sys.stderr)
+        return EXIT_NOT_FOUND
+    from replay import load_recordings, serve_forever
+
+    index, count = load_recordings(args.recording)
+    latency = f", latencia gravada x{args.latency_scale:g}" if args.latency else ""
+    print(
+        f"Servindo {count} troca(s) gravada(s) ({len(index)} chaves) em http://{args.host}:{args.port}/ "
+        f"com {args.processes} processo(s){latency} (Ctrl+C para sair)",
+        flush=True,
+    )
+    try:
+        serve_forever(args.recording, args.host, args.port, args.latency, args.latency_scale, args.processes)
+    except (OSError, ValueError) as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    return 0
+
+
+def list_endpoints(args: argparse.Namespace) -> int:
+    for ep in _load_store(args.file).items:
+        print(f"{ep.get('method', ''):7} {ep.get('name', '')}  {ep.get('url', '')}")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="endpoint_tester.py", description="EndpointTester sem interface.")
+    parser.add_argument("--file", type=Path, default=DATA_FILE, help="arquivo de endpoints (padrao: endpoints.json)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run_parser = sub.add_parser("run", help="envia um endpoint salvo e imprime a resposta")
+    run_parser.add_argument("name", help="nome do endpoint salvo")
+    run_parser.add_argument("--transport", default="curl", help="curl ou http.client")
+    run_parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    run_parser.add_argument("--raw", action="store_true", help="nao formata JSON")
+    run_parser.add_argument("--timing", action="store_true", help="imprime os tempos por fase no stderr")
+    run_parser.add_argument("--spans", action="store_true", help="imprime o tempo de cada etapa (JSON) no stderr")
+    run_parser.add_argument("--cache", action="store_true", help="usa/atualiza o cache de respostas (GET/HEAD)")
+    run_parser.add_argument("--record", action="store_true", help="grava a troca para o servidor de replay")
+    run_parser.add_argument("--recording", type=Path, default=RECORDING_FILE, help="arquivo da gravacao")
+    run_parser.add_argument("-v", "--verbose", action="store_true", help="imprime o comando no stderr")
+    run_parser.set_defaults(handler=run)
+    list_parser = sub.add_parser("list", help="lista os endpoints salvos")
+    list_parser.set_defaults(handler=list_endpoints)
+    collection_parser = sub.add_parser("collection", help="roda endpoints salvos em paralelo, respeitando depends_on")
+    collection_parser.add_argument("names", nargs="*", help="endpoints a rodar (com dependencias); padrao: todos")
+    collection_parser.add_argument("--parallel", type=int, default=8, help="requisicoes simultaneas")
+    collection_parser.add_argument("--transport", default="curl", help="curl ou http.client")
+    collection_parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    collection_parser.set_defaults(handler=collection)
+    data_parser = sub.add_parser("data", help="envia um endpoint uma vez por linha de um CSV/JSONL ({{coluna}})")
+    data_parser.add_argument("name", help="nome do endpoint salvo (URL, headers e body com {{variavel}})")
+    data_parser.add_argument("dataset", type=Path, help=".csv com cabecalho ou .jsonl com um objeto por linha")
+    data_parser.add_argument("-o", "--output", type=Path, required=True, help="JSONL de resultados (acrescenta)")
+    data_parser.add_argument("--parallel", type=int, default=8, help="requisicoes simultaneas")
+    data_parser.add_argument("--start-row", type=int, default=0, help="primeira linha de dados (0 = inicio)")
+    data_parser.add_argument("--resume", action="store_true", help="pula as linhas que ja estao na saida")
+    data_parser.add_argument("--responses", action="store_true", help="grava a resposta completa de cada linha")
+    data_parser.add_argument("--transport", default="curl", help="curl ou http.client")
+    data_parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    data_parser.set_defaults(handler=data_run)
+    import_parser = sub.add_parser("import", help="importa endpoints de um HAR, OpenAPI ou arquivo de comandos curl")
+    import_parser.add_argument("source", type=Path, help=".har, OpenAPI (.json/.yaml) ou texto com comandos curl")
+    import_parser.add_argument("--format", choices=("har", "curl", "openapi"), default="", help="padrao: detectado")
+    import_parser.add_argument("--include-static", action="store_true", help="HAR: inclui imagens, css, js e fontes")
+    import_parser.add_argument("--base-url", default="", help="OpenAPI: URL base no lugar da de `servers`")
+    import_parser.add_argument("--dry-run", action="store_true", help="so lista o que seria importado")
+    import_parser.set_defaults(handler=import_file)
+    replay_parser = sub.add_parser("replay", help="servidor local que responde com as trocas gravadas")
+    replay_parser.add_argument("--recording", type=Path, default=RECORDING_FILE, help="padrao: recordings.jsonl")
+    replay_parser.add_argument("--host", default="127.0.0.1")
+    replay_parser.add_argument("--port", type=int, default=8099)
+    replay_parser.add_argument("--latency", action="store_true", help="espera a latencia gravada de cada troca")
+    replay_parser.add_argument("--latency-scale", type=float, default=1.0, help="fator sobre a latencia gravada")
+    replay_parser.add_argument("--processes", type=int, default=1, help="processos escutando na mesma porta")
+    replay_parser.set_defaults(handler=replay)
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Decodificacao incremental de Content-Encoding para o motor http.client (o curl usa --compressed).
+gzip e deflate vem do zlib; br so e anunciado se o modulo `brotli` (ou `brotlicffi`) estiver instalado.
+"""
+
+import time
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+SUPPORTED_ENCODINGS = ("gzip", "deflate", "br") if brotli is not None else ("gzip", "deflate")
+ACCEPT_ENCODING = ", ".join(SUPPORTED_ENCODINGS)
+
+
+class DecodeError(Exception):
+    pass
+
+
+class StreamDecoder:
+    """
+    Decodifica o corpo em pedacos; `elapsed` acumula o tempo gasto decodificando.
+    """
+
+    def __init__(self, encoding: str) -> None:
+        self.encoding = encoding
+        self.elapsed = 0.0
+        self._first = True
+        if encoding == "br":
+            self._obj = brotli.Decompressor()
+        else:
+            # 32 + MAX_WBITS: aceita gzip e zlib; deflate "cru" (sem cabecalho) e tratado no primeiro pedaco.
+            self._obj = zlib.decompressobj(32 + zlib.MAX_WBITS)
+
+    def decode(self, chunk: bytes) -> bytes:
+        start = time.perf_counter()
+        try:
+            if self.encoding == "br":
+                data = self._obj.process(chunk)
+            else:
+                try:
+                    data = self._obj.decompress(chunk)
+                except zlib.error:
+                    if not (self._first and self.encoding == "deflate"):
+                        raise
+                    self._obj = zlib.decompressobj(-zlib.MAX_WBITS)
+                    data = self._obj.decompress(chunk)
+        except Exception as exc:  # zlib.error / brotli.error nao tem base comum
+            raise DecodeError(f"falha ao decodificar {self.encoding}: {exc}") from None
+        finally:
+            self.elapsed += time.perf_counter() - start
+        self._first = False
+        return data
+
+    def flush(self) -> bytes:
+        if self.encoding == "br":
+            return b""
+        start = time.perf_counter()
+        try:
+            return self._obj.flush()
+        except zlib.error as exc:
+            raise DecodeError(f"falha ao decodificar {self.encoding}: {exc}") from None
+        finally:
+            self.elapsed += time.perf_counter() - start
+
+
+def make_decoder(content_encoding: str | None) -> StreamDecoder | None:
+    """
+    None para identity/ausente ou codificacao nao suportada (o corpo segue como veio).
+    """
+    encoding = (content_encoding or "").strip().lower()
+    if encoding == "x-gzip":
+        encoding = "gzip"
+    if encoding not in SUPPORTED_ENCODINGS:
+        return None
+    return StreamDecoder(encoding)
@@ -0,0 +1,181 @@
+"""
+Envio em lote pelo curl: um unico processo `curl --parallel` para muitas requisicoes.
+A lista vira um arquivo de configuracao (-K) com um bloco url/request/header/data-raw por requisicao,
+separados por `next`. Cada transferencia grava a resposta (`curl -i`) num arquivo proprio e, ao terminar,
+uma linha com indice, codigo de saida e tempos no stderr; essa linha e o que separa os resultados.
+Conexoes sao reaproveitadas entre transferencias e, em HTTPS com HTTP/2, multiplexadas.
+"""
+
+import shutil
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+
+from timing import CURL_VARIABLES
+from transport import RequestControl, record_decoded_size
+from uploads import has_upload
+
+BATCH_MARKER = "@@endpoint-tester-batch@@"
+BATCH_MIN_VERSION = (7, 75)  # %{exitcode} e %{errormsg} no -w
+PARALLEL_MAX_LIMIT = 300  # limite do --parallel-max no curl
+WRITE_OUT = (
+    "%{stderr}" + BATCH_MARKER + " {index} %{exitcode} "
+    + " ".join("%{" + name + "}" for name in CURL_VARIABLES)
+    + " %{errormsg}\n"
+)
+
+_supported: bool | None = None
+_supported_lock = threading.Lock()
+
+
+def batch_supported() -> bool:
+    """
+    True se o curl instalado suporta o lote (consultado uma vez por processo).
+    """
+    global _supported
+    with _supported_lock:
+        if _supported is None:
+            try:
+                first_line = subprocess.run(
+                    ["curl", "--version"], capture_output=True, text=True, timeout=10
+                ).stdout.split("\n", 1)[0]
+                version = tuple(int(part) for part in first_line.split()[1].split(".")[:2])
+            except (OSError, subprocess.SubprocessError, IndexError, ValueError):
+                version = (0, 0)
+            _supported = version >= BATCH_MIN_VERSION
+        return _supported
+
+
+def batchable(payload: dict) -> bool:
+    """
+    Uploads do disco (stdin de um curl proprio) e endpoints com politica de repeticao/hedge ficam fora do lote.
+    """
+    return not has_upload(payload) and not payload.get("resilience")
+
+
+def _quote(value: str) -> str:
+    escaped = (
+        value.replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+        .replace("\t", "\\t")
+    )
+    return f'"{escaped}"'
+
+
+def build_config(payloads: list[dict], output_dir: Path, timeout: float | None = None) -> str:
+    blocks = []
+    for index, payload in enumerate(payloads):
+        lines = [f"url = {_quote(payload['url'])}", f"request = {_quote(payload['method'])}", "include", "silent"]
+        for key, value in payload["headers"].items():
+            lines.append(f"header = {_quote(f'{key}: {value}')}")
+        if payload["body"]:
+            lines.append(f"data-raw = {_quote(payload['body'])}")
+        if payload.get("compressed"):
+            lines.append("compressed")
+        if timeout:
+            lines.append(f"max-time = {timeout:g}")
+        lines.append(f"output = {_quote(str(output_dir / str(index)))}")
+        lines.append(f"write-out = {_quote(WRITE_OUT.replace('{index}', str(index)))}")
+        blocks.append("\n".join(lines))
+    return "\nnext\n".join(blocks) + "\n"
+
+
+def _parse_marker(line: str) -> tuple[int, int, dict, str] | None:
+    start = line.find(BATCH_MARKER)
+    if start == -1:
+        return None
+    fields = line[start:].rstrip("\n").split(" ", 3 + len(CURL_VARIABLES))
+    if len(fields) < 3 + len(CURL_VARIABLES):
+        return None
+    try:
+        index, exit_code = int(fields[1]), int(fields[2])
+        values = fields[3 : 3 + len(CURL_VARIABLES)]
+        timing = {name: float(value.replace(",", ".")) for name, value in zip(CURL_VARIABLES, values)}
+    except ValueError:
+        return None
+    message = fields[3 + len(CURL_VARIABLES)] if len(fields) > 3 + len(CURL_VARIABLES) else ""
+    return index, exit_code, timing, message
+
+
+def run_batch(
+    payloads: list[dict],
+    parallel_max: int,
+    timeout: float | None = None,
+    control: RequestControl | None = None,
+    on_result=None,
+) -> list[int]:
+    """
+    Envia `payloads` num unico processo curl, com ate `parallel_max` transferencias simultaneas.
+    on_result(indice, saida, codigo_de_saida, tempos) e chamado (na thread chamadora) conforme cada uma
+    termina, com a saida no formato de `curl -i`. `timeout` vale por requisicao; `control` cancela o lote.
+    Retorna os indices que ficaram sem resultado (lote cancelado ou curl encerrado antes).
+    """
+    control = control or RequestControl()
+    pending = set(range(len(payloads)))
+    if not payloads:
+        return []
+    work_dir = Path(tempfile.mkdtemp(prefix="endpoint-tester-lote-"))
+    try:
+        config_path = work_dir / "lote.curlrc"
+        config_path.write_text(build_config(payloads, work_dir, timeout), encoding="utf-8")
+        cmd = [
+            "curl",
+            "--parallel",
+            "--parallel-max",
+            str(max(1, min(parallel_max, PARALLEL_MAX_LIMIT))),
+            "--config",
+            str(config_path),
+        ]
+        try:
+            process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+            )
+        except FileNotFoundError:
+            control.error = "curl nao encontrado no sistema."
+            return sorted(pending)
+
+        def _kill() -> None:
+            if process.poll() is None:
+                process.kill()
+
+        if not control.attach(_kill):
+            process.communicate()
+            return sorted(pending)
+        try:
+            for line in process.stderr:
+                parsed = _parse_marker(line)
+                if parsed is None:
+                    continue
+                index, exit_code, timing, message = parsed
+                if index not in pending:
+                    continue
+                pending.discard(index)
+                output_file = work_dir / str(index)
+                try:
+                    raw = output_file.read_bytes()
+                    output_file.unlink()
+                except FileNotFoundError:
+                    raw = b""
+                output = raw.decode("utf-8", errors="replace")
+                record_decoded_size(payloads[index], timing, len(raw))
+                if message.strip():
+                    output += "\n[stderr]\n" + message.strip() + "\n"
+                if on_result is not None:
+                    on_result(index, output, exit_code, timing)
+            process.wait()
+        finally:
+            control.detach()
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+        return sorted(pending)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
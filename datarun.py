@@ -0,0 +1,321 @@
+"""
+Execucao parametrizada: um endpoint salvo com `{{variavel}}` em URL, headers e body, enviado uma vez por
+linha de um CSV (cabecalho = nomes das variaveis) ou JSONL (um objeto por linha).
+O template e compilado uma vez (str.format com os campos na ordem); as linhas sao lidas sob demanda por
+geradores e nunca ficam todas em memoria. Cada resultado vira uma linha no JSONL de saida assim que termina;
+com `resume`, as linhas ja presentes na saida sao puladas (retomada depois de uma queda).
+"""
+
+import csv
+import itertools
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import quote
+
+from curlbatch import batch_supported, batchable, run_batch
+from runner import DEFAULT_PARALLELISM, DEFAULT_TIMEOUT, check_response
+from transport import DEFAULT_TRANSPORT, RequestControl, create_transport
+
+BATCH_ROUNDS = 50  # linhas por lote de curl = parallelism * BATCH_ROUNDS
+PROGRESS_INTERVAL = 1.0
+PLACEHOLDER = re.compile(r"\{\{\s*([^{}\s]+)\s*\}\}")
+URL_SAFE = ":/?#[]@!$&'()*+,;=%~"  # na URL so espacos, acentos etc. sao codificados; a sintaxe fica
+
+
+def _compile(text: str) -> str | tuple[str, tuple[str, ...]]:
+    """
+    Texto sem variaveis fica como esta; com variaveis vira (formato, nomes) para str.format posicional.
+    """
+    parts = PLACEHOLDER.split(text)
+    if len(parts) == 1:
+        return text
+    literals = [part.replace("{", "{{").replace("}", "}}") for part in parts[0::2]]
+    names = tuple(parts[1::2])
+    fmt = literals[0] + "".join(f"{{{pos}}}{literal}" for pos, literal in enumerate(literals[1:]))
+    return fmt, names
+
+
+def _value(row: dict, name: str) -> str:
+    value = row[name]
+    return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+
+
+def _render(compiled, row: dict, escape=None) -> str:
+    if isinstance(compiled, str):
+        return compiled
+    fmt, names = compiled
+    if escape is not None:
+        return fmt.format(*[escape(_value(row, name)) for name in names])
+    return fmt.format(*[_value(row, name) for name in names])
+
+
+def _quote_url(value: str) -> str:
+    return quote(value, safe=URL_SAFE)
+
+
+class Template:
+    """
+    Payload de endpoint com `{{variavel}}`. Valores que nao sao texto (JSONL) entram como JSON;
+    na URL, caracteres invalidos (espaco, acentos) sao codificados com %.
+    render levanta KeyError com o nome da variavel ausente na linha.
+    """
+
+    def __init__(self, payload: dict) -> None:
+        self.payload = payload
+        self._url = _compile(payload["url"])
+        self._headers = [(_compile(key), _compile(value)) for key, value in payload["headers"].items()]
+        self._body = _compile(payload["body"])
+        names: set[str] = set()
+        for compiled in (self._url, self._body, *itertools.chain.from_iterable(self._headers)):
+            if not isinstance(compiled, str):
+                names.update(compiled[1])
+        self.variables = sorted(names)
+
+    def render(self, row: dict) -> dict:
+        rendered = dict(self.payload)
+        rendered["url"] = _render(self._url, row, _quote_url)
+        rendered["headers"] = {_render(key, row): _render(value, row) for key, value in self._headers}
+        rendered["body"] = _render(self._body, row)
+        return rendered
+
+
+def read_rows(path: Path, start_row: int = 0, done: bytearray | None = None):
+    """
+    Gera (numero_da_linha, linha) a partir de start_row (0 = primeira linha de dados), pulando as
+    marcadas em `done`. CSV usa o cabecalho como nomes; o resto e lido como JSONL.
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        f = open(path, newline="", encoding="utf-8-sig")
+        rows = enumerate(csv.DictReader(f))
+    else:
+        f = open(path, encoding="utf-8")
+        rows = enumerate(line for line in f if line.strip())
+    with f:
+        for number, row in itertools.islice(rows, start_row, None):
+            if done is not None and number < len(done) and done[number]:
+                continue
+            if isinstance(row, str):
+                try:
+                    row = json.loads(row)
+                except ValueError as exc:
+                    raise ValueError(f"{path.name}, linha {number + 1}: JSON invalido ({exc})") from None
+                if not isinstance(row, dict):
+                    raise ValueError(f"{path.name}, linha {number + 1}: esperado um objeto JSON")
+            yield number, row
+
+
+def csv_columns(path: Path) -> list[str] | None:
+    path = Path(path)
+    if path.suffix.lower() != ".csv":
+        return None
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return next(csv.reader(f), [])
+
+
+def completed_rows(output: Path) -> bytearray:
+    """
+    Marca (1 byte por linha do dataset) as linhas ja gravadas na saida. Uma ultima linha cortada
+    (queda no meio da escrita) e removida do arquivo para a retomada continuar a partir dela.
+    """
+    done = bytearray()
+    try:
+        f = open(output, "r+b")
+    except FileNotFoundError:
+        return done
+    with f:
+        end = 0
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            end += len(line)
+            # As linhas sao gravadas com "row" primeiro: evita decodificar o JSON inteiro.
+            if not line.startswith(b'{"row": '):
+                continue
+            try:
+                number = int(line[8 : line.index(b",", 8)])
+            except ValueError:
+                continue
+            if number >= len(done):
+                done.extend(bytes(number + 1 - len(done)))
+            done[number] = 1
+        f.truncate(end)
+    return done
+
+
+class DataRun:
+    """
+    Bloqueia em run() ate o dataset acabar (ou stop()); devolve o resumo.
+    `on_progress(resumo)` e chamado no maximo uma vez por PROGRESS_INTERVAL.
+    """
+
+    def __init__(
+        self,
+        payload: dict,
+        dataset: Path,
+        output: Path,
+        parallelism: int = DEFAULT_PARALLELISM,
+        timeout: float = DEFAULT_TIMEOUT,
+        transport: str = DEFAULT_TRANSPORT,
+        start_row: int = 0,
+        resume: bool = False,
+        save_responses: bool = False,
+        on_progress=None,
+    ) -> None:
+        if parallelism < 1:
+            raise ValueError("Informe ao menos 1 requisicao em paralelo.")
+        if start_row < 0:
+            raise ValueError("A linha inicial nao pode ser negativa.")
+        self.template = Template(payload)
+        self.dataset = Path(dataset)
+        self.output = Path(output)
+        self.parallelism = parallelism
+        self.timeout = timeout
+        self.transport = transport
+        self.start_row = start_row
+        self.resume = resume
+        self.save_responses = save_responses
+        self.on_progress = on_progress
+        columns = csv_columns(self.dataset)
+        if columns is not None:
+            missing = [name for name in self.template.variables if name not in columns]
+            if missing:
+                raise ValueError(f"Colunas ausentes em {self.dataset.name}: {', '.join(missing)}")
+        self.counts = {"passed": 0, "failed": 0}
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._controls: set[RequestControl] = set()
+        self._last_progress = 0.0
+
+    def run(self) -> dict:
+        self.started_at = self._last_progress = time.monotonic()
+        done = completed_rows(self.output) if self.resume else None
+        rows = read_rows(self.dataset, self.start_row, done)
+        self._transport = create_transport(self.transport, max_idle_per_host=self.parallelism)
+        try:
+            with open(self.output, "a", encoding="utf-8") as out:
+                self._out = out
+                if self.transport == "curl" and batch_supported() and batchable(self.template.payload):
+                    self._run_batches(rows)
+                else:
+                    self._run_pool(rows)
+        finally:
+            self._transport.close()
+            self.finished_at = time.monotonic()
+        return self.summary()
+
+    def stop(self) -> None:
+        self._stop.set()
+        with self._lock:
+            controls = list(self._controls)
+        for control in controls:
+            control.cancel()
+
+    def _run_pool(self, rows) -> None:
+        # Limita as linhas ja lidas e ainda nao enviadas: o dataset nunca e carregado inteiro.
+        slots = threading.BoundedSemaphore(self.parallelism * 2)
+        with ThreadPoolExecutor(max_workers=self.parallelism, thread_name_prefix="dados") as pool:
+            for number, row in rows:
+                while not slots.acquire(timeout=0.2):
+                    if self._stop.is_set():
+                        break
+                if self._stop.is_set():
+                    break
+                pool.submit(self._send, number, row).add_done_callback(lambda _: slots.release())
+
+    def _send(self, number: int, row: dict) -> None:
+        try:
+            payload = self.template.render(row)
+        except KeyError as exc:
+            self._write(number, {"result": "failed", "error": f"variavel ausente: {exc.args[0]}"})
+            return
+        control = RequestControl(self.timeout)
+        with self._lock:
+            self._controls.add(control)
+        start = time.perf_counter()
+        try:
+            _, output, exit_code = self._transport.execute(payload, control)
+        except Exception as exc:  # uma linha com problema nao pode parar o dataset
+            output, exit_code = f"\n[stderr]\n{exc}\n", 1
+        finally:
+            with self._lock:
+                self._controls.discard(control)
+        if control.cancelled.is_set():
+            return  # interrompida: fica fora da saida e e refeita na retomada
+        self._write_result(number, output, exit_code, time.perf_counter() - start)
+
+    def _run_batches(self, rows) -> None:
+        while not self._stop.is_set():
+            chunk = list(itertools.islice(rows, self.parallelism * BATCH_ROUNDS))
+            if not chunk:
+                break
+            numbers, payloads = [], []
+            for number, row in chunk:
+                try:
+                    payloads.append(self.template.render(row))
+                except KeyError as exc:
+                    self._write(number, {"result": "failed", "error": f"variavel ausente: {exc.args[0]}"})
+                    continue
+                numbers.append(number)
+            if not payloads:
+                continue
+            control = RequestControl()
+            with self._lock:
+                self._controls.add(control)
+            try:
+                run_batch(
+                    payloads,
+                    self.parallelism,
+                    self.timeout,
+                    control,
+                    lambda index, output, exit_code, timing: self._write_result(
+                        numbers[index], output, exit_code, timing["time_total"]
+                    ),
+                )
+            finally:
+                with self._lock:
+                    self._controls.discard(control)
+
+    def _write_result(self, number: int, output: str, exit_code: int, elapsed: float) -> None:
+        status, error = check_response(output, exit_code, self.transport)
+        record = {
+            "result": "failed" if error else "passed",
+            "status": status,
+            "exit_code": exit_code,
+            "latency_ms": round(elapsed * 1000, 3),
+        }
+        if error:
+            record["error"] = error
+        if self.save_responses:
+            record["response"] = output
+        self._write(number, record)
+
+    def _write(self, number: int, record: dict) -> None:
+        line = json.dumps({"row": number, **record}, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._out.write(line)
+            self._out.flush()
+            self.counts[record["result"]] += 1
+            now = time.monotonic()
+            report = self.on_progress is not None and now - self._last_progress >= PROGRESS_INTERVAL
+            if report:
+                self._last_progress = now
+        if report:
+            self.on_progress(self.summary())
+
+    def summary(self) -> dict:
+        end = self.finished_at or time.monotonic()
+        elapsed = end - self.started_at if self.started_at else 0.0
+        total = self.counts["passed"] + self.counts["failed"]
+        return {
+            "rows": total,
+            **self.counts,
+            "elapsed_s": elapsed,
+            "rows_per_s": total / elapsed if elapsed > 0 else 0.0,
+        }
@@ -0,0 +1,186 @@
+"""
+Persistencia dos endpoints salvos.
+endpoints.json continua sendo o arquivo principal (mesmo formato de sempre); cada alteracao vira uma
+linha em endpoints.log, e o log e aplicado sobre o json ao carregar. Quando o log fica maior que o json
+(ou ao fechar), o json e regravado a partir da memoria e o log zerado.
+A busca usa um texto normalizado por endpoint (nome, URL e metodo em minusculas), mantido junto da lista.
+"""
+
+import json
+import os
+from pathlib import Path
+
+COMPACT_MIN_OPS = 200
+
+
+class EndpointStore:
+    def __init__(self, data_file: Path, log_file: Path | None = None) -> None:
+        self.data_file = Path(data_file)
+        self.log_file = Path(log_file) if log_file is not None else self.data_file.with_suffix(".log")
+        self.items: list[dict] = []
+        self._index: dict[str, int] = {}
+        self._haystacks: list[str] = []
+        self._last_query = ""
+        self._last_result: list[int] | None = None
+        self._log_ops = 0
+        self._log_bytes = 0
+        self._data_bytes = 0
+
+    def load(self) -> None:
+        """
+        Le endpoints.json e reaplica o log. Levanta json.JSONDecodeError se o json estiver corrompido.
+        """
+        self.items, self._index, self._haystacks = [], {}, []
+        self._last_result = None
+        try:
+            raw = self.data_file.read_bytes()
+        except FileNotFoundError:
+            raw = b""
+        self._data_bytes = len(raw)
+        if raw.strip():
+            data = json.loads(raw)
+            if isinstance(data, list):
+                for ep in data:
+                    self._put(ep)
+        self._log_ops = self._log_bytes = 0
+        try:
+            f = open(self.log_file, "r+b")
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # linha cortada por queda no meio da escrita
+                self._log_bytes += len(line)
+                try:
+                    op = json.loads(line)
+                except ValueError:
+                    continue
+                self._log_ops += 1
+                if op.get("op") == "put":
+                    self._put(op["endpoint"])
+                elif op.get("op") == "del" and op.get("name") in self._index:
+                    self._remove(self._index[op["name"]])
+            # Sem cortar, a proxima escrita iria colada na linha incompleta e se perderia junto com ela.
+            f.truncate(self._log_bytes)
+
+    def index_of(self, name: str) -> int | None:
+        return self._index.get(name)
+
+    def upsert(self, payload: dict) -> tuple[int, bool]:
+        """
+        Grava o endpoint (chave: nome); retorna (indice, alterado). Sem alteracao, nada e escrito.
+        """
+        idx = self._index.get(payload["name"])
+        if idx is not None and self.items[idx] == payload:
+            return idx, False
+        idx = self._put(payload)
+        self._append({"op": "put", "endpoint": payload})
+        return idx, True
+
+    def upsert_many(self, payloads: list[dict]) -> int:
+        """
+        Grava varios endpoints com uma unica escrita (importacao); retorna quantos mudaram.
+        Se a leva sozinha ja faria o log passar do json, o json e regravado direto, sem passar pelo log.
+        """
+        lines = []
+        for payload in payloads:
+            idx = self._index.get(payload["name"])
+            if idx is not None and self.items[idx] == payload:
+                continue
+            self._put(payload)
+            lines.append(json.dumps({"op": "put", "endpoint": payload}, ensure_ascii=False) + "\n")
+        if not lines:
+            return 0
+        data = "".join(lines).encode("utf-8")
+        if self._log_ops + len(lines) >= COMPACT_MIN_OPS and self._log_bytes + len(data) > self._data_bytes:
+            self._log_ops += len(lines)
+            self.compact()
+        else:
+            self._write_log(data, len(lines))
+        return len(lines)
+
+    def delete(self, idx: int) -> dict:
+        removed = self._remove(idx)
+        self._append({"op": "del", "name": removed.get("name")})
+        return removed
+
+    def _put(self, ep: dict) -> int:
+        name = ep.get("name")
+        idx = self._index.get(name)
+        if idx is None:
+            idx = len(self.items)
+            self.items.append(ep)
+            self._haystacks.append(_haystack(ep))
+            self._index[name] = idx
+        else:
+            self.items[idx] = ep
+            self._haystacks[idx] = _haystack(ep)
+        self._last_result = None
+        return idx
+
+    def _remove(self, idx: int) -> dict:
+        removed = self.items.pop(idx)
+        self._haystacks.pop(idx)
+        self._last_result = None
+        self._index.pop(removed.get("name"), None)
+        for pos in range(idx, len(self.items)):
+            self._index[self.items[pos].get("name")] = pos
+        return removed
+
+    def _append(self, op: dict) -> None:
+        self._write_log((json.dumps(op, ensure_ascii=False) + "\n").encode("utf-8"), 1)
+
+    def _write_log(self, data: bytes, ops: int) -> None:
+        with open(self.log_file, "ab") as f:
+            f.write(data)
+        self._log_ops += ops
+        self._log_bytes += len(data)
+        if self._log_ops >= COMPACT_MIN_OPS and self._log_bytes > self._data_bytes:
+            self.compact()
+
+    def compact(self) -> None:
+        """
+        Regrava endpoints.json com o estado atual e apaga o log.
+        """
+        if not self._log_ops and self.data_file.exists():
+            return
+        tmp_path = self.data_file.with_suffix(self.data_file.suffix + ".tmp")
+        data = json.dumps(self.items, indent=2).encode("utf-8")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self.data_file)
+        self.log_file.unlink(missing_ok=True)
+        self._data_bytes = len(data)
+        self._log_ops = self._log_bytes = 0
+
+    def search(self, query: str) -> list[int] | None:
+        """
+        Indices (em ordem) dos endpoints que contem todos os termos da consulta em nome, URL ou metodo.
+        None para consulta vazia. Se a consulta so estende a anterior, filtra apenas o resultado anterior.
+        """
+        query = query.lower()
+        terms = query.split()
+        if not terms:
+            return None
+        haystacks = self._haystacks
+        if self._last_result is not None and self._last_query and query.startswith(self._last_query):
+            candidates = self._last_result
+        else:
+            candidates = range(len(haystacks))
+        # O termo mais longo costuma ser o mais seletivo: filtra primeiro por ele.
+        for term in sorted(set(terms), key=len, reverse=True):
+            candidates = [i for i in candidates if term in haystacks[i]]
+            if not candidates:
+                break
+        result = list(candidates)
+        self._last_query, self._last_result = query, result
+        return result
+
+    def matches(self, idx: int, query: str) -> bool:
+        haystack = self._haystacks[idx]
+        return all(term in haystack for term in query.lower().split())
+
+
+def _haystack(ep: dict) -> str:
+    return f"{ep.get('name', '')}\n{ep.get('url', '')}\n{ep.get('method', '')}".lower()
@@ -0,0 +1,319 @@
+"""
+Formatacao da saida `curl -i` para exibicao: separa headers/corpo/[stderr] e indenta JSON.
+- Texto em memoria usa json.loads + json.dumps (em C, mais rapido que qualquer reindentacao em Python).
+- Respostas gravadas em arquivo (SpoolFile) passam pelo JsonReindenter em pedacos, sem montar a arvore.
+- Resultados ficam num LRU chaveado pelo hash do conteudo.
+- ResponseFormatter roda a formatacao fora da thread do Tk.
+"""
+
+import codecs
+import hashlib
+import json
+import queue
+import re
+import threading
+from collections import OrderedDict
+
+from cache import CACHE_MARKER
+from resilience import ATTEMPTS_MARKER
+from spool import SpoolFile
+from timing import TIMING_MARKER
+
+FORMAT_SYNC_LIMIT = 64 * 1024  # abaixo disso formatar na hora e mais barato que agendar
+CACHE_MAX_BYTES = 32 * 1024 * 1024
+CACHE_MAX_ENTRIES = 256
+SPOOL_CHUNK = 1024 * 1024
+TRAILER_MARKERS = ("\n[stderr]", TIMING_MARKER, CACHE_MARKER, ATTEMPTS_MARKER)
+
+_TOKEN = re.compile(r'\s*("[^"\\]*(?:\\.[^"\\]*)*"|[{}\[\],:]|[^\s{}\[\],:"]+)')
+_LITERAL = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?|true|false|null")
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+class FormatCache:
+    """
+    LRU limitado por numero de entradas e por tamanho total do texto guardado.
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, max_bytes: int = CACHE_MAX_BYTES) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._items: OrderedDict[bytes, str] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8", errors="surrogatepass"), digest_size=16).digest()
+
+    def get(self, key: bytes) -> str | None:
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: bytes, value: str) -> None:
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._items[key] = value
+            self._size += len(value)
+            while len(self._items) > self.max_entries or self._size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._size -= len(evicted)
+
+
+_cache = FormatCache()
+
+
+class JsonReindenter:
+    """
+    Reindenta JSON em pedacos (feed/close), com a indentacao de json.dumps(indent=2). Strings e numeros
+    saem como vieram: escapes \\uXXXX e numeros como 1E3 nao sao normalizados como no json.dumps.
+    Levanta ValueError ao encontrar algo que nao e JSON.
+    """
+
+    def __init__(self, indent: int = 2) -> None:
+        self.indent = " " * indent
+        self.depth = 0
+        self._opened: str | None = None
+        self._buf = ""
+        self._seen_value = False
+        # Ultimo token significativo: None (inicio), "o" (abertura), "v" (fim de valor), ":" ou ",".
+        self._prev: str | None = None
+
+    def feed(self, text: str) -> str:
+        self._buf += text
+        return self._consume(final=False)
+
+    def close(self) -> str:
+        out = self._consume(final=True)
+        if self._buf.strip() or self.depth != 0 or not self._seen_value:
+            raise ValueError("JSON incompleto")
+        return out
+
+    def _consume(self, final: bool) -> str:
+        buf = self._buf
+        out: list[str] = []
+        pos = 0
+        size = len(buf)
+        emit = self._emit
+        for m in _TOKEN.finditer(buf):
+            if m.start() != pos:
+                break  # trecho que nao e token: string sem fechamento ou JSON invalido
+            tok = m.group(1)
+            if m.end() == size and not final and tok[0] not in "{}[],:":
+                break  # token pode continuar no proximo pedaco
+            emit(tok, out)
+            pos = m.end()
+        rest = buf[pos:]
+        if final and rest.strip():
+            raise ValueError("JSON invalido")
+        self._buf = rest
+        return "".join(out)
+
+    def _emit(self, tok: str, out: list[str]) -> None:
+        first = tok[0]
+        prev = self._prev
+        if first in "}]":
+            self.depth -= 1
+            if self.depth < 0 or prev not in ("v", "o"):
+                raise ValueError("JSON invalido")
+            if self._opened is not None:
+                if _CLOSERS[self._opened] != first:
+                    raise ValueError("JSON invalido")
+                out.append(first)
+                self._opened = None
+            else:
+                out.append("\n" + self.indent * self.depth + first)
+            self._prev = "v"
+            return
+        if first in ",:":
+            if prev != "v":
+                raise ValueError("JSON invalido")
+        elif prev == "v":
+            raise ValueError("JSON invalido")  # dois valores seguidos, sem virgula
+        if self._opened is not None:
+            out.append("\n" + self.indent * self.depth)
+            self._opened = None
+        if first in "{[":
+            out.append(first)
+            self.depth += 1
+            self._opened = first
+            self._prev = "o"
+        elif first == ",":
+            out.append(",\n" + self.indent * self.depth)
+            self._prev = ","
+        elif first == ":":
+            out.append(": ")
+            self._prev = ":"
+        elif first == '"' or _LITERAL.fullmatch(tok):
+            out.append(tok)
+            self._prev = "v"
+        else:
+            raise ValueError("JSON invalido")
+        self._seen_value = True
+
+
+def split_headers_body(text: str) -> tuple[str | None, str | None]:
+    """
+    Retorna (headers, body) quando detectar formato HTTP; caso contrario (None, None).
+    """
+    if not text:
+        return None, None
+    sep = None
+    if "\r\n\r\n" in text:
+        sep = text.find("\r\n\r\n")
+        header = text[:sep]
+        body = text[sep + 4 :]
+    elif "\n\n" in text:
+        sep = text.find("\n\n")
+        header = text[:sep]
+        body = text[sep + 2 :]
+    else:
+        return None, None
+
+    if not header.strip().startswith("HTTP/"):
+        return None, None
+    return header, body
+
+
+def split_stderr(text: str) -> tuple[str, str]:
+    """
+    Se texto contem bloco [stderr] ou [tempos], separa para nao quebrar parse de JSON.
+    """
+    found = [idx for idx in (text.find(marker) for marker in TRAILER_MARKERS) if idx != -1]
+    if not found:
+        return text, ""
+    idx = min(found)
+    return text[:idx].rstrip(), text[idx:]
+
+
+def try_pretty_json(text: str | None) -> str | None:
+    if text is None:
+        return None
+    candidate = text.strip()
+    if not candidate:
+        return text
+    try:
+        parsed = json.loads(candidate)
+    except json.JSONDecodeError:
+        return None
+    return json.dumps(parsed, indent=2, ensure_ascii=False)
+
+
+def format_response_text(raw: str) -> str:
+    """
+    Tenta separar headers e body; se body for JSON valido, retorna identado.
+    """
+    key = _cache.key(raw)
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+    formatted = _format_uncached(raw)
+    _cache.put(key, formatted)
+    return formatted
+
+
+def _format_uncached(raw: str) -> str:
+    header, body = split_headers_body(raw)
+    if body is None:
+        pretty_full = try_pretty_json(raw)
+        return pretty_full if pretty_full is not None else raw
+
+    # Separa eventual stderr apendado no corpo
+    body_main, suffix = split_stderr(body)
+    pretty_body = try_pretty_json(body_main)
+    if pretty_body is None:
+        return raw
+
+    formatted_body = pretty_body + suffix
+    if header:
+        return f"{header}\n\n{formatted_body}"
+    return formatted_body
+
+
+def format_spool(spool: SpoolFile, end: int, suffix: str = "") -> SpoolFile | None:
+    """
+    Reindenta o JSON dos primeiros `end` bytes do arquivo para um novo SpoolFile, em pedacos.
+    Retorna None se o corpo nao for JSON.
+    """
+    head = spool.read_bytes(0, min(end, 64 * 1024)).decode("utf-8", errors="replace")
+    header, body = split_headers_body(head)
+    if body is None:
+        header, body_start = None, 0
+    else:
+        body_start = len(head.encode("utf-8")) - len(body.encode("utf-8"))
+    if (head if body is None else body).lstrip()[:1] not in ("{", "["):
+        return None
+
+    out = SpoolFile()
+    try:
+        if header:
+            out.write(f"{header}\n\n".encode("utf-8"))
+        reindenter = JsonReindenter()
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        pos = body_start
+        while pos < end:
+            chunk = spool.read_bytes(pos, min(end, pos + SPOOL_CHUNK))
+            if not chunk:
+                break
+            pos += len(chunk)
+            out.write(reindenter.feed(decoder.decode(chunk)).encode("utf-8"))
+        out.write((reindenter.feed(decoder.decode(b"", final=True)) + reindenter.close()).encode("utf-8"))
+        if suffix:
+            out.write(suffix.encode("utf-8"))
+    except (ValueError, OSError):
+        out.close()
+        return None
+    return out
+
+
+class ResponseFormatter:
+    """
+    Formata respostas numa thread propria; resultados (chave, texto ou SpoolFile) voltam por `results`.
+    """
+
+    def __init__(self) -> None:
+        from concurrent.futures import ThreadPoolExecutor  # so a interface usa; a CLI nao paga o import
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="formatar")
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.results: queue.SimpleQueue = queue.SimpleQueue()
+
+    def submit_text(self, key, raw: str) -> None:
+        self._submit(key, format_response_text, raw)
+
+    def submit_spool(self, key, spool: SpoolFile, end: int, suffix: str = "") -> None:
+        self._submit(key, format_spool, spool, end, suffix)
+
+    def _submit(self, key, fn, *args) -> None:
+        with self._lock:
+            self._pending += 1
+        self._executor.submit(self._run, key, fn, *args)
+
+    def _run(self, key, fn, *args) -> None:
+        try:
+            result = fn(*args)
+        except Exception:  # formatacao e opcional; o texto cru ja esta na tela
+            result = None
+        with self._lock:
+            self._pending -= 1
+        self.results.put((key, result))
+
+    def pending(self) -> bool:
+        with self._lock:
+            return self._pending > 0 or not self.results.empty()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,2157 @@
+"""
+Interface Tkinter do EndpointTester.
+- Permite definir nome, URL, metodo, headers e corpo.
+- Chama curl internamente e persiste configuracoes em endpoints.json.
+"""
+
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import tkinter as tk
+from tkinter import filedialog, messagebox, ttk
+from tkinter.scrolledtext import ScrolledText
+import tkinter.font as tkfont
+
+from cache import ResponseCache
+from endpoints import EndpointStore
+from formatting import FORMAT_SYNC_LIMIT, ResponseFormatter, format_response_text
+from history import HistoryStore
+from importers import ImportBatch, read_curl, read_file
+from loadtest import (
+    DEFAULT_LOAD_TRANSPORT,
+    DEFAULT_PROCESSES,
+    DEFAULT_RATE,
+    DEFAULT_WORKERS,
+    LoadTest,
+    MultiProcessLoadTest,
+    OpenLoopLoadTest,
+    export_report,
+    render_histogram,
+)
+from monitor import Monitor, monitor_interval, parse_monitor
+from paths import (
+    CACHE_DIR,
+    DATA_FILE,
+    ENDPOINTS_LOG_FILE,
+    HISTORY_FILE,
+    PROFILE_DIR,
+    RECORDING_FILE,
+    UI_STATE_FILE,
+)
+from payload import DEFAULT_METHOD, METHODS, build_payload, headers_to_text, parse_headers
+from replay import RECORD_MAX_BYTES, Recorder
+from runner import DEFAULT_PARALLELISM, CollectionRunner, dependencies, select_with_dependencies
+from spans import SpanStats, Trace, profiling, save_profile, span
+from spool import SpoolFile
+from timing import HISTORY_LIMIT, TIMING_MARKER, render_waterfall
+from transport import (
+    DEFAULT_TRANSPORT,
+    HEAD_SCAN_LIMIT,
+    TRANSPORTS,
+    RequestControl,
+    StreamBuffer,
+    get_transport,
+    response_status,
+)
+from resilience import parse_policy, policy_fields
+from uploads import form_to_text
+
+DEFAULT_TIMEOUT = 30
+MAX_WORKERS = 16
+POLL_INTERVAL_MS = 16  # ~60 fps enquanto houver requisicoes em andamento
+LOAD_REFRESH_MS = 250
+RUNNER_REFRESH_MS = 100
+STREAM_STATUS_MS = 250
+FILTER_DEBOUNCE_MS = 120
+MONITOR_REFRESH_MS = 250
+IMPORT_REFRESH_MS = 100
+IMPORT_ERRORS_SHOWN = 10
+MONITOR_FAILING_COLOR = "#b00020"
+MAX_INSERT_CHARS = 256 * 1024  # limite por ciclo de polling para o insert nao travar a UI
+HISTORY_PREVIEW_BYTES = 256 * 1024
+LOAD_MODES = {
+    "closed": "Workers fixos",
+    "open": "Taxa fixa (req/s)",
+}
+BODY_MODES = {
+    "text": "Texto (--data-raw)",
+    "file": "Arquivo",
+    "form": "Multipart",
+}
+IMPORT_FORMATS = {"": "Detectar", "har": "HAR", "openapi": "OpenAPI", "curl": "Comandos curl"}
+CACHE_LABELS = {"hit": "[cache: fresca]", "revalidated": "[cache: 304]", "miss": "[cache: falta]"}
+
+
+class RequestJob(RequestControl):
+    """
+    Requisicao despachada para o pool, com o transporte escolhido no momento do envio.
+    """
+
+    def __init__(
+        self,
+        job_id: int,
+        payload: dict,
+        timeout: float,
+        transport: str = DEFAULT_TRANSPORT,
+        cache: ResponseCache | None = None,
+        trace: Trace | None = None,
+    ) -> None:
+        super().__init__(timeout)
+        self.id = job_id
+        self.payload = payload
+        self.transport = transport
+        self.cache = cache
+        self.trace = trace
+        self.started_at = time.monotonic()
+        self.stream = StreamBuffer()
+
+    @property
+    def label(self) -> str:
+        return f"#{self.id} {self.payload.get('name', '')}"
+
+
+class RequestDispatcher:
+    """
+    Executa requisicoes em um pool limitado de threads.
+    Resultados voltam pela fila `results` para serem consumidos no loop do Tk.
+    """
+
+    def __init__(self, runner, max_workers: int = MAX_WORKERS) -> None:
+        self._runner = runner
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="enviar")
+        self._jobs: dict[int, RequestJob] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.results: queue.SimpleQueue = queue.SimpleQueue()
+
+    def submit(
+        self,
+        payload: dict,
+        timeout: float,
+        transport: str = DEFAULT_TRANSPORT,
+        cache: ResponseCache | None = None,
+        trace: Trace | None = None,
+    ) -> RequestJob:
+        job = RequestJob(next(self._ids), payload, timeout, transport, cache, trace)
+        if trace is not None:
+            trace.mark()
+        with self._lock:
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job)
+        return job
+
+    def _run(self, job: RequestJob) -> None:
+        try:
+            if job.cancelled.is_set():
+                result = ("", "Requisicao cancelada antes de iniciar.", 1)
+            else:
+                job.started_at = time.monotonic()
+                if job.trace is not None:
+                    job.trace.add_since_mark("fila")
+                result = self._runner(job)
+        except Exception as exc:  # nao deixa a thread morrer sem avisar a UI
+            result = ("", f"Erro inesperado: {exc}", 1)
+        finally:
+            with self._lock:
+                self._jobs.pop(job.id, None)
+            if job.trace is not None:
+                job.trace.mark()
+        self.results.put((job, result))
+
+    def in_flight(self) -> list[RequestJob]:
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda job: job.id)
+
+    def cancel(self, job_id: int) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return False
+        job.cancel()
+        return True
+
+    def cancel_all(self) -> int:
+        jobs = self.in_flight()
+        for job in jobs:
+            job.cancel()
+        return len(jobs)
+
+    def shutdown(self) -> None:
+        self.cancel_all()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _human_bytes(size: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def _fixed_font(widget: tk.Misc) -> tkfont.Font:
+    if "TkFixedFont" in tkfont.names():
+        return tkfont.nametofont("TkFixedFont")
+    return tkfont.Font(widget, family="Courier New", size=10)
+
+
+class VirtualTextView(ttk.Frame):
+    """
+    Visualizador de respostas grandes: so as linhas visiveis de um SpoolFile ficam no widget Text.
+    A barra de rolagem trabalha sobre o total de linhas do arquivo.
+    """
+
+    def __init__(self, master: tk.Misc, font: tkfont.Font) -> None:
+        super().__init__(master)
+        self.font = font
+        self.spool: SpoolFile | None = None
+        self.caption = ""
+        self.top = 0
+        self.follow = True
+        self.info_var = tk.StringVar()
+        self.goto_var = tk.StringVar()
+
+        bar = ttk.Frame(self)
+        bar.pack(fill="x", pady=(0, 4))
+        ttk.Label(bar, textvariable=self.info_var).pack(side="left")
+        ttk.Button(bar, text="Ir", width=3, style="LabelBtn.TButton", command=self.on_goto).pack(side="right")
+        goto_entry = ttk.Entry(bar, textvariable=self.goto_var, width=10)
+        goto_entry.pack(side="right", padx=(4, 4))
+        goto_entry.bind("<Return>", lambda event: self.on_goto())
+        ttk.Label(bar, text="Linha").pack(side="right")
+
+        body = ttk.Frame(self)
+        body.pack(fill="both", expand=True)
+        self.vbar = ttk.Scrollbar(body, orient="vertical", command=self.on_scrollbar)
+        self.vbar.pack(side="right", fill="y")
+        self.text = tk.Text(body, wrap="none", font=font, height=10)
+        self.text.pack(side="left", fill="both", expand=True)
+        self.text.bind("<Configure>", lambda event: self.render())
+        self.text.bind("<MouseWheel>", self.on_wheel)
+        self.text.bind("<Button-4>", lambda event: self.scroll_lines(-3))
+        self.text.bind("<Button-5>", lambda event: self.scroll_lines(3))
+
+    def attach(self, spool: SpoolFile, caption: str) -> None:
+        self.spool = spool
+        self.caption = caption
+        self.top = 0
+        self.follow = True
+        self.refresh()
+
+    def detach(self) -> None:
+        self.spool = None
+        self.text.delete("1.0", tk.END)
+
+    def visible_lines(self) -> int:
+        height = self.text.winfo_height()
+        return max(1, height // max(1, self.font.metrics("linespace")))
+
+    def refresh(self) -> None:
+        """
+        Chamado enquanto o arquivo cresce: acompanha o fim se o usuario estiver nele.
+        """
+        if self.spool is None:
+            return
+        if self.follow:
+            self.top = max(0, self.spool.line_count - self.visible_lines())
+        self.render()
+
+    def render(self) -> None:
+        if self.spool is None:
+            return
+        total = self.spool.line_count
+        visible = self.visible_lines()
+        self.top = max(0, min(self.top, total - visible))
+        lines = self.spool.read_lines(self.top, visible)
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", "\n".join(lines))
+        if total:
+            self.vbar.set(self.top / total, min(1.0, (self.top + visible) / total))
+        else:
+            self.vbar.set(0.0, 1.0)
+        self.info_var.set(
+            f"{self.caption} | {_human_bytes(self.spool.size)}, {total} linhas | "
+            f"exibindo {self.top + 1}-{self.top + len(lines)}"
+        )
+
+    def scroll_lines(self, delta: int) -> None:
+        if self.spool is None:
+            return
+        total = self.spool.line_count
+        self.top = max(0, min(self.top + delta, total - self.visible_lines()))
+        self.follow = self.top >= total - self.visible_lines()
+        self.render()
+
+    def on_scrollbar(self, *args) -> None:
+        if self.spool is None:
+            return
+        if args[0] == "moveto":
+            total = self.spool.line_count
+            self.top = int(float(args[1]) * total)
+            self.follow = self.top >= total - self.visible_lines()
+            self.render()
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= self.visible_lines()
+            self.scroll_lines(step)
+
+    def on_wheel(self, event: tk.Event) -> None:
+        self.scroll_lines(-3 if event.delta > 0 else 3)
+
+    def on_goto(self) -> None:
+        try:
+            line = int(self.goto_var.get().strip())
+        except ValueError:
+            return
+        self.top = max(0, line - 1)
+        self.follow = False
+        self.render()
+
+
+class LoadTestWindow(tk.Toplevel):
+    """
+    Janela do modo "Carga" para um endpoint salvo: parametros, visao ao vivo e exportacao.
+    """
+
+    def __init__(self, master: tk.Misc, payload: dict, timeout: float) -> None:
+        super().__init__(master)
+        self.title(f"Carga - {payload.get('name', '')}")
+        self.geometry("720x560")
+        self.payload = payload
+        self.timeout = timeout
+        self.test: LoadTest | None = None
+        self._last_count = 0
+        self._last_time = 0.0
+
+        self.workers_var = tk.StringVar(value=str(DEFAULT_WORKERS))
+        self.total_var = tk.StringVar(value="1000")
+        self.duration_var = tk.StringVar(value="")
+        self.transport_var = tk.StringVar(value=DEFAULT_LOAD_TRANSPORT)
+        self.mode_var = tk.StringVar(value=LOAD_MODES["closed"])
+        self.rate_var = tk.StringVar(value=str(DEFAULT_RATE))
+        self.processes_var = tk.StringVar(value=str(DEFAULT_PROCESSES))
+        self.summary_var = tk.StringVar(value="Aguardando inicio.")
+
+        self._build()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def _build(self) -> None:
+        root = ttk.Frame(self, padding=12)
+        root.pack(fill="both", expand=True)
+
+        params = ttk.LabelFrame(root, text=self.payload.get("url", ""), padding=10, style="Section.TLabelframe")
+        params.pack(fill="x")
+        fields = [
+            ("Workers", self.workers_var),
+            ("Total de requisicoes", self.total_var),
+            ("Duracao (s)", self.duration_var),
+        ]
+        for col, (label, var) in enumerate(fields):
+            ttk.Label(params, text=label).grid(row=0, column=col * 2, sticky="w")
+            ttk.Entry(params, textvariable=var, width=10).grid(row=0, column=col * 2 + 1, sticky="w", padx=(4, 12))
+        ttk.Label(params, text="Motor").grid(row=0, column=6, sticky="w")
+        ttk.Combobox(
+            params,
+            width=10,
+            textvariable=self.transport_var,
+            values=list(TRANSPORTS),
+            state="readonly",
+        ).grid(row=0, column=7, sticky="w", padx=(4, 0))
+        ttk.Label(params, text="Modo").grid(row=1, column=0, sticky="w", pady=(8, 0))
+        ttk.Combobox(
+            params,
+            width=18,
+            textvariable=self.mode_var,
+            values=list(LOAD_MODES.values()),
+            state="readonly",
+        ).grid(row=1, column=1, columnspan=3, sticky="w", padx=(4, 12), pady=(8, 0))
+        ttk.Label(params, text="Taxa (req/s)").grid(row=1, column=4, sticky="w", pady=(8, 0))
+        ttk.Entry(params, textvariable=self.rate_var, width=10).grid(
+            row=1, column=5, sticky="w", padx=(4, 12), pady=(8, 0)
+        )
+        ttk.Label(params, text="Processos").grid(row=1, column=6, sticky="w", pady=(8, 0))
+        ttk.Entry(params, textvariable=self.processes_var, width=10).grid(
+            row=1, column=7, sticky="w", padx=(4, 0), pady=(8, 0)
+        )
+
+        buttons = ttk.Frame(root, padding=(0, 8))
+        buttons.pack(fill="x")
+        self.start_btn = ttk.Button(buttons, text="Iniciar", command=self.start)
+        self.start_btn.pack(side="left", padx=(0, 8))
+        ttk.Button(buttons, text="Parar", command=self.stop).pack(side="left", padx=(0, 8))
+        ttk.Button(buttons, text="Exportar JSON", command=self.export).pack(side="left")
+
+        ttk.Label(root, textvariable=self.summary_var, justify="left", anchor="w").pack(fill="x", pady=(0, 8))
+        self.histogram_box = ScrolledText(root, height=18, font=_fixed_font(self))
+        self.histogram_box.pack(fill="both", expand=True)
+
+    def _read_int(self, var: tk.StringVar, label: str) -> int | None:
+        text = var.get().strip()
+        if not text:
+            return None
+        try:
+            return int(text)
+        except ValueError:
+            raise ValueError(f"{label} invalido; informe um numero inteiro.") from None
+
+    def start(self) -> None:
+        if self.test is not None and self.test.is_running():
+            return
+        try:
+            workers = self._read_int(self.workers_var, "Workers") or DEFAULT_WORKERS
+            total = self._read_int(self.total_var, "Total de requisicoes")
+            duration = self._read_int(self.duration_var, "Duracao")
+            processes = self._read_int(self.processes_var, "Processos") or 1
+            if self.mode_var.get() == LOAD_MODES["open"]:
+                # Em taxa fixa, "Workers" e o limite de requisicoes simultaneas.
+                test = OpenLoopLoadTest(
+                    self.payload,
+                    rate=self._read_int(self.rate_var, "Taxa") or DEFAULT_RATE,
+                    duration=duration,
+                    transport=self.transport_var.get(),
+                    workers=workers,
+                    timeout=self.timeout,
+                )
+            else:
+                test = LoadTest(
+                    self.payload,
+                    transport=self.transport_var.get(),
+                    workers=workers,
+                    total=total,
+                    duration=duration,
+                    timeout=self.timeout,
+                )
+            # Workers e requisicoes sao divididos entre os processos; com 1 processo roda aqui mesmo.
+            self.test = MultiProcessLoadTest(test, processes) if processes > 1 else test
+        except ValueError as exc:
+            messagebox.showerror("Erro", str(exc), parent=self)
+            return
+        self._last_count = 0
+        self._last_time = time.monotonic()
+        self.test.start()
+        self.after(LOAD_REFRESH_MS, self._refresh)
+
+    def stop(self) -> None:
+        if self.test is not None:
+            self.test.stop()
+
+    def _refresh(self) -> None:
+        if self.test is None or not self.winfo_exists():
+            return
+        snap = self.test.snapshot()
+        now = time.monotonic()
+        window = now - self._last_time
+        current_rate = (snap["requests"] - self._last_count) / window if window > 0 else 0.0
+        self._last_count, self._last_time = snap["requests"], now
+
+        running = self.test.is_running()
+        state = "Em execucao" if running else "Concluido"
+        self.summary_var.set(
+            f"{state}: {snap['requests']} req em {snap['elapsed']:.1f}s | "
+            f"{snap['throughput']:.1f} req/s (atual {current_rate:.1f}) | "
+            f"erros {snap['errors']} ({snap['error_rate']:.1%})\n"
+            f"p50 {snap['p50_ms']:.2f} ms | p90 {snap['p90_ms']:.2f} ms | "
+            f"p99 {snap['p99_ms']:.2f} ms | max {snap['max_ms']:.2f} ms | "
+            f"status {snap['status_codes']}"
+        )
+        if "target_rate" in snap:
+            self.summary_var.set(
+                self.summary_var.get() + "\n"
+                f"taxa alvo {snap['target_rate']:g} req/s, obtida {snap['achieved_rate']:.1f} | "
+                f"slots perdidos {snap['missed_slots']} (atraso max {snap['max_send_lag_ms']:.1f} ms) | "
+                f"p99.9 {snap['p99.9_ms']:.2f} ms | p99.99 {snap['p99.99_ms']:.2f} ms | "
+                f"servico p99 {snap['service_p99_ms']:.2f} ms"
+            )
+        self.histogram_box.delete("1.0", tk.END)
+        self.histogram_box.insert(tk.END, render_histogram(snap["histogram"]))
+        if running:
+            self.after(LOAD_REFRESH_MS, self._refresh)
+
+    def export(self) -> None:
+        if self.test is None:
+            messagebox.showinfo("Carga", "Nenhum teste executado ainda.", parent=self)
+            return
+        path = filedialog.asksaveasfilename(
+            parent=self,
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json")],
+            initialfile="carga.json",
+        )
+        if path:
+            export_report(self.test.report(), path)
+
+    def on_close(self) -> None:
+        self.stop()
+        self.destroy()
+
+
+class HistoryWindow(tk.Toplevel):
+    """
+    Navegacao no historico de envios; a lista vem so do indice e o registro e lido ao selecionar.
+    """
+
+    ALL = "(todos)"
+    STATUS_FILTERS = {"(todos)": None, "2xx": 2, "3xx": 3, "4xx": 4, "5xx": 5, "sem resposta": 0}
+
+    def __init__(self, master: tk.Misc, store: HistoryStore, name: str | None = None) -> None:
+        super().__init__(master)
+        self.title("Historico")
+        self.geometry("900x600")
+        self.store = store
+        self._before: int | None = None
+        self.name_var = tk.StringVar(value=name or self.ALL)
+        self.status_var = tk.StringVar(value=self.ALL)
+        self.count_var = tk.StringVar()
+        self._build()
+        self.reload()
+
+    def _build(self) -> None:
+        root = ttk.Frame(self, padding=12)
+        root.pack(fill="both", expand=True)
+
+        filters = ttk.Frame(root)
+        filters.pack(fill="x")
+        ttk.Label(filters, text="Endpoint").pack(side="left")
+        ttk.Combobox(
+            filters, width=28, textvariable=self.name_var, values=[self.ALL] + self.store.names()
+        ).pack(side="left", padx=(4, 12))
+        ttk.Label(filters, text="Status").pack(side="left")
+        ttk.Combobox(
+            filters, width=12, textvariable=self.status_var, values=list(self.STATUS_FILTERS), state="readonly"
+        ).pack(side="left", padx=(4, 12))
+        ttk.Button(filters, text="Filtrar", command=self.reload).pack(side="left", padx=(0, 8))
+        ttk.Button(filters, text="Mais antigos", command=self.load_more).pack(side="left")
+        ttk.Label(filters, textvariable=self.count_var).pack(side="right")
+
+        panes = ttk.Panedwindow(root, orient=tk.VERTICAL)
+        panes.pack(fill="both", expand=True, pady=(8, 0))
+        list_frame = ttk.Frame(panes)
+        self.tree = ttk.Treeview(list_frame, columns=("quando", "endpoint", "status"), show="headings", height=12)
+        for column, text, width in (("quando", "Quando", 160), ("endpoint", "Endpoint", 420), ("status", "Status", 80)):
+            self.tree.heading(column, text=text)
+            self.tree.column(column, width=width, anchor="w")
+        scroll = ttk.Scrollbar(list_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scroll.set)
+        self.tree.pack(side="left", fill="both", expand=True)
+        scroll.pack(side="right", fill="y")
+        self.tree.bind("<<TreeviewSelect>>", self.on_select)
+        panes.add(list_frame, weight=1)
+        self.detail_box = ScrolledText(panes, height=16, font=_fixed_font(self))
+        panes.add(self.detail_box, weight=2)
+
+    def reload(self) -> None:
+        self.tree.delete(*self.tree.get_children())
+        self._before = None
+        self.load_more()
+
+    def load_more(self) -> None:
+        name = self.name_var.get().strip()
+        positions = self.store.latest(
+            name=None if name in ("", self.ALL) else name,
+            status_class=self.STATUS_FILTERS.get(self.status_var.get()),
+            before=self._before,
+        )
+        for position in positions:
+            when, ep_name, status = self.store.summary(position)
+            self.tree.insert(
+                "",
+                tk.END,
+                iid=str(position),
+                values=(time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(when)), ep_name, status or "-"),
+            )
+        if positions:
+            self._before = positions[-1]
+        self.count_var.set(f"{len(self.tree.get_children())} de {len(self.store)} envios")
+
+    def on_select(self, _event=None) -> None:
+        selection = self.tree.selection()
+        if not selection:
+            return
+        try:
+            record = self.store.read(int(selection[0]))
+        except (OSError, ValueError) as exc:
+            messagebox.showerror("Historico", f"Nao foi possivel ler o registro: {exc}", parent=self)
+            return
+        response, cut = self.store.read_response(record, HISTORY_PREVIEW_BYTES)
+        lines = [f"$ {record.get('cmd', '')}", ""]
+        if record.get("timing"):
+            lines += ["[tempos]", render_waterfall(record["timing"]), ""]
+        lines.append(response)
+        if cut:
+            lines.append(f"\n[resposta cortada em {_human_bytes(HISTORY_PREVIEW_BYTES)}; completa em {record['response_file']}]")
+        if record.get("stderr"):
+            lines += ["", "[stderr]", record["stderr"]]
+        self.detail_box.delete("1.0", tk.END)
+        self.detail_box.insert(tk.END, "\n".join(lines))
+
+
+class CollectionWindow(tk.Toplevel):
+    """
+    Roda a colecao (ou os endpoints selecionados, com suas dependencias) em paralelo, com resultado ao vivo.
+    """
+
+    COLUMNS = (("endpoint", "Endpoint", 260), ("depende", "Depende de", 160), ("resultado", "Resultado", 200),
+               ("status", "Status", 60), ("latencia", "Latencia (ms)", 100))
+    RESULT_LABELS = {"passed": "ok", "failed": "falhou", "skipped": "pulado"}
+
+    def __init__(self, master: tk.Misc, endpoints: list[dict], timeout: float, transport: str) -> None:
+        super().__init__(master)
+        self.title("Colecao")
+        self.geometry("860x560")
+        self.endpoints = endpoints
+        self.timeout = timeout
+        self.transport = transport
+        self.runner: CollectionRunner | None = None
+        self._rows: dict[str, str] = {}
+        self.parallel_var = tk.StringVar(value=str(DEFAULT_PARALLELISM))
+        self.summary_var = tk.StringVar(value="Selecione endpoints (ou rode todos).")
+        self._build()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def _build(self) -> None:
+        root = ttk.Frame(self, padding=12)
+        root.pack(fill="both", expand=True)
+
+        buttons = ttk.Frame(root)
+        buttons.pack(fill="x")
+        ttk.Button(buttons, text="Rodar selecionados", command=self.run_selected).pack(side="left", padx=(0, 8))
+        ttk.Button(buttons, text="Rodar todos", command=self.run_all).pack(side="left", padx=(0, 8))
+        ttk.Button(buttons, text="Parar", command=self.stop).pack(side="left", padx=(0, 12))
+        ttk.Label(buttons, text="Em paralelo").pack(side="left")
+        ttk.Entry(buttons, textvariable=self.parallel_var, width=6).pack(side="left", padx=(4, 0))
+
+        ttk.Label(root, textvariable=self.summary_var, anchor="w").pack(fill="x", pady=(8, 8))
+        tree_frame = ttk.Frame(root)
+        tree_frame.pack(fill="both", expand=True)
+        self.tree = ttk.Treeview(tree_frame, columns=[c[0] for c in self.COLUMNS], show="headings")
+        for column, text, width in self.COLUMNS:
+            self.tree.heading(column, text=text)
+            self.tree.column(column, width=width, anchor="w")
+        scroll = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scroll.set)
+        self.tree.pack(side="left", fill="both", expand=True)
+        scroll.pack(side="right", fill="y")
+        for idx, ep in enumerate(self.endpoints):
+            iid = str(idx)
+            self._rows[ep["name"]] = iid
+            self.tree.insert("", tk.END, iid=iid, values=(ep["name"], ", ".join(dependencies(ep)), "", "", ""))
+
+    def run_all(self) -> None:
+        self._start([ep["name"] for ep in self.endpoints])
+
+    def run_selected(self) -> None:
+        names = [self.endpoints[int(iid)]["name"] for iid in self.tree.selection()]
+        if not names:
+            self.summary_var.set("Selecione ao menos um endpoint (Ctrl/Shift para varios).")
+            return
+        self._start(names)
+
+    def _start(self, names: list[str]) -> None:
+        if self.runner is not None and self.runner.is_running():
+            return
+        try:
+            parallelism = int(self.parallel_var.get())
+            selected = select_with_dependencies(self.endpoints, names)
+            self.runner = CollectionRunner(selected, parallelism, self.timeout, self.transport)
+        except ValueError as exc:
+            messagebox.showerror("Colecao", str(exc), parent=self)
+            return
+        queued = {ep["name"] for ep in selected}
+        for ep in self.endpoints:
+            self.tree.set(self._rows[ep["name"]], "resultado", "aguardando" if ep["name"] in queued else "")
+            self.tree.set(self._rows[ep["name"]], "status", "")
+            self.tree.set(self._rows[ep["name"]], "latencia", "")
+        self.runner.start()
+        self._refresh()
+
+    def stop(self) -> None:
+        if self.runner is not None:
+            self.runner.stop()
+
+    def _refresh(self) -> None:
+        runner = self.runner
+        while True:
+            try:
+                result = runner.results.get_nowait()
+            except queue.Empty:
+                break
+            iid = self._rows[result["name"]]
+            label = self.RESULT_LABELS[result["result"]]
+            if result.get("reason"):
+                label += f" ({result['reason']})"
+            self.tree.set(iid, "resultado", label)
+            self.tree.set(iid, "status", result.get("status") or "-")
+            if "latency_ms" in result:
+                self.tree.set(iid, "latencia", f"{result['latency_ms']:.1f}")
+        summary = runner.summary()
+        done = summary["passed"] + summary["failed"] + summary["skipped"]
+        self.summary_var.set(
+            f"{done}/{summary['total']} concluidos em {summary['elapsed_s']:.2f}s | "
+            f"ok {summary['passed']} | falhou {summary['failed']} | pulado {summary['skipped']}"
+        )
+        if runner.is_running() or not runner.results.empty():
+            self.after(RUNNER_REFRESH_MS, self._refresh)
+
+    def on_close(self) -> None:
+        self.stop()
+        self.destroy()
+
+
+class ImportWindow(tk.Toplevel):
+    """
+    Importa endpoints de um HAR, OpenAPI ou arquivo de comandos curl (ou de comandos colados). A leitura roda
+    numa thread; ao terminar, a leva e gravada de uma vez pela janela principal.
+    """
+
+    def __init__(self, master: "EndpointTester") -> None:
+        super().__init__(master)
+        self.title("Importar endpoints")
+        self.geometry("760x520")
+        self.app = master
+        self.batch: ImportBatch | None = None
+        self._thread: threading.Thread | None = None
+        self._error: str | None = None
+        self.file_var = tk.StringVar()
+        self.format_var = tk.StringVar(value=IMPORT_FORMATS[""])
+        self.static_var = tk.BooleanVar(value=False)
+        self.base_url_var = tk.StringVar()
+        self.summary_var = tk.StringVar(value="Escolha um arquivo ou cole comandos curl.")
+        self._build()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def _build(self) -> None:
+        root = ttk.Frame(self, padding=12)
+        root.pack(fill="both", expand=True)
+
+        params = ttk.LabelFrame(root, text="Arquivo", padding=10, style="Section.TLabelframe")
+        params.pack(fill="x")
+        params.columnconfigure(1, weight=1)
+        ttk.Label(params, text="HAR, OpenAPI ou curl").grid(row=0, column=0, sticky="w")
+        ttk.Entry(params, textvariable=self.file_var).grid(row=0, column=1, columnspan=3, sticky="ew", padx=(4, 8))
+        ttk.Button(params, text="Escolher...", command=self.choose_file).grid(row=0, column=4, sticky="e")
+        ttk.Label(params, text="Formato").grid(row=1, column=0, sticky="w", pady=(8, 0))
+        ttk.Combobox(
+            params,
+            width=16,
+            textvariable=self.format_var,
+            values=list(IMPORT_FORMATS.values()),
+            state="readonly",
+        ).grid(row=1, column=1, sticky="w", padx=(4, 12), pady=(8, 0))
+        ttk.Checkbutton(params, text="HAR: incluir imagens, css, js", variable=self.static_var).grid(
+            row=1, column=2, columnspan=3, sticky="w", pady=(8, 0)
+        )
+        ttk.Label(params, text="URL base (OpenAPI)").grid(row=2, column=0, sticky="w", pady=(8, 0))
+        ttk.Entry(params, textvariable=self.base_url_var).grid(
+            row=2, column=1, columnspan=4, sticky="ew", padx=(4, 0), pady=(8, 0)
+        )
+
+        ttk.Label(root, text="Ou cole comandos curl (um ou varios):").pack(fill="x", pady=(10, 4))
+        self.curl_text = ScrolledText(root, height=12, font=_fixed_font(self))
+        self.curl_text.pack(fill="both", expand=True)
+
+        buttons = ttk.Frame(root, padding=(0, 8))
+        buttons.pack(fill="x")
+        ttk.Button(buttons, text="Importar", command=self.start).pack(side="left", padx=(0, 8))
+        ttk.Button(buttons, text="Parar", command=self.stop).pack(side="left")
+        ttk.Label(root, textvariable=self.summary_var, anchor="w").pack(fill="x")
+
+    def choose_file(self) -> None:
+        path = filedialog.askopenfilename(
+            parent=self,
+            title="Arquivo para importar",
+            filetypes=[("HAR, OpenAPI, curl", "*.har *.json *.yaml *.yml *.sh *.txt"), ("Todos", "*.*")],
+        )
+        if path:
+            self.file_var.set(path)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        path = self.file_var.get().strip()
+        text = self.curl_text.get("1.0", tk.END)
+        if not path and not text.strip():
+            self.summary_var.set("Escolha um arquivo ou cole comandos curl.")
+            return
+        fmt = next(key for key, label in IMPORT_FORMATS.items() if label == self.format_var.get())
+        include_static, base_url = self.static_var.get(), self.base_url_var.get().strip()
+        batch = self.batch = ImportBatch()
+        self._error = None
+
+        def _read() -> None:
+            try:
+                if path:
+                    batch.extend(read_file(Path(path), fmt, include_static, base_url, batch.errors))
+                else:
+                    batch.extend(read_curl(text.splitlines(), batch.errors))
+            except (OSError, ValueError) as exc:
+                self._error = str(exc)
+
+        self._thread = threading.Thread(target=_read, name="importacao", daemon=True)
+        self._thread.start()
+        self._refresh()
+
+    def stop(self) -> None:
+        if self.batch is not None:
+            self.batch.cancel()
+
+    def _refresh(self) -> None:
+        if not self.winfo_exists():
+            return
+        batch = self.batch
+        if self._thread.is_alive():
+            self.summary_var.set(f"Lendo... {batch.read} lido(s), {len(batch.payloads)} novo(s) na leva")
+            self.after(IMPORT_REFRESH_MS, self._refresh)
+            return
+        if self._error is not None:
+            self.summary_var.set(self._error)
+            messagebox.showerror("Importar", self._error, parent=self)
+            return
+        if batch.cancelled.is_set():
+            self.summary_var.set(f"Interrompido apos {batch.read} lido(s); nada foi gravado.")
+            return
+        self.app.import_batch(batch)
+        self.summary_var.set(batch.summary())
+        if batch.errors:
+            shown = "\n".join(batch.errors[:IMPORT_ERRORS_SHOWN])
+            more = len(batch.errors) - IMPORT_ERRORS_SHOWN
+            if more > 0:
+                shown += f"\n... e mais {more}"
+            messagebox.showwarning("Importar", f"Entradas ignoradas por erro:\n{shown}", parent=self)
+
+    def on_close(self) -> None:
+        self.stop()
+        self.destroy()
+
+
+class EndpointTester(tk.Tk):
+    def __init__(self) -> None:
+        super().__init__()
+        self.title("EndpointTester")
+        self.geometry("1100x750")
+        self._configure_style()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        self.name_var = tk.StringVar()
+        self.url_var = tk.StringVar()
+        self.method_var = tk.StringVar(value=DEFAULT_METHOD)
+        self.depends_var = tk.StringVar()
+        self.compressed_var = tk.BooleanVar(value=False)
+        self.body_mode_var = tk.StringVar(value=BODY_MODES["text"])
+        self.body_file_var = tk.StringVar()
+        self.retries_var = tk.StringVar(value="0")
+        self.retry_status_var = tk.StringVar()
+        self.backoff_var = tk.StringVar()
+        self.deadline_var = tk.StringVar()
+        self.hedge_var = tk.BooleanVar(value=False)
+        self.monitor_var = tk.StringVar()
+        self.status_var = tk.StringVar(value="Pronto.")
+        self.timeout_var = tk.StringVar(value=str(DEFAULT_TIMEOUT))
+        self.transport_var = tk.StringVar(value=DEFAULT_TRANSPORT)
+        self.cache_var = tk.BooleanVar(value=False)
+        self.record_var = tk.BooleanVar(value=False)
+        self.spans_var = tk.BooleanVar(value=False)
+        self.profile_next_var = tk.BooleanVar(value=False)
+        self.spans_status_var = tk.StringVar()
+
+        self.store = EndpointStore(DATA_FILE, ENDPOINTS_LOG_FILE)
+        self.endpoints: list[dict] = self.store.items
+        self.filter_var = tk.StringVar()
+        self._visible: list[int] | None = None  # linha da lista -> indice do endpoint (None: todos)
+        self._filter_after: str | None = None
+        self.dispatcher = RequestDispatcher(self._run_curl)
+        self.formatter = ResponseFormatter()
+        self.response_cache = ResponseCache(CACHE_DIR)
+        self.recorder = Recorder(RECORDING_FILE)
+        self.timing_history: dict[tuple[str, str], list[dict]] = {}
+        self.span_stats = SpanStats()
+        self.monitor = Monitor()
+        self._monitor_drawn: dict[str, int] = {}  # nome -> sondas ja desenhadas na lista
+        self._open_traces: dict[int, Trace] = {}  # envios esperando a formatacao em segundo plano
+        self.history_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="historico")
+        try:
+            self.history: HistoryStore | None = HistoryStore(HISTORY_FILE)
+        except (OSError, ValueError):
+            self.history = None
+        self._polling = False
+        self._inflight_ids: list[int] = []
+        self._pane_job: RequestJob | None = None
+        self._pane_cmd = ""
+        self._stream_status_at = 0.0
+        self.ui_state: dict = {}
+        self._load_ui_state()
+        self._build_ui()
+        self.load_endpoints()
+        self.apply_ui_state()
+        self.after(MONITOR_REFRESH_MS, self._refresh_monitor)
+
+    def _configure_style(self) -> None:
+        style = ttk.Style(self)
+        try:
+            style.theme_use("clam")
+        except tk.TclError:
+            pass
+        style.configure("TLabel", padding=(2, 2))
+        style.configure("TButton", padding=(10, 6))
+        style.configure("Section.TLabelframe", padding=10)
+        style.configure("Section.TLabelframe.Label", padding=(6, 0))
+        style.configure("Card.TFrame", relief="groove", borderwidth=1, padding=10)
+        style.configure("Toolbar.TButton", padding=(4, 2))
+        style.configure("LabelBtn.TButton", padding=(2, 1))
+
+    def _build_ui(self) -> None:
+        root = ttk.Frame(self, padding=16)
+        root.pack(fill="both", expand=True)
+
+        # Paned horizontal: lista (esquerda) e formulario (direita)
+        self.main_panes = ttk.Panedwindow(root, orient="horizontal")
+        self.main_panes.pack(fill="both", expand=True)
+
+        # Lista de endpoints salvos (coluna esquerda)
+        list_label = ttk.Frame(self.main_panes)
+        ttk.Label(list_label, text="Endpoints salvos").pack(side="left")
+        ttk.Button(
+            list_label,
+            text="+",
+            width=2,
+            style="LabelBtn.TButton",
+            command=self.clear_form,
+        ).pack(side="left", padx=(8, 2))
+        ttk.Button(
+            list_label,
+            text="x",
+            width=2,
+            style="LabelBtn.TButton",
+            command=self.delete_selected,
+        ).pack(side="left")
+        ttk.Button(
+            list_label,
+            text="Importar",
+            style="LabelBtn.TButton",
+            command=self.open_import,
+        ).pack(side="left", padx=(2, 0))
+
+        list_col = ttk.LabelFrame(
+            self.main_panes,
+            labelwidget=list_label,
+            padding=10,
+            style="Section.TLabelframe",
+        )
+        list_col.pack_propagate(False)
+        list_col.config(width=260)
+
+        filter_entry = ttk.Entry(list_col, textvariable=self.filter_var)
+        self.filter_var.trace_add("write", self._schedule_filter)
+        list_container = ttk.Frame(list_col)
+        self.listbox = tk.Listbox(list_container, height=26, exportselection=False, width=28)
+        self.listbox.pack(side="left", fill="both", expand=True)
+        scrollbar = ttk.Scrollbar(list_container, orient="vertical", command=self.listbox.yview)
+        scrollbar.pack(side="right", fill="y")
+        self.listbox.configure(yscrollcommand=scrollbar.set)
+        self.listbox.bind("<<ListboxSelect>>", self.on_select_endpoint)
+
+        inflight_label = ttk.Frame(list_col)
+        ttk.Label(inflight_label, text="Em andamento").pack(side="left")
+        ttk.Button(
+            inflight_label,
+            text="x",
+            width=2,
+            style="LabelBtn.TButton",
+            command=self.cancel_selected_request,
+        ).pack(side="left", padx=(8, 0))
+        inflight_frame = ttk.LabelFrame(
+            list_col,
+            labelwidget=inflight_label,
+            padding=6,
+            style="Section.TLabelframe",
+        )
+        inflight_frame.pack(side="bottom", fill="x", pady=(10, 0))
+        self.inflight_listbox = tk.Listbox(inflight_frame, height=5, exportselection=False)
+        self.inflight_listbox.pack(fill="x")
+        filter_entry.pack(fill="x", pady=(0, 6))
+        list_container.pack(fill="both", expand=True)
+
+        self.main_panes.add(list_col, weight=1)
+
+        # Formulario principal (coluna direita)
+        form = ttk.Frame(self.main_panes)
+        self.main_panes.add(form, weight=3)
+
+        self.header_font = self._make_font("headers")
+        self.body_font = self._make_font("body")
+        self.response_font = self._make_font("response")
+
+        info_frame = ttk.LabelFrame(form, text="Identificacao e destino", padding=12, style="Section.TLabelframe")
+        info_frame.pack(fill="x", pady=(0, 10))
+        info_frame.columnconfigure(1, weight=1)
+        info_frame.columnconfigure(3, weight=1)
+
+        ttk.Label(info_frame, text="Nome").grid(row=0, column=0, sticky="w")
+        ttk.Entry(info_frame, textvariable=self.name_var).grid(row=0, column=1, sticky="ew", padx=(6, 12))
+        ttk.Label(info_frame, text="Metodo").grid(row=0, column=2, sticky="e")
+        method_box = ttk.Combobox(
+            info_frame,
+            width=10,
+            textvariable=self.method_var,
+            values=METHODS,
+            state="readonly",
+        )
+        method_box.grid(row=0, column=3, sticky="w")
+
+        ttk.Label(info_frame, text="URL").grid(row=1, column=0, sticky="w", pady=(8, 0))
+        ttk.Entry(info_frame, textvariable=self.url_var).grid(
+            row=1,
+            column=1,
+            columnspan=3,
+            sticky="ew",
+            padx=(6, 0),
+            pady=(8, 0),
+        )
+        ttk.Label(info_frame, text="Depende de").grid(row=2, column=0, sticky="w", pady=(8, 0))
+        ttk.Entry(info_frame, textvariable=self.depends_var).grid(
+            row=2,
+            column=1,
+            sticky="ew",
+            padx=(6, 0),
+            pady=(8, 0),
+        )
+        ttk.Checkbutton(info_frame, text="Comprimir (gzip/deflate/br)", variable=self.compressed_var).grid(
+            row=2,
+            column=2,
+            columnspan=2,
+            sticky="w",
+            padx=(12, 0),
+            pady=(8, 0),
+        )
+        ttk.Label(info_frame, text="Repeticao").grid(row=3, column=0, sticky="w", pady=(8, 0))
+        retry_row = ttk.Frame(info_frame)
+        retry_row.grid(row=3, column=1, columnspan=3, sticky="ew", padx=(6, 0), pady=(8, 0))
+        ttk.Spinbox(retry_row, from_=0, to=20, width=4, textvariable=self.retries_var).pack(side="left")
+        ttk.Label(retry_row, text="tentativas extras, nos status").pack(side="left", padx=(4, 4))
+        ttk.Entry(retry_row, width=16, textvariable=self.retry_status_var).pack(side="left")
+        ttk.Label(retry_row, text="Backoff (s)").pack(side="left", padx=(10, 2))
+        ttk.Entry(retry_row, width=5, textvariable=self.backoff_var).pack(side="left")
+        ttk.Label(retry_row, text="Prazo total (s)").pack(side="left", padx=(10, 2))
+        ttk.Entry(retry_row, width=5, textvariable=self.deadline_var).pack(side="left")
+        ttk.Checkbutton(retry_row, text="Hedge apos o p95", variable=self.hedge_var).pack(side="left", padx=(10, 0))
+        ttk.Label(info_frame, text="Monitorar").grid(row=4, column=0, sticky="w", pady=(8, 0))
+        monitor_row = ttk.Frame(info_frame)
+        monitor_row.grid(row=4, column=1, columnspan=3, sticky="ew", padx=(6, 0), pady=(8, 0))
+        ttk.Entry(monitor_row, width=6, textvariable=self.monitor_var).pack(side="left")
+        ttk.Label(monitor_row, text="a cada N segundos, em segundo plano (vazio: nao monitora)").pack(
+            side="left", padx=(4, 0)
+        )
+
+        button_row = ttk.Frame(form, padding=(0, 4))
+        button_row.pack(fill="x", pady=(0, 8))
+        ttk.Button(button_row, text="Salvar", command=self.save_endpoint).pack(side="left", padx=(0, 8))
+        ttk.Button(button_row, text="Enviar", command=self.send_request).pack(side="left", padx=(0, 8))
+        ttk.Button(button_row, text="Cancelar", command=self.cancel_all_requests).pack(side="left", padx=(0, 8))
+        ttk.Button(button_row, text="Carga", command=self.open_load_test).pack(side="left", padx=(0, 8))
+        ttk.Button(button_row, text="Historico", command=self.open_history).pack(side="left", padx=(0, 8))
+        ttk.Button(button_row, text="Colecao", command=self.open_collection).pack(side="left", padx=(0, 8))
+        ttk.Label(button_row, text="Timeout (s)").pack(side="left", padx=(8, 2))
+        ttk.Spinbox(button_row, from_=1, to=3600, width=6, textvariable=self.timeout_var).pack(side="left")
+        ttk.Label(button_row, text="Motor").pack(side="left", padx=(12, 2))
+        transport_box = ttk.Combobox(
+            button_row,
+            width=10,
+            textvariable=self.transport_var,
+            values=list(TRANSPORTS),
+            state="readonly",
+        )
+        transport_box.pack(side="left")
+        transport_box.bind("<<ComboboxSelected>>", self.on_transport_change)
+        ttk.Checkbutton(button_row, text="Cache", variable=self.cache_var, command=self.on_cache_toggle).pack(
+            side="left", padx=(12, 0)
+        )
+        ttk.Checkbutton(button_row, text="Gravar", variable=self.record_var, command=self.on_record_toggle).pack(
+            side="left", padx=(8, 0)
+        )
+        spans_button = ttk.Menubutton(button_row, text="Etapas")
+        spans_menu = tk.Menu(spans_button, tearoff=False)
+        spans_menu.add_checkbutton(
+            label="Medir etapas do envio", variable=self.spans_var, command=self.on_spans_toggle
+        )
+        spans_menu.add_checkbutton(label="Perfilar o proximo envio (cProfile)", variable=self.profile_next_var)
+        spans_menu.add_separator()
+        spans_menu.add_command(label="Resumo (media/p95)", command=self.show_span_summary)
+        spans_menu.add_command(label="Exportar JSON...", command=self.export_spans)
+        spans_menu.add_command(label="Zerar", command=self.reset_spans)
+        spans_button["menu"] = spans_menu
+        spans_button.pack(side="left", padx=(12, 0))
+
+        # Paned window vertical para permitir redimensionar altura das secoes
+        self.right_panes = ttk.Panedwindow(form, orient="vertical")
+        self.right_panes.pack(fill="both", expand=True)
+
+        headers_label = ttk.Frame(self.right_panes)
+        ttk.Label(headers_label, text="Headers (JSON ou linhas Chave: Valor)").pack(side="left")
+        ttk.Button(
+            headers_label,
+            text="A+",
+            width=2,
+            style="LabelBtn.TButton",
+            command=lambda: self._adjust_font(self.header_font, 1, "headers"),
+        ).pack(side="left", padx=(6, 2))
+        ttk.Button(
+            headers_label,
+            text="A-",
+            width=2,
+            style="LabelBtn.TButton",
+            command=lambda: self._adjust_font(self.header_font, -1, "headers"),
+        ).pack(side="left")
+        ttk.Button(
+            headers_label,
+            text="Limpar",
+            width=6,
+            style="LabelBtn.TButton",
+            command=self.clear_headers,
+        ).pack(side="left", padx=(6, 0))
+        headers_frame = ttk.LabelFrame(
+            self.right_panes,
+            labelwidget=headers_label,
+            padding=12,
+            style="Section.TLabelframe",
+        )
+        self.headers_text = ScrolledText(headers_frame, height=6, font=self.header_font)
+        self.headers_text.pack(fill="both", expand=True)
+        self.right_panes.add(headers_frame, weight=1)
+
+        body_label = ttk.Frame(self.right_panes)
+        ttk.Label(body_label, text="Body").pack(side="left")
+        body_mode_box = ttk.Combobox(
+            body_label,
+            width=18,
+            textvariable=self.body_mode_var,
+            values=list(BODY_MODES.values()),
+            state="readonly",
+        )
+        body_mode_box.pack(side="left", padx=(6, 0))
+        body_mode_box.bind("<<ComboboxSelected>>", lambda _event: self._show_body_mode())
+        ttk.Button(
+            body_label,
+            text="A+",
+            width=2,
+            style="LabelBtn.TButton",
+            command=lambda: self._adjust_font(self.body_font, 1, "body"),
+        ).pack(side="left", padx=(6, 2))
+        ttk.Button(
+            body_label,
+            text="A-",
+            width=2,
+            style="LabelBtn.TButton",
+            command=lambda: self._adjust_font(self.body_font, -1, "body"),
+        ).pack(side="left")
+        ttk.Button(
+            body_label,
+            text="Limpar",
+            width=6,
+            style="LabelBtn.TButton",
+            command=self.clear_body,
+        ).pack(side="left", padx=(6, 0))
+        body_frame = ttk.LabelFrame(
+            self.right_panes,
+            labelwidget=body_label,
+            padding=12,
+            style="Section.TLabelframe",
+        )
+        # Arquivo: so o caminho (enviado do disco em pedacos). Multipart: uma parte por linha no texto.
+        self.body_file_row = ttk.Frame(body_frame)
+        ttk.Label(self.body_file_row, text="Arquivo").pack(side="left")
+        ttk.Entry(self.body_file_row, textvariable=self.body_file_var).pack(side="left", fill="x", expand=True, padx=6)
+        ttk.Button(self.body_file_row, text="Escolher...", command=self.choose_body_file).pack(side="left")
+        self.form_row = ttk.Frame(body_frame)
+        ttk.Label(self.form_row, text="Uma parte por linha: campo=valor ou campo=@arquivo;type=tipo/mime").pack(
+            side="left"
+        )
+        ttk.Button(self.form_row, text="Adicionar arquivo...", command=self.choose_body_file).pack(side="right")
+        self.body_text = ScrolledText(body_frame, height=8, font=self.body_font)
+        self.body_text.pack(fill="both", expand=True)
+        self.right_panes.add(body_frame, weight=2)
+
+        response_label = ttk.Frame(self.right_panes)
+        ttk.Label(response_label, text="Resposta / log").pack(side="left")
+        ttk.Button(
+            response_label,
+            text="A+",
+            width=2,
+            style="LabelBtn.TButton",
+            command=lambda: self._adjust_font(self.response_font, 1, "response"),
+        ).pack(side="left", padx=(6, 2))
+        ttk.Button(
+            response_label,
+            text="A-",
+            width=2,
+            style="LabelBtn.TButton",
+            command=lambda: self._adjust_font(self.response_font, -1, "response"),
+        ).pack(side="left")
+        ttk.Button(
+            response_label,
+            text="Limpar",
+            width=6,
+            style="LabelBtn.TButton",
+            command=self.clear_response,
+        ).pack(side="left", padx=(6, 0))
+        response_frame = ttk.LabelFrame(
+            self.right_panes,
+            labelwidget=response_label,
+            padding=12,
+            style="Section.TLabelframe",
+        )
+        self.response_box = ScrolledText(response_frame, height=10, font=self.response_font)
+        self.response_box.pack(fill="both", expand=True)
+        # Respostas grandes vao para arquivo e sao exibidas aqui, no lugar do response_box.
+        self.large_view = VirtualTextView(response_frame, self.response_font)
+        self.right_panes.add(response_frame, weight=3)
+
+        self.right_panes.bind("<ButtonRelease-1>", self.on_pane_release)
+        self.main_panes.bind("<ButtonRelease-1>", self.on_main_pane_release)
+
+        status_bar = ttk.Frame(form)
+        status_bar.pack(fill="x", pady=(10, 0))
+        ttk.Label(status_bar, textvariable=self.status_var, relief="sunken", anchor="w").pack(
+            side="left", fill="x", expand=True
+        )
+        # Tempos por etapa do ultimo envio (so com "Medir etapas" ligado).
+        ttk.Label(status_bar, textvariable=self.spans_status_var, relief="sunken", anchor="e").pack(side="right")
+
+    def load_endpoints(self) -> None:
+        try:
+            self.store.load()
+        except json.JSONDecodeError:
+            messagebox.showwarning("Aviso", "endpoints.json corrompido. Iniciando vazio.")
+            self.store.items.clear()
+        self.endpoints = self.store.items
+
+        self.refresh_listbox()
+        self._update_monitor()
+
+    def _load_ui_state(self) -> None:
+        try:
+            with open(UI_STATE_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                self.ui_state = data
+        except FileNotFoundError:
+            self.ui_state = {}
+        except json.JSONDecodeError:
+            self.ui_state = {}
+
+    def persist_ui_state(self) -> None:
+        tmp_path = UI_STATE_FILE.with_suffix(UI_STATE_FILE.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.ui_state, f, indent=2)
+        os.replace(tmp_path, UI_STATE_FILE)
+
+    def refresh_listbox(self, select_index: int | None = None) -> None:
+        """
+        Recarrega a lista inteira (num unico insert) aplicando o filtro atual.
+        """
+        self._visible = self.store.search(self.filter_var.get())
+        rows = self.endpoints if self._visible is None else [self.endpoints[i] for i in self._visible]
+        self.listbox.delete(0, tk.END)
+        if rows:
+            self.listbox.insert(tk.END, *(self._row_text(ep) for ep in rows))
+            for row, ep in enumerate(rows):
+                if "monitor" in ep and self._failing(ep):
+                    self.listbox.itemconfig(row, foreground=MONITOR_FAILING_COLOR)
+        if select_index is not None:
+            self._select_listbox(select_index)
+
+    def _schedule_filter(self, *_args) -> None:
+        # Debounce: so filtra quando a digitacao pausa.
+        if self._filter_after is not None:
+            self.after_cancel(self._filter_after)
+        self._filter_after = self.after(FILTER_DEBOUNCE_MS, self.apply_filter)
+
+    def apply_filter(self) -> None:
+        self._filter_after = None
+        selected = self._selected_index()
+        self.refresh_listbox(select_index=selected)
+        if self._visible is not None:
+            self._set_status(f"{len(self._visible)} de {len(self.endpoints)} endpoints.")
+
+    def _row_of(self, idx: int) -> int | None:
+        if self._visible is None:
+            return idx if 0 <= idx < len(self.endpoints) else None
+        row = bisect_left(self._visible, idx)
+        return row if row < len(self._visible) and self._visible[row] == idx else None
+
+    def _selected_index(self) -> int | None:
+        if not self.listbox.curselection():
+            return None
+        row = self.listbox.curselection()[0]
+        if self._visible is None:
+            return row
+        return self._visible[row] if row < len(self._visible) else None
+
+    def _sync_row(self, idx: int, added: bool) -> None:
+        """
+        Atualiza so a linha do endpoint `idx` depois de salvo (inclui, mostra ou esconde conforme o filtro).
+        """
+        ep = self.endpoints[idx]
+        if self._visible is None:
+            if added:
+                self.listbox.insert(tk.END, self._row_text(ep))
+            else:
+                self._draw_row(idx, ep)
+            return
+        row = self._row_of(idx)
+        visible = self.store.matches(idx, self.filter_var.get())
+        if visible and row is None:
+            row = bisect_left(self._visible, idx)
+            self._visible.insert(row, idx)
+            self.listbox.insert(row, self._row_text(ep))
+        elif not visible and row is not None:
+            del self._visible[row]
+            self.listbox.delete(row)
+        elif row is not None:
+            self._draw_row(row, ep)
+
+    def _row_text(self, ep: dict) -> str:
+        """
+        Nome e, para endpoints monitorados, a sparkline das ultimas sondas e o p95 atual.
+        """
+        name = ep.get("name", "<sem nome>")
+        series = self.monitor.series(name) if "monitor" in ep else None
+        if series is None:
+            return name
+        p95 = series.p95()
+        text = f"{name}  {series.sparkline()}"
+        if p95 is not None:
+            text += f"  p95 {p95:.0f} ms"
+        return f"! {text}" if series.healthy is False else text
+
+    def _failing(self, ep: dict) -> bool:
+        series = self.monitor.series(ep.get("name", ""))
+        return series is not None and series.healthy is False
+
+    def _draw_row(self, row: int, ep: dict) -> None:
+        """
+        Troca o texto da linha (mantendo a selecao) e a cor de alerta.
+        """
+        text = self._row_text(ep)
+        if self.listbox.get(row) != text:
+            selected = self.listbox.selection_includes(row)
+            self.listbox.delete(row)
+            self.listbox.insert(row, text)
+            if selected:
+                self.listbox.selection_set(row)
+        failing = "monitor" in ep and self._failing(ep)
+        self.listbox.itemconfig(row, foreground=MONITOR_FAILING_COLOR if failing else "")
+
+    def _update_monitor(self) -> None:
+        # Series de quem entrou ou saiu do monitoramento recomecam do zero: redesenha tudo.
+        self._monitor_drawn.clear()
+        self.monitor.update(self.endpoints)
+
+    def _refresh_monitor(self) -> None:
+        """
+        Avisa as mudancas de saude assim que chegam e redesenha so as linhas com sonda nova.
+        """
+        while True:
+            try:
+                name, healthy, status, exit_code = self.monitor.events.get_nowait()
+            except queue.Empty:
+                break
+            if healthy:
+                self._set_status(f"Monitor: {name} voltou a responder (status {status}).")
+            else:
+                self.bell()
+                detail = f"status {status}" if status else f"codigo {exit_code}"
+                self._set_status(f"ALERTA: {name} falhando ({detail}).")
+        for name in self.monitor.names():
+            series = self.monitor.series(name)
+            if series is None or self._monitor_drawn.get(name) == series.recent.count:
+                continue
+            self._monitor_drawn[name] = series.recent.count
+            idx = self.store.index_of(name)
+            row = None if idx is None else self._row_of(idx)
+            if row is not None:
+                self._draw_row(row, self.endpoints[idx])
+        self.after(MONITOR_REFRESH_MS, self._refresh_monitor)
+
+    def _select_listbox(self, idx: int) -> None:
+        self.listbox.selection_clear(0, tk.END)
+        row = self._row_of(idx)
+        if row is None:
+            return
+        self.listbox.selection_set(row)
+        self.listbox.activate(row)
+        self.listbox.see(row)
+
+    def on_select_endpoint(self, event: tk.Event) -> None:
+        idx = self._selected_index()
+        if idx is None:
+            return
+        try:
+            ep = self.endpoints[idx]
+        except IndexError:
+            return
+
+        self.name_var.set(ep.get("name", ""))
+        self.url_var.set(ep.get("url", ""))
+        self.method_var.set(ep.get("method", DEFAULT_METHOD))
+        self.depends_var.set(", ".join(dependencies(ep)))
+        self.compressed_var.set(bool(ep.get("compressed")))
+        self._set_policy_fields(ep.get("resilience"))
+        interval = monitor_interval(ep)
+        self.monitor_var.set(f"{interval:g}" if interval else "")
+        self.headers_text.delete("1.0", tk.END)
+        self.headers_text.insert(tk.END, self._headers_to_text(ep.get("headers", {})))
+        self.body_text.delete("1.0", tk.END)
+        self.body_file_var.set(ep.get("body_file", ""))
+        if ep.get("body_file"):
+            self.body_mode_var.set(BODY_MODES["file"])
+        elif ep.get("form"):
+            self.body_mode_var.set(BODY_MODES["form"])
+            self.body_text.insert(tk.END, form_to_text(ep["form"]))
+        else:
+            self.body_mode_var.set(BODY_MODES["text"])
+            self.body_text.insert(tk.END, ep.get("body", ""))
+        self._show_body_mode()
+        self._set_status(f"Carregado: {ep.get('name', '')}")
+
+    def clear_form(self) -> None:
+        self.listbox.selection_clear(0, tk.END)
+        self.name_var.set("")
+        self.url_var.set("")
+        self.method_var.set(DEFAULT_METHOD)
+        self.depends_var.set("")
+        self.compressed_var.set(False)
+        self._set_policy_fields(None)
+        self.monitor_var.set("")
+        self.headers_text.delete("1.0", tk.END)
+        self.body_text.delete("1.0", tk.END)
+        self.body_file_var.set("")
+        self.body_mode_var.set(BODY_MODES["text"])
+        self._show_body_mode()
+        self._set_status("Formulario limpo.")
+
+    def _set_policy_fields(self, policy: dict | None) -> None:
+        retries, statuses, backoff, deadline, hedge = policy_fields(policy)
+        self.retries_var.set(retries)
+        self.retry_status_var.set(statuses)
+        self.backoff_var.set(backoff)
+        self.deadline_var.set(deadline)
+        self.hedge_var.set(hedge)
+
+    def clear_headers(self) -> None:
+        self.headers_text.delete("1.0", tk.END)
+
+    def clear_body(self) -> None:
+        self.body_text.delete("1.0", tk.END)
+        self.body_file_var.set("")
+
+    def _body_mode(self) -> str:
+        label = self.body_mode_var.get()
+        return next((mode for mode, text in BODY_MODES.items() if text == label), "text")
+
+    def _show_body_mode(self) -> None:
+        mode = self._body_mode()
+        self.body_file_row.pack_forget()
+        self.form_row.pack_forget()
+        self.body_text.pack_forget()
+        if mode == "file":
+            self.body_file_row.pack(fill="x")
+            return
+        if mode == "form":
+            self.form_row.pack(fill="x", pady=(0, 6))
+        self.body_text.pack(fill="both", expand=True)
+
+    def choose_body_file(self) -> None:
+        path = filedialog.askopenfilename(parent=self, title="Arquivo do body")
+        if not path:
+            return
+        if self._body_mode() == "file":
+            self.body_file_var.set(path)
+            self._set_status(f"Body: {path} ({_human_bytes(os.path.getsize(path))})")
+            return
+        current = self.body_text.get("1.0", tk.END).rstrip("\n")
+        self.body_text.insert(tk.END, ("\n" if current else "") + f"arquivo=@{path}")
+
+    def delete_selected(self) -> None:
+        idx = self._selected_index()
+        if idx is None:
+            self._set_status("Selecione um endpoint para remover.")
+            return
+        row = self._row_of(idx)
+        try:
+            removed = self.store.delete(idx)
+        except IndexError:
+            return
+        self.listbox.delete(row)
+        if self._visible is not None:
+            self._visible = [i - (i > idx) for i in self._visible if i != idx]
+        self._update_monitor()
+        self.clear_form()
+        self._set_status(f"Removido: {removed.get('name', '')}")
+
+    def clear_response(self) -> None:
+        self._release_pane()
+        self.response_box.delete("1.0", tk.END)
+        self._set_status("Resposta limpa.")
+
+    def save_endpoint(self) -> None:
+        try:
+            payload = self._collect_form()
+        except ValueError as exc:
+            messagebox.showerror("Erro", str(exc))
+            self._set_status(str(exc))
+            return
+
+        idx = self._upsert_endpoint(payload)
+        self._select_listbox(idx)
+        self._set_status("Endpoint salvo.")
+
+    def send_request(self) -> None:
+        trace = None
+        if self.spans_var.get() or self.profile_next_var.get():
+            trace = Trace(profile=self.profile_next_var.get())
+            self.profile_next_var.set(False)
+        # O perfil da thread da UI fecha antes do submit: dois cProfile ativos ao mesmo tempo nao funcionam no 3.12.
+        with profiling(trace):
+            try:
+                with span(trace, "formulario"):
+                    payload = self._collect_form()
+                    timeout = self._read_timeout()
+            except ValueError as exc:
+                messagebox.showerror("Erro", str(exc))
+                self._set_status(str(exc))
+                return
+
+            idx = self._upsert_endpoint(payload, trace)
+            with span(trace, "lista"):
+                self._select_listbox(idx)
+
+        cache = self.response_cache if self.cache_var.get() else None
+        job = self.dispatcher.submit(payload, timeout, self.transport_var.get(), cache, trace)
+        if trace is not None:
+            trace.label = f"{job.label} ({job.transport})"
+        with span(trace, "inserir"):
+            self._attach_pane(job, get_transport(job.transport).describe(payload))
+        self.refresh_inflight()
+        self._set_status(f"Enviando requisicao {job.label}...")
+        self._start_polling()
+
+    def open_load_test(self) -> None:
+        idx = self._selected_index()
+        if idx is None:
+            self._set_status("Selecione um endpoint salvo para o teste de carga.")
+            return
+        try:
+            ep = self.endpoints[idx]
+            timeout = self._read_timeout()
+        except IndexError:
+            return
+        except ValueError as exc:
+            messagebox.showerror("Erro", str(exc))
+            return
+        LoadTestWindow(self, ep, timeout)
+
+    def open_history(self) -> None:
+        if self.history is None:
+            self._set_status("Historico indisponivel.")
+            return
+        idx = self._selected_index()
+        name = self.endpoints[idx].get("name") if idx is not None else None
+        HistoryWindow(self, self.history, name)
+
+    def open_collection(self) -> None:
+        if not self.endpoints:
+            self._set_status("Nenhum endpoint salvo.")
+            return
+        try:
+            timeout = self._read_timeout()
+        except ValueError as exc:
+            messagebox.showerror("Erro", str(exc))
+            return
+        CollectionWindow(self, list(self.endpoints), timeout, self.transport_var.get())
+
+    def open_import(self) -> None:
+        ImportWindow(self)
+
+    def import_batch(self, batch: ImportBatch) -> list[dict]:
+        """
+        Grava a leva importada com uma unica escrita e redesenha a lista uma vez.
+        """
+        added = batch.commit(self.store)
+        if added:
+            self.refresh_listbox()
+        self._set_status(f"Importacao: {batch.summary()}")
+        return added
+
+    def cancel_selected_request(self) -> None:
+        if not self.inflight_listbox.curselection():
+            self._set_status("Selecione uma requisicao em andamento para cancelar.")
+            return
+        idx = self.inflight_listbox.curselection()[0]
+        try:
+            job_id = self._inflight_ids[idx]
+        except IndexError:
+            return
+        if self.dispatcher.cancel(job_id):
+            self._set_status(f"Cancelando requisicao #{job_id}...")
+
+    def cancel_all_requests(self) -> None:
+        count = self.dispatcher.cancel_all()
+        if count:
+            self._set_status(f"Cancelando {count} requisicao(oes)...")
+        else:
+            self._set_status("Nenhuma requisicao em andamento.")
+
+    def refresh_inflight(self) -> None:
+        jobs = self.dispatcher.in_flight()
+        self._inflight_ids = [job.id for job in jobs]
+        self.inflight_listbox.delete(0, tk.END)
+        for job in jobs:
+            self.inflight_listbox.insert(tk.END, job.label)
+
+    def _read_timeout(self) -> float:
+        try:
+            timeout = float(self.timeout_var.get().strip().replace(",", "."))
+        except ValueError:
+            raise ValueError("Timeout invalido; informe um numero de segundos.") from None
+        if timeout <= 0:
+            raise ValueError("Timeout deve ser maior que zero.")
+        return timeout
+
+    def on_transport_change(self, event: tk.Event) -> None:
+        self.ui_state["transport"] = self.transport_var.get()
+        self.save_ui_state()
+        self._set_status(f"Motor de envio: {self.transport_var.get()}")
+
+    def on_cache_toggle(self) -> None:
+        self.ui_state["cache"] = self.cache_var.get()
+        self.save_ui_state()
+        if self.cache_var.get():
+            self._set_status(f"Cache de respostas ligado (GET/HEAD). {self.response_cache.stats_text()}")
+        else:
+            self._set_status("Cache de respostas desligado.")
+
+    def on_record_toggle(self) -> None:
+        self.ui_state["record"] = self.record_var.get()
+        self.save_ui_state()
+        if self.record_var.get():
+            self._set_status(
+                f"Gravacao ligada: cada envio concluido vai para {RECORDING_FILE.name} "
+                "(sirva com `python endpoint_tester.py replay`)."
+            )
+        else:
+            self._set_status(f"Gravacao desligada ({self.recorder.count} troca(s) gravada(s) nesta sessao).")
+
+    def on_spans_toggle(self) -> None:
+        self.ui_state["spans"] = self.spans_var.get()
+        self.save_ui_state()
+        if self.spans_var.get():
+            self._set_status("Tempos por etapa ligados: aparecem na barra de status ao fim de cada envio.")
+        else:
+            self.spans_status_var.set("")
+            self._set_status("Tempos por etapa desligados.")
+
+    def show_span_summary(self) -> None:
+        if not self.span_stats.recent:
+            messagebox.showinfo("Etapas", 'Nenhum envio medido ainda (ligue "Medir etapas do envio").')
+            return
+        window = tk.Toplevel(self)
+        window.title("Etapas do envio")
+        box = ScrolledText(window, width=62, height=18, font=self.response_font)
+        box.pack(fill="both", expand=True)
+        box.insert(tk.END, self.span_stats.render())
+        box.configure(state="disabled")
+
+    def export_spans(self) -> None:
+        path = filedialog.asksaveasfilename(
+            parent=self,
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json")],
+            initialfile="etapas.json",
+        )
+        if path:
+            self.span_stats.export(path)
+            self._set_status(f"Etapas exportadas para {path}.")
+
+    def reset_spans(self) -> None:
+        self.span_stats.reset()
+        self.spans_status_var.set("")
+        self._set_status("Agregado de etapas zerado.")
+
+    def _start_polling(self) -> None:
+        if not self._polling:
+            self._polling = True
+            self.after(POLL_INTERVAL_MS, self._poll_results)
+
+    def _poll_results(self) -> None:
+        # Consome poucos resultados por ciclo para nunca travar o loop do Tk.
+        handled = 0
+        while handled < 4:
+            try:
+                job, result = self.dispatcher.results.get_nowait()
+            except queue.Empty:
+                break
+            trace = job.trace
+            if trace is not None:
+                trace.add_since_mark("espera_ui")
+            with profiling(trace):
+                self._on_request_done(job, result)
+            if trace is not None and job.id not in self._open_traces:
+                self._close_trace(trace)
+            handled += 1
+        while True:
+            try:
+                job_id, formatted = self.formatter.results.get_nowait()
+            except queue.Empty:
+                break
+            self._on_formatted(job_id, formatted)
+
+        self._pump_stream()
+        if handled:
+            self.refresh_inflight()
+        pane_pending = self._pane_job is not None and self._pane_job.stream.has_pending()
+        busy = self.dispatcher.in_flight() or not self.dispatcher.results.empty() or self.formatter.pending()
+        if busy or pane_pending:
+            self.after(POLL_INTERVAL_MS, self._poll_results)
+        else:
+            self._polling = False
+
+    def _attach_pane(self, job: RequestJob, cmd: str) -> None:
+        """
+        Passa a mostrar `job` na area de resposta, recebendo o corpo conforme chega.
+        """
+        self._release_pane()
+        self._pane_job = job
+        self._pane_cmd = cmd
+        self.response_box.delete("1.0", tk.END)
+        self.response_box.insert(tk.END, f"$ {cmd}\n\n")
+
+    def _release_pane(self) -> None:
+        """
+        Solta a requisicao exibida: apaga o arquivo temporario e volta para o response_box.
+        """
+        job, self._pane_job = self._pane_job, None
+        if self.large_view.spool is not None:
+            self.large_view.detach()
+            self.large_view.pack_forget()
+            self.response_box.pack(fill="both", expand=True)
+        if job is not None and job.stream.finished:
+            job.stream.close()
+
+    def _pump_stream(self, limit: int | None = MAX_INSERT_CHARS) -> None:
+        job = self._pane_job
+        if job is None:
+            return
+        spool = job.stream.spool
+        with span(job.trace, "inserir"):
+            if spool is not None:
+                if self.large_view.spool is not spool:
+                    # Passou do limite: troca o texto comum pelo visualizador do arquivo.
+                    self.response_box.delete("1.0", tk.END)
+                    self.response_box.pack_forget()
+                    self.large_view.pack(fill="both", expand=True)
+                    self.large_view.attach(spool, f"$ {self._pane_cmd}")
+                else:
+                    self.large_view.refresh()
+                text = ""
+            else:
+                text = job.stream.drain(limit)
+            if text:
+                at_bottom = self.response_box.yview()[1] >= 0.999
+                self.response_box.insert(tk.END, text)
+                if at_bottom:
+                    self.response_box.see(tk.END)
+        now = time.monotonic()
+        if not job.stream.finished and now - self._stream_status_at >= STREAM_STATUS_MS / 1000:
+            self._stream_status_at = now
+            upload = job.upload
+            if upload is not None and not job.stream.bytes_received:
+                progress = upload.progress
+                percent = progress.sent / progress.total if progress.total else 1.0
+                self._set_status(
+                    f"{job.label}: {_human_bytes(progress.sent)} de {_human_bytes(progress.total)} enviados "
+                    f"({percent:.0%}, {_human_bytes(progress.speed())}/s)"
+                )
+            elif job.stream.bytes_received:
+                self._set_status(
+                    f"{job.label}: {_human_bytes(job.stream.bytes_received)} recebidos "
+                    f"({_human_bytes(job.stream.speed())}/s)"
+                )
+
+    def _on_request_done(self, job: RequestJob, result: tuple[str, str, int]) -> None:
+        cmd, output, exit_code = result
+        job.stream.finish()
+        if job.error:
+            messagebox.showerror("Erro", job.error)
+        with span(job.trace, "historico"):
+            self._record_history(job, cmd, output, exit_code)
+            self._record_exchange(job, exit_code)
+        if job.timing is not None:
+            with span(job.trace, "tempos"):
+                output = f"{TIMING_MARKER}\n{self._record_timing(job)}\n{output}"
+
+        pane_busy = self._pane_job is not None and self._pane_job is not job and not self._pane_job.stream.finished
+        if pane_busy:
+            job.stream.close()  # resultado nao sera exibido; libera memoria/arquivo
+        else:
+            if self._pane_job is not job:
+                # Outra requisicao ocupava a area de resposta e ja terminou: mostra esta.
+                self._attach_pane(job, cmd)
+            self._pump_stream(limit=None)
+            if self._finish_pane(job, cmd, output) and job.trace is not None:
+                self._open_traces[job.id] = job.trace  # fecha quando a versao formatada chegar
+
+        elapsed = time.monotonic() - job.started_at
+        received = _human_bytes(job.stream.bytes_received)
+        if job.timed_out:
+            self._set_status(f"{job.label}: tempo limite de {job.timeout:g}s excedido.")
+        elif job.cancelled.is_set():
+            self._set_status(f"{job.label}: requisicao cancelada.")
+        elif exit_code == 0:
+            status = f"{job.label}: requisicao concluida em {elapsed:.2f}s ({received})."
+            if job.attempts and len(job.attempts) > 1:
+                status += f" {len(job.attempts)} tentativas (detalhes em [tentativas])."
+            if job.cache_result is not None:
+                status += f" {CACHE_LABELS[job.cache_result]} {self.response_cache.stats_text()}"
+            self._set_status(status)
+        else:
+            self._set_status(f"{job.label}: {job.transport} retornou codigo {exit_code}.")
+
+    def _record_history(self, job: RequestJob, cmd: str, output: str, exit_code: int) -> None:
+        """
+        Agenda a gravacao do envio no historico; a escrita (e a copia de respostas grandes) roda fora do Tk.
+        """
+        if self.history is None:
+            return
+        spool = job.stream.spool
+        response, response_file = None, None
+        if spool is not None:
+            head = spool.read_bytes(0, HEAD_SCAN_LIMIT).decode("utf-8", errors="replace")
+            try:
+                # O descritor aberto continua valido mesmo que o arquivo temporario seja apagado antes da copia.
+                response_file = open(spool.path, "rb")
+            except OSError:
+                pass
+        else:
+            response = job.stream.text()
+            head = response or ""
+        record = {
+            "time": time.time(),
+            "name": job.payload.get("name", ""),
+            "method": job.payload["method"],
+            "url": job.payload["url"],
+            "headers": job.payload["headers"],
+            "body": job.payload["body"],
+            "transport": job.transport,
+            "cmd": cmd,
+            "status": response_status(head),
+            "exit_code": exit_code,
+            "elapsed": time.monotonic() - job.started_at,
+            "timing": job.timing,
+            "stderr": output.replace("\n[stderr]\n", "", 1),
+        }
+        for key in ("body_file", "form"):
+            if key in job.payload:
+                record[key] = job.payload[key]
+        if job.attempts:
+            record["attempts"] = job.attempts
+        self.history_writer.submit(self._write_history, record, response, response_file)
+
+    def _record_exchange(self, job: RequestJob, exit_code: int) -> None:
+        """
+        Com "Gravar" ligado, agenda a gravacao da troca para o servidor de replay (fora da thread do Tk).
+        Respostas do cache nao sao trocas reais e ficam de fora.
+        """
+        if not self.record_var.get() or exit_code != 0 or job.cache_result in ("hit", "revalidated"):
+            return
+        elapsed = time.monotonic() - job.started_at
+        spool = job.stream.spool
+        if spool is None:
+            response = job.stream.text()
+        elif spool.size <= RECORD_MAX_BYTES:
+            try:
+                response = open(spool.path, "rb")  # lido na thread do historico, como no _record_history
+            except OSError:
+                return
+        else:
+            return
+        if response is not None:
+            self.history_writer.submit(self._write_recording, job.payload, response, job.timing, elapsed)
+
+    def _write_recording(self, payload: dict, response, timing: dict | None, elapsed: float) -> None:
+        if not isinstance(response, str):
+            with response:
+                response = response.read(RECORD_MAX_BYTES + 1).decode("utf-8", errors="replace")
+        try:
+            self.recorder.record(payload, response, timing, elapsed)
+        except OSError:
+            pass  # gravacao e auxiliar: erro de disco nao interrompe o envio
+
+    def _write_history(self, record: dict, response: str | None, response_file) -> None:
+        try:
+            self.history.append(record, response=response, response_file=response_file)
+        except OSError:
+            pass  # historico e auxiliar; falha de disco nao deve derrubar o envio
+        finally:
+            if response_file is not None:
+                response_file.close()
+
+    def _record_timing(self, job: RequestJob) -> str:
+        """
+        Guarda os tempos da execucao junto das anteriores do mesmo endpoint e devolve a cascata comparativa.
+        """
+        key = (job.payload["method"], job.payload["url"])
+        runs = self.timing_history.setdefault(key, [])
+        waterfall = render_waterfall(job.timing, runs)
+        runs.append(job.timing)
+        del runs[:-HISTORY_LIMIT]
+        return waterfall
+
+    def _finish_pane(self, job: RequestJob, cmd: str, output: str) -> bool:
+        """
+        Anexa o stderr ao texto recebido e agenda a versao formatada, que substitui o texto cru quando pronta.
+        Retorna True se a formatacao ficou para segundo plano.
+        """
+        trace = job.trace
+        spool = job.stream.spool
+        if spool is not None:
+            body_end = spool.size
+            job.stream.append_text(output)
+            self.large_view.refresh()
+            if trace is not None:
+                trace.mark()
+            self.formatter.submit_spool(job.id, spool, body_end, output)
+            return True
+        raw = job.stream.text()
+        if raw is None:
+            with span(trace, "inserir"):
+                self.response_box.insert(tk.END, output)
+                self.response_box.insert(tk.END, "\n[resposta grande: exibida sem formatacao]\n")
+            return False
+        full = raw + output
+        if len(full) > FORMAT_SYNC_LIMIT:
+            with span(trace, "inserir"):
+                self.response_box.insert(tk.END, output)
+            if trace is not None:
+                trace.mark()
+            self.formatter.submit_text(job.id, full)
+            return True
+        with span(trace, "formatar"):
+            formatted_output = self._format_response_text(full)
+        with span(trace, "inserir"):
+            if formatted_output == full:
+                self.response_box.insert(tk.END, output)
+            else:
+                self._show_formatted(cmd, formatted_output)
+        return False
+
+    def _show_formatted(self, cmd: str, formatted_output: str) -> None:
+        self.response_box.delete("1.0", tk.END)
+        self.response_box.insert(tk.END, f"$ {cmd}\n\n")
+        self.response_box.insert(tk.END, formatted_output)
+
+    def _on_formatted(self, job_id: int, formatted) -> None:
+        trace = self._open_traces.pop(job_id, None)
+        if trace is not None:
+            trace.add_since_mark("formatar")
+        with span(trace, "inserir"):
+            self._apply_formatted(job_id, formatted)
+        if trace is not None:
+            self._close_trace(trace)
+
+    def _apply_formatted(self, job_id: int, formatted) -> None:
+        job = self._pane_job
+        if job is None or job.id != job_id:
+            # A area de resposta ja mostra outra coisa; descarta.
+            if isinstance(formatted, SpoolFile):
+                formatted.close()
+            return
+        if isinstance(formatted, SpoolFile):
+            job.stream.replace_spool(formatted)
+            self.large_view.attach(formatted, f"$ {self._pane_cmd} (formatado)")
+        elif formatted is not None and formatted != job.stream.text():
+            self._show_formatted(self._pane_cmd, formatted)
+
+    def _close_trace(self, trace: Trace) -> None:
+        """
+        Envio concluido: etapas para o agregado, leitura na barra de status e, se pedido, o perfil em disco.
+        """
+        self.span_stats.close(trace)
+        if self.spans_var.get():
+            self.spans_status_var.set(trace.readout())
+        if trace.profiles is None:
+            return
+        try:
+            report = save_profile(trace, PROFILE_DIR)
+        except OSError as exc:
+            self._set_status(f"Falha ao gravar o perfil do envio: {exc}")
+            return
+        if report is not None:
+            self._set_status(f"{self.status_var.get()} Perfil do envio em {report}")
+
+    def _run_curl(self, job: RequestJob) -> tuple[str, str, int]:
+        """
+        Executa o job no transporte escolhido; roda nas threads do pool, portanto nao toca em widgets.
+        """
+        trace = job.trace
+        if trace is None:
+            return self._execute(job)
+        with trace.profiling():
+            start = time.perf_counter()
+            result = self._execute(job)
+            # O spawn do curl e medido pelo transporte; "rede" e o resto do tempo dentro dele.
+            trace.add("rede", time.perf_counter() - start - trace.stages.get("spawn", 0.0))
+        return result
+
+    def _execute(self, job: RequestJob) -> tuple[str, str, int]:
+        if job.cache is not None:
+            return job.cache.execute(get_transport(job.transport), job.payload, job, job.stream)
+        return get_transport(job.transport).execute(job.payload, job, job.stream)
+
+    def _collect_form(self) -> dict:
+        mode = self._body_mode()
+        text = self.body_text.get("1.0", tk.END).rstrip("\n")
+        return build_payload(
+            self.name_var.get(),
+            self.url_var.get(),
+            self.method_var.get(),
+            self.headers_text.get("1.0", tk.END),
+            text if mode == "text" else "",
+            self.depends_var.get(),
+            self.compressed_var.get(),
+            body_file=self.body_file_var.get() if mode == "file" else "",
+            form_text=text if mode == "form" else "",
+            resilience=parse_policy(
+                self.retries_var.get(),
+                self.retry_status_var.get(),
+                self.backoff_var.get(),
+                self.deadline_var.get(),
+                self.hedge_var.get(),
+            ),
+            monitor=parse_monitor(self.monitor_var.get()),
+        )
+
+    def _parse_headers(self, text: str) -> dict:
+        return parse_headers(text)
+
+    def _headers_to_text(self, headers: dict) -> str:
+        return headers_to_text(headers)
+
+    def _upsert_endpoint(self, payload: dict, trace: Trace | None = None) -> int:
+        """
+        Grava o endpoint (so se mudou) e atualiza so a linha correspondente na lista.
+        """
+        count = len(self.endpoints)
+        with span(trace, "persistir"):
+            idx, changed = self.store.upsert(payload)
+        if changed:
+            with span(trace, "lista"):
+                self._sync_row(idx, added=len(self.endpoints) > count)
+            self._update_monitor()
+        return idx
+
+    def _set_status(self, text: str) -> None:
+        self.status_var.set(text)
+
+    def _format_response_text(self, raw: str) -> str:
+        """
+        Tenta separar headers e body; se body for JSON valido, retorna identado.
+        """
+        return format_response_text(raw)
+
+    def apply_ui_state(self) -> None:
+        # Aplica geometria e tamanhos de sashes apos Tk calcular layouts
+        geom = self.ui_state.get("geometry")
+        if geom:
+            self.geometry(geom)
+        if self.ui_state.get("transport") in TRANSPORTS:
+            self.transport_var.set(self.ui_state["transport"])
+        self.cache_var.set(bool(self.ui_state.get("cache")))
+        self.record_var.set(bool(self.ui_state.get("record")))
+        self.spans_var.set(bool(self.ui_state.get("spans")))
+
+        def _apply():
+            sashes = self.ui_state.get("right_sashes")
+            if sashes and hasattr(self, "right_panes"):
+                try:
+                    self.right_panes.update_idletasks()
+                    expected = len(self.right_panes.panes()) - 1
+                    for idx, pos in enumerate(sashes[: expected]):
+                        self.right_panes.sashpos(idx, pos)
+                except tk.TclError:
+                    pass
+            main_sash = self.ui_state.get("main_sash")
+            if main_sash is not None and hasattr(self, "main_panes"):
+                try:
+                    self.main_panes.update_idletasks()
+                    self.main_panes.sashpos(0, main_sash)
+                except tk.TclError:
+                    pass
+
+        self.after(150, _apply)
+
+    def save_ui_state(self) -> None:
+        if not hasattr(self, "right_panes"):
+            return
+        try:
+            self.right_panes.update_idletasks()
+            num_sashes = len(self.right_panes.panes()) - 1
+            sashes = [self.right_panes.sashpos(i) for i in range(num_sashes)]
+            self.ui_state["right_sashes"] = sashes
+            if hasattr(self, "main_panes"):
+                self.main_panes.update_idletasks()
+                if len(self.main_panes.panes()) > 1:
+                    self.ui_state["main_sash"] = self.main_panes.sashpos(0)
+            self.ui_state["geometry"] = self.winfo_geometry()
+            self.ui_state["fonts"] = {
+                "headers": self.header_font.cget("size"),
+                "body": self.body_font.cget("size"),
+                "response": self.response_font.cget("size"),
+            }
+            self.persist_ui_state()
+        except tk.TclError:
+            pass
+
+    def on_pane_release(self, event: tk.Event) -> None:
+        self.save_ui_state()
+
+    def on_main_pane_release(self, event: tk.Event) -> None:
+        self.save_ui_state()
+
+    def on_close(self) -> None:
+        self.monitor.stop()
+        self.dispatcher.shutdown()
+        self.formatter.shutdown()
+        self.response_cache.close()
+        self.history_writer.shutdown(wait=True)
+        self.store.compact()
+        for job in self.dispatcher.in_flight():
+            job.stream.close()
+        self._release_pane()
+        for child in self.winfo_children():
+            if isinstance(child, (LoadTestWindow, CollectionWindow)):
+                child.stop()
+        self.save_ui_state()
+        self.destroy()
+
+    def _make_font(self, key: str) -> tkfont.Font:
+        if "TkFixedFont" in tkfont.names():
+            base = tkfont.nametofont("TkFixedFont")
+        else:
+            base = tkfont.Font(family="Courier New", size=10)
+        size_override = self.ui_state.get("fonts", {}).get(key)
+        font_obj = tkfont.Font(family=base.cget("family"), size=size_override or base.cget("size"))
+        return font_obj
+
+    def _adjust_font(self, font_obj: tkfont.Font, delta: int, key: str) -> None:
+        new_size = max(6, font_obj.cget("size") + delta)
+        font_obj.configure(size=new_size)
+        fonts_state = self.ui_state.setdefault("fonts", {})
+        fonts_state[key] = new_size
+        self.save_ui_state()
+
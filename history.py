@@ -0,0 +1,356 @@
+"""
+Historico de envios: log JSONL so de acrescimo, com indice lateral de offsets.
+- Cada envio vira uma linha com "history": 1; linhas de outro formato no mesmo arquivo sao ignoradas.
+- Respostas acima de INLINE_LIMIT vao para arquivos em HISTORY_BLOB_DIR e a linha guarda so o caminho.
+- O indice (<log>.idx) tem uma linha de tamanho fixo por registro: offset, horario, nome e status/segmento.
+  E carregado de uma vez em arrays, entao abrir um historico de 1M registros nao le o log.
+- Passando de ROTATE_BYTES, o log vira <nome>.<n>.jsonl; acima de MAX_SEGMENTS os mais antigos
+  (e seus arquivos de resposta) sao apagados e o indice e reescrito sem eles.
+"""
+
+import itertools
+import json
+import os
+import shutil
+import struct
+import threading
+import time
+import uuid
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+
+INLINE_LIMIT = 64 * 1024
+ROTATE_BYTES = 64 * 1024 * 1024
+MAX_SEGMENTS = 8
+HISTORY_BLOB_DIR = "history"
+PAGE_SIZE = 200
+TAIL_BLOCK = 64 * 1024
+
+# offset, horario, id do nome, (segmento << 16) | status
+_ROW = struct.Struct("=QdQQ")
+_FIELDS = 4
+
+
+class HistoryStore:
+    def __init__(self, path: Path, rotate_bytes: int = ROTATE_BYTES, max_segments: int = MAX_SEGMENTS) -> None:
+        self.path = Path(path)
+        self.rotate_bytes = rotate_bytes
+        self.max_segments = max_segments
+        self.blob_dir = self.path.parent / HISTORY_BLOB_DIR
+        self.index_path = self.path.with_name(self.path.name + ".idx")
+        self.names_path = self.path.with_name(self.path.name + ".names")
+        self._lock = threading.Lock()
+        self._offsets = array("Q")
+        self._times = array("d")
+        self._name_ids = array("Q")
+        self._packed = array("Q")
+        self._names: list[str] = []
+        self._name_lookup: dict[str, int] = {}
+        self._by_name: dict[int, array] = {}
+        self.segment = self._find_active_segment()
+        self._load()
+
+    def _segment_path(self, segment: int) -> Path:
+        if segment == self.segment:
+            return self.path
+        return self.path.with_name(f"{self.path.stem}.{segment}{self.path.suffix}")
+
+    def _rotated_segments(self) -> list[int]:
+        segments = []
+        prefix, suffix = self.path.stem + ".", self.path.suffix
+        for entry in self.path.parent.glob(f"{self.path.stem}.*{suffix}"):
+            number = entry.name[len(prefix) : len(entry.name) - len(suffix)]
+            if number.isdigit():
+                segments.append(int(number))
+        return sorted(segments)
+
+    def _find_active_segment(self) -> int:
+        rotated = self._rotated_segments()
+        return rotated[-1] + 1 if rotated else 0
+
+    def _load(self) -> None:
+        if self.names_path.exists() and self.index_path.exists():
+            with open(self.names_path, "r", encoding="utf-8") as f:
+                self._names = [json.loads(line) for line in f if line.strip()]
+            self._name_lookup = {name: i for i, name in enumerate(self._names)}
+            raw = self.index_path.read_bytes()
+            rows = array("Q")
+            rows.frombytes(raw[: len(raw) - len(raw) % _ROW.size])
+            # Colunas por fatiamento com passo (feito em C, sem laco Python por registro).
+            self._offsets = rows[0::_FIELDS]
+            self._times = array("d", rows[1::_FIELDS].tobytes())
+            self._name_ids = rows[2::_FIELDS]
+            self._packed = rows[3::_FIELDS]
+            if self._packed and self._packed[-1] >> 16 > self.segment:
+                self._rebuild()  # segmentos apagados/renomeados por fora
+            else:
+                self._catch_up()
+        else:
+            self._rebuild()
+        self._trim_partial_line()
+
+    def _trim_partial_line(self) -> None:
+        """
+        Corta do log ativo uma ultima linha sem quebra (queda no meio da escrita): sem isso, o proximo
+        registro seria gravado colado nela e o _rebuild nao conseguiria le-lo.
+        """
+        try:
+            f = open(self.path, "r+b")
+        except FileNotFoundError:
+            return
+        with f:
+            end = f.seek(0, os.SEEK_END)
+            pos = end
+            while pos > 0:
+                start = max(0, pos - TAIL_BLOCK)
+                f.seek(start)
+                block = f.read(pos - start)
+                if pos == end and block.endswith(b"\n"):
+                    return
+                newline = block.rfind(b"\n")
+                if newline != -1:
+                    f.truncate(start + newline + 1)
+                    return
+                pos = start
+            f.truncate(0)
+
+    def _rebuild(self) -> None:
+        """
+        Reconstroi indice e tabela de nomes lendo todos os segmentos.
+        """
+        self._offsets, self._times, self._name_ids, self._packed = array("Q"), array("d"), array("Q"), array("Q")
+        self._names, self._name_lookup, self._by_name = [], {}, {}
+        for path in (self.index_path, self.names_path):
+            path.unlink(missing_ok=True)
+        for segment in self._rotated_segments() + [self.segment]:
+            self._scan(segment, 0)
+
+    def _catch_up(self) -> None:
+        """
+        Indexa linhas gravadas no log depois da ultima entrada do indice (ex.: queda entre as duas escritas).
+        """
+        start = 0
+        if self._packed and self._packed[-1] >> 16 == self.segment:
+            if not self.path.exists() or self._offsets[-1] >= self.path.stat().st_size:
+                self._rebuild()  # log truncado ou trocado
+                return
+            with open(self.path, "rb") as f:
+                f.seek(self._offsets[-1])
+                f.readline()
+                start = f.tell()
+        self._scan(self.segment, start)
+
+    def _scan(self, segment: int, start: int) -> None:
+        path = self._segment_path(segment)
+        if not path.exists():
+            return
+        rows = []
+        with open(path, "rb") as f:
+            f.seek(start)
+            offset = start
+            for line in f:
+                record = _parse(line)
+                if record is not None:
+                    rows.append(self._row(offset, record, segment))
+                offset += len(line)
+        self._append_rows(rows)
+
+    def _row(self, offset: int, record: dict, segment: int) -> tuple[int, float, int, int]:
+        name = record.get("name") or ""
+        name_id = self._name_lookup.get(name)
+        if name_id is None:
+            name_id = len(self._names)
+            self._names.append(name)
+            self._name_lookup[name] = name_id
+            with open(self.names_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(name, ensure_ascii=False) + "\n")
+        status = record.get("status") or 0
+        return offset, float(record.get("time", 0.0)), name_id, (segment << 16) | (status & 0xFFFF)
+
+    def _append_rows(self, rows: list[tuple[int, float, int, int]]) -> None:
+        if not rows:
+            return
+        with open(self.index_path, "ab") as f:
+            f.write(b"".join(_ROW.pack(*row) for row in rows))
+        for offset, when, name_id, packed in rows:
+            position = len(self._offsets)
+            self._offsets.append(offset)
+            self._times.append(when)
+            self._name_ids.append(name_id)
+            self._packed.append(packed)
+            postings = self._by_name.get(name_id)
+            if postings is not None:
+                postings.append(position)
+
+    def append(self, record: dict, response: str | None = None, response_file=None) -> None:
+        """
+        Grava um envio. `response` (texto) ou `response_file` (arquivo binario aberto, lido ate o fim)
+        vao inline quando pequenos e para HISTORY_BLOB_DIR quando passam de INLINE_LIMIT.
+        """
+        record = dict(record, history=1)
+        record.setdefault("time", time.time())
+        if response_file is not None:
+            self.blob_dir.mkdir(exist_ok=True)
+            blob = self.blob_dir / f"{uuid.uuid4().hex}.txt"
+            with open(blob, "wb") as out:
+                shutil.copyfileobj(response_file, out)
+            record["response_file"] = blob.relative_to(self.path.parent).as_posix()
+            record["response_size"] = blob.stat().st_size
+        elif response is not None:
+            data = response.encode("utf-8")
+            record["response_size"] = len(data)
+            if len(data) > INLINE_LIMIT:
+                self.blob_dir.mkdir(exist_ok=True)
+                blob = self.blob_dir / f"{uuid.uuid4().hex}.txt"
+                blob.write_bytes(data)
+                record["response_file"] = blob.relative_to(self.path.parent).as_posix()
+            else:
+                record["response"] = response
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            with open(self.path, "ab") as f:
+                offset = f.tell()
+                f.write(line)
+            self._append_rows([self._row(offset, record, self.segment)])
+            if offset + len(line) >= self.rotate_bytes:
+                self._rotate()
+
+    def _rotate(self) -> None:
+        os.replace(self.path, self.path.with_name(f"{self.path.stem}.{self.segment}{self.path.suffix}"))
+        self.segment += 1
+        self._compact()
+
+    def compact(self) -> None:
+        with self._lock:
+            self._compact()
+
+    def _compact(self) -> None:
+        """
+        Apaga os segmentos alem de max_segments (e as respostas gravadas a parte) e reescreve o indice.
+        """
+        first_kept = self.segment - self.max_segments + 1
+        dropped = [segment for segment in self._rotated_segments() if segment < first_kept]
+        if not dropped:
+            return
+        for segment in dropped:
+            path = self._segment_path(segment)
+            with open(path, "rb") as f:
+                for line in f:
+                    record = _parse(line)
+                    if record is not None and record.get("response_file"):
+                        (self.path.parent / record["response_file"]).unlink(missing_ok=True)
+            path.unlink()
+        # Segmentos crescem junto com a posicao: os registros removidos sao um prefixo do indice.
+        cut = bisect_left(_SegmentView(self._packed), first_kept)
+        self._offsets = self._offsets[cut:]
+        self._times = self._times[cut:]
+        self._name_ids = self._name_ids[cut:]
+        self._packed = self._packed[cut:]
+        self._by_name = {}
+        tmp = self.index_path.with_name(self.index_path.name + ".tmp")
+        rows = array("Q", bytes(len(self._offsets) * _ROW.size))
+        rows[0::_FIELDS] = self._offsets
+        rows[1::_FIELDS] = array("Q", self._times.tobytes())
+        rows[2::_FIELDS] = self._name_ids
+        rows[3::_FIELDS] = self._packed
+        with open(tmp, "wb") as f:
+            f.write(rows.tobytes())
+        os.replace(tmp, self.index_path)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def names(self) -> list[str]:
+        with self._lock:
+            return [name for name in self._names if name]
+
+    def latest(
+        self,
+        limit: int = PAGE_SIZE,
+        name: str | None = None,
+        status_class: int | None = None,
+        before: int | None = None,
+        since: float | None = None,
+    ) -> list[int]:
+        """
+        Posicoes dos registros mais recentes (da mais nova para a mais antiga) que atendem aos filtros.
+        status_class: 2 para 2xx, 4 para 4xx...; 0 para envios sem status (falha de conexao).
+        before: continua a partir de uma posicao (paginacao); since: horario minimo (epoch).
+        """
+        with self._lock:
+            end = len(self._offsets) if before is None else before
+            first = bisect_left(self._times, since) if since is not None else 0
+            if name is not None:
+                name_id = self._name_lookup.get(name)
+                if name_id is None:
+                    return []
+                postings = self._postings(name_id)
+                candidates = reversed(postings[bisect_left(postings, first) : bisect_left(postings, end)])
+            else:
+                candidates = range(end - 1, first - 1, -1)
+            if status_class is not None:
+                packed = self._packed
+                candidates = (p for p in candidates if (packed[p] & 0xFFFF) // 100 == status_class)
+            return list(itertools.islice(candidates, limit))
+
+    def _postings(self, name_id: int) -> array:
+        postings = self._by_name.get(name_id)
+        if postings is None:
+            postings = array("Q", itertools.compress(itertools.count(), map(name_id.__eq__, self._name_ids)))
+            self._by_name[name_id] = postings
+        return postings
+
+    def summary(self, position: int) -> tuple[float, str, int]:
+        """
+        (horario, nome, status) direto do indice, sem ler o log.
+        """
+        with self._lock:
+            return self._times[position], self._names[self._name_ids[position]], self._packed[position] & 0xFFFF
+
+    def read(self, position: int) -> dict:
+        with self._lock:
+            path = self._segment_path(self._packed[position] >> 16)
+            offset = self._offsets[position]
+        with open(path, "rb") as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    def read_response(self, record: dict, limit: int | None = None) -> tuple[str, bool]:
+        """
+        Texto da resposta (ate `limit` bytes se vier de arquivo); retorna (texto, cortado).
+        """
+        if "response" in record:
+            return record["response"], False
+        ref = record.get("response_file")
+        if not ref:
+            return "", False
+        try:
+            with open(self.path.parent / ref, "rb") as f:
+                data = f.read(limit if limit is not None else -1)
+        except OSError:
+            return "[arquivo da resposta nao encontrado]", False
+        cut = limit is not None and record.get("response_size", 0) > len(data)
+        return data.decode("utf-8", errors="replace"), cut
+
+
+class _SegmentView:
+    # Sequencia de segmentos sobre o array compactado, para usar com bisect.
+    def __init__(self, packed: array) -> None:
+        self._packed = packed
+
+    def __len__(self) -> int:
+        return len(self._packed)
+
+    def __getitem__(self, index: int) -> int:
+        return self._packed[index] >> 16
+
+
+def _parse(line: bytes) -> dict | None:
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(record, dict) or record.get("history") != 1:
+        return None
+    return record
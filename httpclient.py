@@ -0,0 +1,345 @@
+"""
+Engine "http.client": requisicoes em processo, com pool de conexoes persistentes por host.
+Fica fora de transport.py para quem so usa o curl (ex.: a CLI) nao pagar a importacao de http.client/ssl.
+"""
+
+import codecs
+import http.client
+import socket
+import ssl
+import threading
+import time
+from urllib.parse import urlsplit
+
+from compression import ACCEPT_ENCODING, DecodeError, StreamDecoder, make_decoder
+from timing import CURL_VARIABLES
+from transport import (
+    EXIT_READ_ERROR,
+    READ_CHUNK,
+    RequestControl,
+    StreamBuffer,
+    build_curl_command,
+    format_command,
+)
+from uploads import UploadBody, UploadError, has_upload
+
+USER_AGENT = "EndpointTester"
+POOL_MAX_IDLE_PER_HOST = 8
+
+# Codigos de saida do curl reaproveitados pela engine em processo.
+EXIT_UNSUPPORTED_PROTOCOL = 1
+EXIT_URL_MALFORMED = 3
+EXIT_COULDNT_RESOLVE = 6
+EXIT_COULDNT_CONNECT = 7
+EXIT_TIMEOUT = 28
+EXIT_SSL = 35
+EXIT_EMPTY_REPLY = 52
+EXIT_SEND_ERROR = 55
+EXIT_RECV_ERROR = 56
+EXIT_BAD_CONTENT_ENCODING = 61
+
+
+class ConnectionPool:
+    """
+    Conexoes ociosas por (esquema, host, porta), reaproveitadas entre requisicoes.
+    """
+
+    def __init__(self, max_idle_per_host: int = POOL_MAX_IDLE_PER_HOST) -> None:
+        self.max_idle_per_host = max_idle_per_host
+        self._idle: dict[tuple[str, str, int], list[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+        self._ssl_context: ssl.SSLContext | None = None
+
+    def acquire(
+        self, scheme: str, host: str, port: int, timeout: float | None
+    ) -> tuple[http.client.HTTPConnection, bool]:
+        """
+        Retorna (conexao, reutilizada).
+        """
+        key = (scheme, host, port)
+        with self._lock:
+            idle = self._idle.get(key)
+            conn = idle.pop() if idle else None
+        if conn is not None:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            return conn, True
+        if scheme == "https":
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            conn = http.client.HTTPSConnection(host, port, timeout=timeout, context=self._ssl_context)
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=timeout)
+        return conn, False
+
+    def release(self, scheme: str, host: str, port: int, conn: http.client.HTTPConnection) -> None:
+        key = (scheme, host, port)
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close_all(self) -> None:
+        with self._lock:
+            pools = list(self._idle.values())
+            self._idle.clear()
+        for idle in pools:
+            for conn in idle:
+                conn.close()
+
+    def idle_count(self) -> int:
+        with self._lock:
+            return sum(len(idle) for idle in self._idle.values())
+
+
+class HttpClientTransport:
+    name = "http.client"
+
+    def __init__(self, pool: ConnectionPool | None = None) -> None:
+        self.pool = pool or ConnectionPool()
+
+    def close(self) -> None:
+        self.pool.close_all()
+
+    def describe(self, payload: dict) -> str:
+        return format_command(build_curl_command(payload)) + "  # via http.client"
+
+    def execute(
+        self,
+        payload: dict,
+        control: RequestControl | None = None,
+        sink: StreamBuffer | None = None,
+    ) -> tuple[str, str, int]:
+        control = control or RequestControl()
+        display_cmd = format_command(build_curl_command(payload))
+        parts = urlsplit(payload["url"])
+        scheme = parts.scheme.lower()
+        if scheme not in ("http", "https"):
+            return self._fail(display_cmd, EXIT_UNSUPPORTED_PROTOCOL, f"Protocolo nao suportado: {scheme or '?'}")
+        if not parts.hostname:
+            return self._fail(display_cmd, EXIT_URL_MALFORMED, "URL sem host.")
+        try:
+            port = parts.port or (443 if scheme == "https" else 80)
+        except ValueError:
+            return self._fail(display_cmd, EXIT_URL_MALFORMED, "Porta invalida na URL.")
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+
+        headers = {"User-Agent": USER_AGENT, "Accept": "*/*"}
+        headers.update(payload["headers"])
+        upload = None
+        if has_upload(payload):
+            try:
+                upload = control.upload = UploadBody(payload)
+            except UploadError as exc:
+                return self._fail(display_cmd, EXIT_READ_ERROR, str(exc))
+            headers = upload.headers(headers)
+        body = payload["body"].encode("utf-8") if payload["body"] and upload is None else None
+        if body is not None and not any(k.lower() == "content-type" for k in headers):
+            # Mesmo default do curl --data-raw.
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        compressed = bool(payload.get("compressed"))
+        if compressed and not any(k.lower() == "accept-encoding" for k in headers):
+            headers["Accept-Encoding"] = ACCEPT_ENCODING
+
+        deadline = time.monotonic() + control.timeout if control.timeout else None
+        started = time.perf_counter()
+        timing = dict.fromkeys(CURL_VARIABLES, 0.0)
+        control.timing = timing
+        # Uma conexao reaproveitada pode ter sido fechada pelo servidor; tenta de novo com uma nova.
+        for attempt in range(2):
+            conn, reused = self.pool.acquire(scheme, parts.hostname, port, control.timeout)
+            if not control.attach(lambda conn=conn: self._abort(conn)):
+                conn.close()
+                return self._fail(display_cmd, EXIT_RECV_ERROR, "Requisicao cancelada pelo usuario.")
+            try:
+                if conn.sock is None:
+                    self._connect(conn, started, timing)
+                timing["time_pretransfer"] = time.perf_counter() - started
+                if upload is not None:
+                    # Content-Length ja vem em headers: o gerador e enviado como esta, sem chunked.
+                    body = upload.chunks(deadline)
+                conn.request(payload["method"], target, body=body, headers=headers)
+                response = conn.getresponse()
+                timing["time_starttransfer"] = time.perf_counter() - started
+                decoder = make_decoder(response.getheader("Content-Encoding")) if compressed else None
+                if sink is not None:
+                    body_size, decoded_size = self._stream_body(response, deadline, sink, decoder)
+                    raw_body = b""
+                else:
+                    raw_body, body_size = self._read_body(response, deadline, decoder)
+                    decoded_size = len(raw_body)
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError) as exc:
+                conn.close()
+                streamed = sink is not None and sink.bytes_received
+                if reused and attempt == 0 and not streamed and not control.cancelled.is_set():
+                    continue
+                return self._fail(display_cmd, *self._classify(exc, control))
+            except (OSError, http.client.HTTPException) as exc:
+                conn.close()
+                return self._fail(display_cmd, *self._classify(exc, control))
+            except DecodeError as exc:
+                conn.close()
+                return self._fail(display_cmd, EXIT_BAD_CONTENT_ENCODING, str(exc))
+            except UploadError as exc:
+                conn.close()
+                return self._fail(display_cmd, EXIT_READ_ERROR, str(exc))
+            finally:
+                control.detach()
+                timing["time_total"] = time.perf_counter() - started
+            break
+
+        timing["size_download"] = float(body_size)
+        if compressed:
+            # Tamanho na rede (size_download) vs. decodificado, como no curl --compressed.
+            timing["size_decoded"] = float(decoded_size)
+            if decoder is not None:
+                timing["time_decode"] = decoder.elapsed
+        if timing["time_total"] > 0:
+            timing["speed_download"] = body_size / timing["time_total"]
+        if upload is not None:
+            timing["size_upload"] = float(upload.length)
+            timing["speed_upload"] = upload.progress.speed()
+        elif body and timing["time_total"] > 0:
+            timing["size_upload"] = float(len(body))
+            timing["speed_upload"] = len(body) / timing["time_total"]
+
+        if response.will_close:
+            conn.close()
+        else:
+            self.pool.release(scheme, parts.hostname, port, conn)
+
+        display_cmd += f"  # via http.client ({'conexao reutilizada' if reused else 'conexao nova'})"
+        if sink is not None:
+            return display_cmd, "", 0
+        return display_cmd, self._render(response, raw_body), 0
+
+    def _connect(self, conn: http.client.HTTPConnection, started: float, timing: dict) -> None:
+        """
+        Conecta medindo DNS, TCP e (em https) TLS separadamente.
+        """
+
+        def create_connection(address, timeout=None, source_address=None):
+            host, port = address
+            infos = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+            timing["time_namelookup"] = time.perf_counter() - started
+            error: OSError | None = None
+            for *_, sockaddr in infos:
+                try:
+                    sock = socket.create_connection(sockaddr[:2], timeout, source_address)
+                except OSError as exc:
+                    error = exc
+                    continue
+                timing["time_connect"] = time.perf_counter() - started
+                return sock
+            raise error or OSError(f"sem enderecos para {host}")
+
+        # HTTPConnection.connect usa _create_connection (o TLS, em https, vem depois).
+        conn._create_connection = create_connection
+        try:
+            conn.connect()
+        finally:
+            conn._create_connection = socket.create_connection
+        if isinstance(conn, http.client.HTTPSConnection):
+            timing["time_appconnect"] = time.perf_counter() - started
+
+    def _read_body(
+        self, response: http.client.HTTPResponse, deadline: float | None, decoder: StreamDecoder | None = None
+    ) -> tuple[bytes, int]:
+        """
+        (corpo decodificado, bytes recebidos da rede).
+        """
+        chunks = []
+        size = 0
+        while True:
+            if deadline is not None and time.monotonic() > deadline:
+                raise socket.timeout("tempo limite excedido durante a leitura")
+            chunk = response.read(READ_CHUNK)
+            if not chunk:
+                break
+            size += len(chunk)
+            chunks.append(decoder.decode(chunk) if decoder is not None else chunk)
+        if decoder is not None:
+            chunks.append(decoder.flush())
+        return b"".join(chunks), size
+
+    def _stream_body(
+        self,
+        response: http.client.HTTPResponse,
+        deadline: float | None,
+        sink: StreamBuffer,
+        content_decoder: StreamDecoder | None = None,
+    ) -> tuple[int, int]:
+        """
+        Retorna (bytes recebidos da rede, bytes do corpo decodificado).
+        """
+        head = self._render_head(response)
+        sink.write(head, len(head))
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        size = decoded_size = 0
+        while True:
+            if deadline is not None and time.monotonic() > deadline:
+                raise socket.timeout("tempo limite excedido durante a leitura")
+            # read1 devolve o que ja chegou, sem esperar completar o bloco (importante para SSE).
+            chunk = response.read1(READ_CHUNK)
+            if not chunk:
+                break
+            size += len(chunk)
+            if content_decoder is not None:
+                chunk = content_decoder.decode(chunk)
+            decoded_size += len(chunk)
+            sink.write(decoder.decode(chunk), len(chunk))
+        if content_decoder is not None:
+            tail = content_decoder.flush()
+            decoded_size += len(tail)
+            sink.write(decoder.decode(tail), len(tail))
+        sink.write(decoder.decode(b"", final=True), 0)
+        # read1 nao marca a resposta como lida ao fim do Content-Length; sem isso a conexao do pool
+        # recusaria a proxima requisicao (CannotSendRequest).
+        response.close()
+        return size, decoded_size
+
+    def _render_head(self, response: http.client.HTTPResponse) -> str:
+        version = "HTTP/1.0" if response.version == 10 else "HTTP/1.1"
+        lines = [f"{version} {response.status} {response.reason}"]
+        lines.extend(f"{key}: {value}" for key, value in response.getheaders())
+        return "\r\n".join(lines) + "\r\n\r\n"
+
+    def _render(self, response: http.client.HTTPResponse, raw_body: bytes) -> str:
+        return self._render_head(response) + raw_body.decode("utf-8", errors="replace")
+
+    def _abort(self, conn: http.client.HTTPConnection) -> None:
+        sock = conn.sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        conn.close()
+
+    def _classify(self, exc: Exception, control: RequestControl) -> tuple[int, str]:
+        if control.cancelled.is_set():
+            return EXIT_RECV_ERROR, "Requisicao cancelada pelo usuario."
+        if isinstance(exc, (socket.timeout, TimeoutError)):
+            control.timed_out = True
+            if not control.timeout:
+                return EXIT_TIMEOUT, f"Tempo limite excedido: {exc}"  # do sistema (ex.: connect), sem timeout nosso
+            return EXIT_TIMEOUT, f"Tempo limite de {control.timeout:g}s excedido."
+        if isinstance(exc, socket.gaierror):
+            return EXIT_COULDNT_RESOLVE, f"Nao foi possivel resolver o host: {exc}"
+        if isinstance(exc, ssl.SSLError):
+            return EXIT_SSL, f"Erro de TLS: {exc}"
+        if isinstance(exc, http.client.RemoteDisconnected):
+            return EXIT_EMPTY_REPLY, "Servidor fechou a conexao sem resposta."
+        if isinstance(exc, ConnectionRefusedError):
+            return EXIT_COULDNT_CONNECT, f"Falha ao conectar: {exc}"
+        if isinstance(exc, BrokenPipeError):
+            return EXIT_SEND_ERROR, f"Falha ao enviar: {exc}"
+        return EXIT_RECV_ERROR, f"Falha na comunicacao: {exc}"
+
+    def _fail(self, display_cmd: str, exit_code: int, message: str) -> tuple[str, str, int]:
+        return display_cmd, f"\n[stderr]\nhttp.client: ({exit_code}) {message}\n", exit_code
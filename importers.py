@@ -0,0 +1,670 @@
+"""
+Importacao de endpoints para a colecao, a partir de:
+- HAR exportado pelo navegador: lido em blocos, um item de log.entries decodificado por vez, entao um arquivo
+  de centenas de MB nunca fica inteiro na memoria (so a maior entrada);
+- comandos `curl ...` colados ou num arquivo (um por comando, com continuacao `\\` e aspas em varias linhas),
+  o inverso do comando exibido pelo transporte;
+- documentos OpenAPI 3 / Swagger 2 em JSON, ou YAML se o PyYAML estiver instalado.
+Os leitores sao geradores de payloads. ImportBatch junta o que foi lido descartando nomes repetidos na leva;
+`commit` descarta os que ja existem na EndpointStore (pelo indice de nomes) e grava o resto de uma vez.
+"""
+
+import base64
+import json
+import re
+import threading
+from pathlib import Path
+from urllib.parse import quote, urlencode, urlsplit
+
+from payload import METHODS, build_payload, headers_to_text
+from uploads import form_to_text, parse_form
+
+FORMATS = ("har", "curl", "openapi")
+READ_CHUNK = 1024 * 1024
+DETECT_CHARS = 4096
+API_RESOURCE_TYPES = ("xhr", "fetch")  # _resourceType do Chrome; sem o campo, vale o tipo da resposta
+STATIC_MIME_PREFIXES = ("image/", "font/", "audio/", "video/", "text/css", "text/javascript", "application/javascript")
+SKIPPED_HEADERS = ("host", "content-length", "connection", "keep-alive", "transfer-encoding", "te", "upgrade")
+OPENAPI_METHODS = ("get", "put", "post", "delete", "options", "head", "patch")
+CURL_START = re.compile(r"(?:\$\s+)?curl(?:\.exe)?(?:\s|$)")
+PATH_PARAM = re.compile(r"\{([^{}]+)\}")
+
+# Opcoes do curl sem efeito no endpoint salvo, mas que consomem o argumento seguinte.
+CURL_IGNORED_WITH_ARG = {
+    "-o", "--output", "-w", "--write-out", "-m", "--max-time", "--connect-timeout", "-x", "--proxy",
+    "-U", "--proxy-user", "-E", "--cert", "--key", "--cacert", "--capath", "-K", "--config", "-c", "--cookie-jar",
+    "-D", "--dump-header", "-r", "--range", "--retry", "--retry-delay", "--retry-max-time", "--limit-rate",
+    "--max-redirs", "--resolve", "--connect-to", "--interface", "--local-port", "--ciphers", "--trace",
+    "--trace-ascii", "--stderr", "-y", "--speed-time", "-Y", "--speed-limit", "-z", "--time-cond",
+    "--parallel-max", "--keepalive-time", "--expect100-timeout", "--cert-type", "--key-type", "--pass",
+}
+CURL_SHORT_WITH_ARG = "XHdFTAebuoxwmUEKcDryYzC"
+CURL_LONG_WITH_ARG = {
+    "--request", "--header", "--data", "--data-ascii", "--data-raw", "--data-binary", "--data-urlencode",
+    "--json", "--form", "--form-string", "--upload-file", "--user", "--user-agent", "--referer", "--cookie",
+    "--url",
+}
+CURL_ALIASES = {
+    "-X": "--request", "-H": "--header", "-d": "--data", "-F": "--form", "-T": "--upload-file", "-u": "--user",
+    "-A": "--user-agent", "-e": "--referer", "-b": "--cookie", "-I": "--head", "-G": "--get",
+}
+
+
+def endpoint_name(method: str, url: str) -> str:
+    """
+    Nome padrao de um endpoint importado: metodo e caminho da URL (sem a query).
+    """
+    path = urlsplit(url).path or "/"
+    return f"{method} {path}"
+
+
+def _payload(
+    method: str,
+    url: str,
+    headers: dict,
+    body: str = "",
+    name: str = "",
+    compressed: bool = False,
+    body_file: str = "",
+    form: list[dict] | None = None,
+) -> dict:
+    method = method.upper()
+    if method not in METHODS:
+        raise ValueError(f"Metodo nao suportado: {method}")
+    return build_payload(
+        name or endpoint_name(method, url),
+        url,
+        method,
+        headers_to_text(headers),
+        body,
+        compressed=compressed,
+        body_file=body_file,
+        form_text=form_to_text(form) if form else "",
+    )
+
+
+class _JsonStream:
+    """
+    Texto JSON lido em blocos; `value()` decodifica o proximo valor inteiro, lendo mais se ele estiver cortado.
+    """
+
+    def __init__(self, f, chunk_size: int = READ_CHUNK) -> None:
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self, at_least: int) -> bool:
+        if self.eof:
+            return False
+        if self.pos:
+            self.buf, self.pos = self.buf[self.pos :], 0
+        data = self.f.read(max(self.chunk_size, at_least))
+        if not data:
+            self.eof = True
+            return False
+        self.buf += data
+        return True
+
+    def peek(self) -> str:
+        """
+        Proximo caractere que nao e espaco ("" no fim do arquivo).
+        """
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill(0):
+                return ""
+
+    def expect(self, chars: str) -> str:
+        ch = self.peek()
+        if not ch or ch not in chars:
+            raise ValueError(f"JSON invalido: esperado {' ou '.join(chars)}, encontrado {ch or 'fim do arquivo'}")
+        self.pos += 1
+        return ch
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as exc:
+                # Cortado no fim do bloco: le mais (ao menos o que ja esta pendente, para nao decodificar
+                # a mesma entrada grande muitas vezes) e tenta de novo.
+                if not self._fill(len(self.buf) - self.pos):
+                    raise ValueError(f"JSON invalido: {exc}") from None
+                continue
+            if end == len(self.buf) and self._fill(0):
+                continue  # um numero no fim do bloco pode continuar no proximo
+            self.pos = end
+            return value
+
+    def members(self):
+        """
+        Chave de cada membro do objeto atual; a cada chave, quem itera consome o valor (`value()` para pular).
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.expect(",}") == "}":
+                return
+
+
+def iter_har_entries(f, chunk_size: int = READ_CHUNK):
+    """
+    Itens de log.entries de um HAR aberto em modo texto, um por vez.
+    """
+    stream = _JsonStream(f, chunk_size)
+    for key in stream.members():
+        if key != "log":
+            stream.value()
+            continue
+        for log_key in stream.members():
+            if log_key != "entries":
+                stream.value()  # version, creator, pages...: pequenos
+                continue
+            stream.expect("[")
+            if stream.peek() == "]":
+                stream.pos += 1
+                continue
+            while True:
+                yield stream.value()
+                if stream.expect(",]") == "]":
+                    break
+
+
+def _is_static(entry: dict) -> bool:
+    resource_type = entry.get("_resourceType")
+    if resource_type:
+        return resource_type not in API_RESOURCE_TYPES
+    mime = ((entry.get("response") or {}).get("content") or {}).get("mimeType") or ""
+    return mime.lower().startswith(STATIC_MIME_PREFIXES)
+
+
+def har_entry_payload(entry: dict) -> dict:
+    """
+    Uma entrada do HAR -> payload. Accept-Encoding vira `compressed`; headers de conexao e pseudo-headers
+    do HTTP/2 (:authority...) ficam de fora. Levanta ValueError.
+    """
+    request = entry.get("request") or {}
+    url = request.get("url") or ""
+    if not url.startswith(("http://", "https://")):
+        raise ValueError(f"URL nao HTTP: {url[:80]}")
+    headers: dict[str, str] = {}
+    compressed = False
+    for header in request.get("headers") or []:
+        name, value = str(header.get("name", "")), str(header.get("value", ""))
+        lower = name.lower()
+        if lower == "accept-encoding":
+            compressed = True
+            continue
+        if not name or name.startswith(":") or lower in SKIPPED_HEADERS:
+            continue
+        existing = next((key for key in headers if key.lower() == lower), None)
+        if existing is not None and lower == "cookie":
+            headers[existing] += "; " + value  # HTTP/2 manda um header cookie por par
+        else:
+            headers[existing or name] = value
+    post = request.get("postData") or {}
+    body = post.get("text") or ""
+    if not body and post.get("params"):
+        body = urlencode([(param.get("name", ""), param.get("value", "")) for param in post["params"]])
+    return _payload(request.get("method") or "GET", url, headers, body, compressed=compressed)
+
+
+def read_har(path: Path, include_static: bool = False, errors: list[str] | None = None):
+    """
+    Payloads das requisicoes de um HAR. Sem `include_static`, so as chamadas de API (xhr/fetch, ou respostas
+    que nao sao imagem/css/js/fonte). Entradas invalidas vao para `errors` e sao puladas.
+    """
+    with open(path, encoding="utf-8-sig", errors="replace") as f:
+        for number, entry in enumerate(iter_har_entries(f), 1):
+            if not isinstance(entry, dict) or (not include_static and _is_static(entry)):
+                continue
+            try:
+                yield har_entry_payload(entry)
+            except ValueError as exc:
+                if errors is not None:
+                    errors.append(f"entrada {number}: {exc}")
+
+
+def _ansi_c(text: str) -> str:
+    # $'...' do bash (usado pelo "Copiar como cURL" do navegador): \n, \t, \xHH, \uHHHH, \' ...
+    return text.encode("latin-1", "backslashreplace").decode("unicode_escape")
+
+
+def split_command(text: str) -> list[str] | None:
+    """
+    Palavras de uma linha de comando no estilo do bash ('...', "...", $'...', \\ e continuacao de linha).
+    None se alguma aspa ficou aberta (o comando continua na linha seguinte).
+    """
+    text = text.replace("\r\n", "\n")
+    words: list[str] = []
+    word: list[str] = []
+    in_word = False
+    i, size = 0, len(text)
+    while i < size:
+        ch = text[i]
+        if ch == "\\":
+            if i + 1 < size and text[i + 1] != "\n":
+                word.append(text[i + 1])
+                in_word = True
+            i += 2
+        elif ch.isspace():
+            if in_word:
+                words.append("".join(word))
+                word, in_word = [], False
+            i += 1
+        elif ch == "'":
+            end = text.find("'", i + 1)
+            if end == -1:
+                return None
+            word.append(text[i + 1 : end])
+            in_word, i = True, end + 1
+        elif ch == "$" and text.startswith("'", i + 1):
+            end = i + 2
+            while end < size and text[end] != "'":
+                end += 2 if text[end] == "\\" else 1
+            if end >= size:
+                return None
+            word.append(_ansi_c(text[i + 2 : end]))
+            in_word, i = True, end + 1
+        elif ch == '"':
+            end = i + 1
+            while end < size and text[end] != '"':
+                if text[end] == "\\" and end + 1 < size and text[end + 1] in '"\\$`\n':
+                    if text[end + 1] != "\n":
+                        word.append(text[end + 1])
+                    end += 2
+                    continue
+                word.append(text[end])
+                end += 1
+            if end >= size:
+                return None
+            in_word, i = True, end + 1
+        else:
+            word.append(ch)
+            in_word = True
+            i += 1
+    if in_word:
+        words.append("".join(word))
+    return words
+
+
+def _curl_options(args: list[str]):
+    """
+    (opcao, argumento) na ordem do comando; posicionais vem como (None, valor). `-sSL`, `-XPOST` e
+    `--opcao=valor` sao separados.
+    """
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        i += 1
+        if arg == "--":
+            for rest in args[i:]:
+                yield None, rest
+            return
+        if arg.startswith("--") and len(arg) > 2:
+            option, sep, value = arg.partition("=")
+            if sep:
+                yield option, value
+            elif option in CURL_LONG_WITH_ARG or option in CURL_IGNORED_WITH_ARG:
+                yield option, args[i] if i < len(args) else ""
+                i += 1
+            else:
+                yield option, None
+        elif arg.startswith("-") and len(arg) > 1:
+            for pos in range(1, len(arg)):
+                letter = arg[pos]
+                if letter in CURL_SHORT_WITH_ARG:
+                    if pos + 1 < len(arg):
+                        yield f"-{letter}", arg[pos + 1 :]
+                    else:
+                        yield f"-{letter}", args[i] if i < len(args) else ""
+                        i += 1
+                    break
+                yield f"-{letter}", None
+        else:
+            yield None, arg
+
+
+def _urlencode_arg(value: str) -> str:
+    name, sep, content = value.partition("=")
+    if not sep:
+        return quote(value, safe="")
+    return f"{name}={quote(content, safe='')}" if name else quote(content, safe="")
+
+
+def parse_curl(command: str) -> dict:
+    """
+    Um comando `curl ...` -> payload (inverso de transport.build_curl_command). Levanta ValueError.
+    """
+    args = split_command(command.strip())
+    if args is None:
+        raise ValueError("Comando curl com aspas sem fechar.")
+    if args and args[0] == "$":
+        args = args[1:]
+    if not args or args[0] not in ("curl", "curl.exe"):
+        raise ValueError("O comando deve comecar com curl.")
+    method = None
+    url = ""
+    headers: dict[str, str] = {}
+    data: list[str] = []
+    form: list[dict] = []
+    body_file = ""
+    compressed = head = get = False
+    for option, value in _curl_options(args[1:]):
+        option = CURL_ALIASES.get(option, option)
+        if option is None:
+            url = url if url.startswith(("http://", "https://")) else value
+        elif option == "--url":
+            url = value
+        elif option == "--request":
+            method = value.upper()
+        elif option == "--header":
+            key, sep, header_value = value.partition(":")
+            if not sep and key.endswith(";"):
+                headers[key[:-1].strip()] = ""  # `-H "Nome;"`: header vazio
+            elif sep and header_value.strip():
+                headers[key.strip()] = header_value.strip()
+        elif option in ("--data", "--data-ascii", "--data-binary") and value.startswith("@"):
+            body_file = value[1:]
+        elif option in ("--data", "--data-ascii", "--data-binary", "--data-raw"):
+            data.append(value)
+        elif option == "--data-urlencode":
+            data.append(_urlencode_arg(value))
+        elif option == "--json":
+            data.append(value)
+            headers.setdefault("Content-Type", "application/json")
+            headers.setdefault("Accept", "application/json")
+        elif option == "--form":
+            form.extend(parse_form(value))
+        elif option == "--form-string":
+            name, _, text = value.partition("=")
+            form.append({"name": name.strip(), "value": text})
+        elif option == "--upload-file":
+            if value == "-":
+                raise ValueError("Upload pelo stdin (-T -) nao pode ser importado.")
+            body_file = value
+            method = method or "PUT"
+        elif option == "--compressed":
+            compressed = True
+        elif option == "--head":
+            head = True
+        elif option == "--get":
+            get = True
+        elif option == "--user":
+            headers["Authorization"] = "Basic " + base64.b64encode(value.encode("utf-8")).decode("ascii")
+        elif option == "--user-agent":
+            headers["User-Agent"] = value
+        elif option == "--referer":
+            headers["Referer"] = value
+        elif option == "--cookie" and "=" in value:
+            headers["Cookie"] = value  # sem "=" e um arquivo de cookies: ignorado
+    if not url:
+        raise ValueError("Comando curl sem URL.")
+    if "://" not in url:
+        url = "http://" + url  # como o curl
+    body = "&".join(data)
+    if get and body:
+        url += ("&" if urlsplit(url).query else "?") + body
+        body = ""
+    if method is None:
+        method = "HEAD" if head else "POST" if body or body_file or form else "GET"
+    return _payload(method, url, headers, body, compressed=compressed, body_file=body_file, form=form)
+
+
+def read_curl_commands(lines):
+    """
+    Texto de cada comando curl de um script/colagem: comeca numa linha `curl ...` (ou `$ curl ...`) e segue
+    enquanto a linha termina em `\\` ou ha aspas abertas. Outras linhas (comentarios, saidas) sao ignoradas.
+    """
+    pending: list[str] = []
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if not pending:
+            line = line.lstrip()
+            if not CURL_START.match(line):
+                continue
+        pending.append(line)
+        if line.endswith("\\"):
+            continue
+        text = "\n".join(pending)
+        if split_command(text) is None:
+            continue
+        pending = []
+        yield text
+    if pending:
+        yield "\n".join(pending)  # aspas sem fechar: parse_curl explica
+
+
+def read_curl(lines, errors: list[str] | None = None):
+    for number, command in enumerate(read_curl_commands(lines), 1):
+        try:
+            yield parse_curl(command)
+        except ValueError as exc:
+            if errors is not None:
+                errors.append(f"comando {number}: {exc}")
+
+
+def _load_document(text: str) -> dict:
+    try:
+        doc = json.loads(text)
+    except ValueError:
+        try:
+            import yaml  # opcional: so para OpenAPI em YAML
+        except ImportError:
+            raise ValueError("Documento nao e JSON; para OpenAPI em YAML instale o PyYAML.") from None
+        try:
+            doc = yaml.safe_load(text)
+        except yaml.YAMLError as exc:
+            raise ValueError(f"YAML invalido: {exc}") from None
+    if not isinstance(doc, dict) or not ("openapi" in doc or "swagger" in doc):
+        raise ValueError("Documento sem o campo openapi/swagger.")
+    return doc
+
+
+def _resolve(doc: dict, node):
+    """
+    Segue referencias locais (`$ref: "#/components/..."`); referencias externas ficam como estao.
+    """
+    for _ in range(32):
+        if not isinstance(node, dict) or not str(node.get("$ref", "")).startswith("#/"):
+            return node
+        target = doc
+        for part in node["$ref"][2:].split("/"):
+            part = part.replace("~1", "/").replace("~0", "~")
+            target = target.get(part) if isinstance(target, dict) else None
+        node = target
+    return node
+
+
+def _base_url(doc: dict) -> str:
+    if "swagger" in doc:
+        host = doc.get("host")
+        if not host:
+            return "{{base_url}}" + (doc.get("basePath") or "").rstrip("/")
+        scheme = (doc.get("schemes") or ["https"])[0]
+        return f"{scheme}://{host}{doc.get('basePath') or ''}".rstrip("/")
+    servers = doc.get("servers") or [{}]
+    server = servers[0] if isinstance(servers[0], dict) else {}
+    url = server.get("url") or ""
+    for name, variable in (server.get("variables") or {}).items():
+        url = url.replace("{" + name + "}", str((variable or {}).get("default", "")))
+    if "://" not in url:
+        url = "{{base_url}}" + url  # sem servidor (ou relativo): {{base_url}} para preencher
+    return url.rstrip("/")
+
+
+def _example_text(doc: dict, media: dict, schema) -> str:
+    if "example" in media:
+        example = media["example"]
+    elif media.get("examples"):
+        first = _resolve(doc, next(iter(media["examples"].values())))
+        example = first.get("value") if isinstance(first, dict) else None
+    else:
+        schema = _resolve(doc, schema)
+        example = schema.get("example") if isinstance(schema, dict) else None
+    if example is None:
+        return ""
+    return example if isinstance(example, str) else json.dumps(example, indent=2, ensure_ascii=False)
+
+
+def openapi_payloads(doc: dict, base_url: str = "", errors: list[str] | None = None):
+    """
+    Uma operacao por payload: nome = operationId (ou metodo e caminho da spec), parametros de caminho e os obrigatorios
+    de query/header como `{{nome}}` (preenchidos na execucao parametrizada) e body do exemplo, se houver.
+    """
+    base = base_url.rstrip("/") or _base_url(doc)
+    for path, item in (doc.get("paths") or {}).items():
+        item = _resolve(doc, item)
+        if not isinstance(item, dict):
+            continue
+        shared = item.get("parameters") or []
+        for method in OPENAPI_METHODS:
+            operation = item.get(method)
+            if not isinstance(operation, dict):
+                continue
+            params = {}
+            for param in [*shared, *(operation.get("parameters") or [])]:
+                param = _resolve(doc, param)
+                if isinstance(param, dict) and param.get("name"):
+                    params[(param["name"], param.get("in"))] = param
+            query, headers, body = [], {}, ""
+            for (name, location), param in params.items():
+                if location == "query" and param.get("required"):
+                    query.append(f"{name}={{{{{name}}}}}")
+                elif location == "header" and param.get("required"):
+                    headers[name] = f"{{{{{name}}}}}"
+                elif location == "body":  # Swagger 2
+                    headers.setdefault("Content-Type", (operation.get("consumes") or ["application/json"])[0])
+                    body = _example_text(doc, param, param.get("schema"))
+            content = (_resolve(doc, operation.get("requestBody")) or {}).get("content") or {}
+            if content:
+                media_type = "application/json" if "application/json" in content else next(iter(content))
+                media = content[media_type] or {}
+                headers["Content-Type"] = media_type
+                body = _example_text(doc, media, media.get("schema"))
+            url = base + PATH_PARAM.sub(r"{{\1}}", path)
+            if query:
+                url += "?" + "&".join(query)
+            try:
+                name = str(operation.get("operationId") or f"{method.upper()} {path}")
+                yield _payload(method, url, headers, body, name=name)
+            except ValueError as exc:
+                if errors is not None:
+                    errors.append(f"{method.upper()} {path}: {exc}")
+
+
+def read_openapi(path: Path, base_url: str = "", errors: list[str] | None = None):
+    """
+    O documento e carregado inteiro (specs sao pequenas); as operacoes saem uma a uma.
+    """
+    doc = _load_document(Path(path).read_text(encoding="utf-8-sig"))
+    yield from openapi_payloads(doc, base_url, errors)
+
+
+def detect_format(path: Path) -> str:
+    """
+    har, curl ou openapi, pela extensao e, se preciso, pelo inicio do arquivo. Levanta ValueError.
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".har":
+        return "har"
+    if suffix in (".yaml", ".yml"):
+        return "openapi"
+    with open(path, encoding="utf-8-sig", errors="replace") as f:
+        head = f.read(DETECT_CHARS)
+    if any(CURL_START.match(line.lstrip()) for line in head.splitlines()):
+        return "curl"
+    if re.search(r'"(openapi|swagger)"\s*:|^(openapi|swagger)\s*:', head, re.MULTILINE):
+        return "openapi"
+    if re.search(r'"log"\s*:', head):
+        return "har"
+    raise ValueError(f"Formato nao reconhecido: {path.name} (use HAR, OpenAPI ou comandos curl).")
+
+
+def read_file(path: Path, fmt: str = "", include_static: bool = False, base_url: str = "", errors=None):
+    """
+    Payloads de um arquivo no formato `fmt` (vazio: detectado).
+    """
+    fmt = fmt or detect_format(path)
+    if fmt == "har":
+        return read_har(path, include_static, errors)
+    if fmt == "openapi":
+        return read_openapi(path, base_url, errors)
+    if fmt == "curl":
+        return _read_curl_file(Path(path), errors)
+    raise ValueError(f"Formato desconhecido: {fmt} (use {', '.join(FORMATS)}).")
+
+
+def _read_curl_file(path: Path, errors):
+    with open(path, encoding="utf-8-sig", errors="replace") as f:
+        yield from read_curl(f, errors)
+
+
+class ImportBatch:
+    """
+    Leva de importacao. `extend` (pode rodar fora da thread da UI) junta os payloads lidos, sem repetir nome;
+    `commit` (na thread dona da store) grava os que ainda nao existem com uma unica escrita.
+    """
+
+    def __init__(self) -> None:
+        self.payloads: list[dict] = []
+        self.errors: list[str] = []
+        self.read = 0
+        self.repeated = 0
+        self.existing = 0
+        self.added = 0
+        self._names: set[str] = set()
+        self.cancelled = threading.Event()
+
+    def extend(self, payloads) -> None:
+        for payload in payloads:
+            if self.cancelled.is_set():
+                return
+            self.read += 1
+            if payload["name"] in self._names:
+                self.repeated += 1
+                continue
+            self._names.add(payload["name"])
+            self.payloads.append(payload)
+
+    def cancel(self) -> None:
+        self.cancelled.set()
+
+    def new_payloads(self, store) -> list[dict]:
+        """
+        Payloads cujo nome ainda nao existe na EndpointStore.
+        """
+        new = [payload for payload in self.payloads if store.index_of(payload["name"]) is None]
+        self.existing = len(self.payloads) - len(new)
+        return new
+
+    def commit(self, store) -> list[dict]:
+        """
+        Grava na EndpointStore os payloads novos (new_payloads) de uma vez; retorna os gravados.
+        """
+        new = self.new_payloads(store)
+        store.upsert_many(new)
+        self.added = len(new)
+        return new
+
+    def summary(self) -> str:
+        text = (
+            f"{self.read} lido(s), {self.added} importado(s), "
+            f"{self.existing + self.repeated} repetido(s) ignorado(s)"
+        )
+        if self.errors:
+            text += f", {len(self.errors)} com erro"
+        return text
@@ -0,0 +1,641 @@
+"""
+Modo "Carga": gera requisicoes concorrentes para um endpoint salvo.
+- LatencyHistogram: histograma log-linear (estilo HDR) de tamanho fixo; memoria constante.
+- LoadTest: N workers (threads) ate um total de requisicoes ou uma duracao. Com o motor curl, os envios
+  vao em lotes num unico processo `curl --parallel --parallel-max N` (curlbatch.py) em vez de um por requisicao.
+- OpenLoopLoadTest: taxa fixa (req/s), latencia medida a partir do horario planejado.
+- MultiProcessLoadTest: divide qualquer um dos dois entre processos (um por nucleo).
+"""
+
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from array import array
+
+from curlbatch import batch_supported, batchable, run_batch
+from transport import RequestControl, create_transport, response_status
+
+DEFAULT_LOAD_TRANSPORT = "http.client"
+DEFAULT_WORKERS = 10
+DEFAULT_TIMEOUT = 30
+PERCENTILES = (50.0, 90.0, 99.0)
+OPEN_LOOP_PERCENTILES = (50.0, 90.0, 99.0, 99.9, 99.99)
+DEFAULT_RATE = 100
+DEFAULT_OPEN_LOOP_WORKERS = 100
+MAX_LATE_TOLERANCE = 0.010
+DEFAULT_PROCESSES = os.cpu_count() or 1
+REPORT_INTERVAL = 1.0
+STOP_POLL_INTERVAL = 0.01
+BATCH_ROUNDS = 20  # requisicoes por lote de curl = workers * BATCH_ROUNDS
+
+# 2^SUB_BUCKET_BITS sub-buckets por potencia de 2: erro relativo < 1%.
+SUB_BUCKET_BITS = 7
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+MAX_EXPONENT = 30  # ~2^37 us (~38 h); valores acima caem no ultimo bucket
+BUCKET_COUNT = SUB_BUCKETS + (MAX_EXPONENT + 1) * SUB_BUCKETS
+
+
+def _bucket_index(value_us: int) -> int:
+    if value_us < SUB_BUCKETS:
+        return max(0, value_us)
+    exp = value_us.bit_length() - SUB_BUCKET_BITS - 1
+    if exp > MAX_EXPONENT:
+        return BUCKET_COUNT - 1
+    return SUB_BUCKETS + exp * SUB_BUCKETS + ((value_us >> exp) - SUB_BUCKETS)
+
+
+def _bucket_upper(index: int) -> int:
+    """
+    Maior valor (us) que cai no bucket `index`.
+    """
+    if index < SUB_BUCKETS:
+        return index
+    exp, sub = divmod(index - SUB_BUCKETS, SUB_BUCKETS)
+    return ((SUB_BUCKETS + sub + 1) << exp) - 1
+
+
+class LatencyHistogram:
+    """
+    Contagens por bucket em microssegundos. Tamanho fixo, independente do numero de amostras.
+    """
+
+    def __init__(self) -> None:
+        self.counts = array("Q", bytes(8 * BUCKET_COUNT))
+        self.count = 0
+        self.total_us = 0
+        self.min_us: int | None = None
+        self.max_us = 0
+
+    def record(self, seconds: float) -> None:
+        value_us = int(seconds * 1_000_000)
+        self.counts[_bucket_index(value_us)] += 1
+        self.count += 1
+        self.total_us += value_us
+        if value_us > self.max_us:
+            self.max_us = value_us
+        if self.min_us is None or value_us < self.min_us:
+            self.min_us = value_us
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        counts = self.counts
+        for idx, value in enumerate(other.counts):
+            if value:
+                counts[idx] += value
+        self.count += other.count
+        self.total_us += other.total_us
+        self.max_us = max(self.max_us, other.max_us)
+        if other.min_us is not None and (self.min_us is None or other.min_us < self.min_us):
+            self.min_us = other.min_us
+
+    def to_state(self) -> tuple:
+        """
+        Representacao compacta e serializavel (pickle) para enviar entre processos.
+        """
+        return (self.counts.tobytes(), self.count, self.total_us, self.min_us, self.max_us)
+
+    @classmethod
+    def from_state(cls, state: tuple) -> "LatencyHistogram":
+        histogram = cls()
+        raw, histogram.count, histogram.total_us, histogram.min_us, histogram.max_us = state
+        histogram.counts = array("Q")
+        histogram.counts.frombytes(raw)
+        return histogram
+
+    def percentile(self, pct: float) -> float:
+        """
+        Latencia (ms) abaixo da qual estao `pct`% das amostras.
+        """
+        if not self.count:
+            return 0.0
+        target = max(1, math.ceil(self.count * pct / 100.0))
+        seen = 0
+        for idx, value in enumerate(self.counts):
+            if not value:
+                continue
+            seen += value
+            if seen >= target:
+                return min(_bucket_upper(idx), self.max_us) / 1000.0
+        return self.max_us / 1000.0
+
+    def mean_ms(self) -> float:
+        return self.total_us / self.count / 1000.0 if self.count else 0.0
+
+    def coarse_buckets(self) -> list[tuple[float, float, int]]:
+        """
+        Agrupa por potencia de 2 para exibicao: [(de_ms, ate_ms, contagem), ...].
+        """
+        rows: dict[int, int] = {}
+        for idx, value in enumerate(self.counts):
+            if value:
+                octave = _bucket_upper(idx).bit_length()
+                rows[octave] = rows.get(octave, 0) + value
+        return [
+            ((1 << (octave - 1)) / 1000.0 if octave else 0.0, ((1 << octave) - 1) / 1000.0, count)
+            for octave, count in sorted(rows.items())
+        ]
+
+    def to_dict(self) -> dict:
+        return {
+            "unit": "us",
+            "sub_bucket_bits": SUB_BUCKET_BITS,
+            "count": self.count,
+            "min": self.min_us or 0,
+            "max": self.max_us,
+            "mean": self.total_us / self.count if self.count else 0,
+            # Esparso: [limite_superior_us, contagem] apenas dos buckets ocupados.
+            "buckets": [[_bucket_upper(idx), value] for idx, value in enumerate(self.counts) if value],
+        }
+
+
+def render_histogram(histogram: LatencyHistogram, width: int = 40) -> str:
+    rows = histogram.coarse_buckets()
+    if not rows:
+        return "(sem amostras)"
+    peak = max(count for _, _, count in rows)
+    lines = []
+    for low, high, count in rows:
+        bar = "#" * max(1, round(width * count / peak))
+        lines.append(f"{low:10.3f} - {high:10.3f} ms | {bar} {count}")
+    return "\n".join(lines)
+
+
+class WorkerStats:
+    """
+    Contadores de um worker; cada worker escreve so nos proprios, sem lock.
+    """
+
+    def __init__(self) -> None:
+        self.histogram = LatencyHistogram()
+        self.errors = 0
+        self.status_codes: dict[str, int] = {}
+
+    def record(self, seconds: float, exit_code: int, status: int | None) -> None:
+        self.histogram.record(seconds)
+        key = str(status) if status is not None else f"exit {exit_code}"
+        self.status_codes[key] = self.status_codes.get(key, 0) + 1
+        if exit_code != 0 or status is None or status >= 400:
+            self.errors += 1
+
+    def merge(self, other: "WorkerStats") -> None:
+        self.histogram.merge(other.histogram)
+        self.errors += other.errors
+        for key, value in list(other.status_codes.items()):
+            self.status_codes[key] = self.status_codes.get(key, 0) + value
+
+    def to_state(self) -> dict:
+        return {
+            "histogram": self.histogram.to_state(),
+            "errors": self.errors,
+            "status_codes": dict(self.status_codes),
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "WorkerStats":
+        stats = cls()
+        stats.histogram = LatencyHistogram.from_state(state["histogram"])
+        stats.errors = state["errors"]
+        stats.status_codes = state["status_codes"]
+        return stats
+
+
+class LoadTest:
+    """
+    Carga em circuito fechado: cada worker envia a proxima requisicao assim que a anterior termina.
+    """
+
+    mode = "closed-loop"
+    stats_class = WorkerStats
+    batchable = True
+
+    def __init__(
+        self,
+        payload: dict,
+        transport: str = DEFAULT_LOAD_TRANSPORT,
+        workers: int = DEFAULT_WORKERS,
+        total: int | None = None,
+        duration: float | None = None,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> None:
+        if not total and not duration:
+            raise ValueError("Informe o total de requisicoes ou a duracao do teste.")
+        if workers < 1:
+            raise ValueError("Informe ao menos 1 worker.")
+        self.payload = payload
+        self.transport = transport
+        self.workers = workers
+        self.total = total
+        self.duration = duration
+        self.timeout = timeout
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self._stop = threading.Event()
+        self._issued = 0
+        self._issue_lock = threading.Lock()
+        self._stats = [self._make_stats() for _ in range(workers)]
+        self._controls: list[RequestControl | None] = [None] * workers
+        self._threads: list[threading.Thread] = []
+
+    def _make_stats(self) -> WorkerStats:
+        return self.stats_class()
+
+    def start(self) -> None:
+        self.started_at = time.monotonic()
+        # Transporte proprio do teste: pool de conexoes dimensionado para os workers.
+        self._transport = create_transport(self.transport, max_idle_per_host=self.workers)
+        if self.batchable and self.transport == "curl" and batch_supported() and batchable(self.payload):
+            self._threads.append(threading.Thread(target=self._batch_worker, name="carga-lote", daemon=True))
+        else:
+            for idx in range(self.workers):
+                self._threads.append(
+                    threading.Thread(target=self._worker, args=(idx,), name=f"carga-{idx}", daemon=True)
+                )
+        for thread in self._threads:
+            thread.start()
+        threading.Thread(target=self._wait_finish, name="carga-fim", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        for control in list(self._controls):
+            if control is not None:
+                control.cancel()
+
+    def is_running(self) -> bool:
+        return self.started_at is not None and self.finished_at is None
+
+    def _wait_finish(self) -> None:
+        for thread in self._threads:
+            thread.join()
+        self._transport.close()
+        self.finished_at = time.monotonic()
+
+    def _next_ticket(self) -> bool:
+        if self._stop.is_set():
+            return False
+        if self.duration and time.monotonic() - self.started_at >= self.duration:
+            return False
+        if self.total:
+            with self._issue_lock:
+                if self._issued >= self.total:
+                    return False
+                self._issued += 1
+        return True
+
+    def _worker(self, idx: int) -> None:
+        stats = self._stats[idx]
+        while self._next_ticket():
+            control = RequestControl(self.timeout)
+            self._controls[idx] = control
+            start = time.perf_counter()
+            _, output, exit_code = self._transport.execute(self.payload, control)
+            elapsed = time.perf_counter() - start
+            if control.cancelled.is_set():
+                break
+            stats.record(elapsed, exit_code, response_status(output))
+        self._controls[idx] = None
+
+    def _batch_worker(self) -> None:
+        """
+        Lotes de ate workers * BATCH_ROUNDS requisicoes, com `workers` transferencias simultaneas no curl.
+        Com duracao, o lote em andamento e interrompido quando o tempo acaba (como os workers em stop()).
+        """
+        stats = self._stats[0]
+
+        def _record(index: int, output: str, exit_code: int, timing: dict) -> None:
+            stats.record(timing["time_total"], exit_code, response_status(output))
+
+        while not self._stop.is_set():
+            count = 0
+            while count < self.workers * BATCH_ROUNDS and self._next_ticket():
+                count += 1
+            if not count:
+                break
+            control = RequestControl()
+            self._controls[0] = control
+            timer = None
+            if self.duration:
+                remaining = self.started_at + self.duration - time.monotonic()
+                timer = threading.Timer(max(0.0, remaining), control.cancel)
+                timer.daemon = True
+                timer.start()
+            try:
+                run_batch([self.payload] * count, self.workers, self.timeout, control, _record)
+            finally:
+                if timer is not None:
+                    timer.cancel()
+            if control.cancelled.is_set():
+                break
+        self._controls[0] = None
+
+    def merged_stats(self) -> WorkerStats:
+        total = self._make_stats()
+        for stats in self._stats:
+            total.merge(stats)
+        return total
+
+    def snapshot(self) -> dict:
+        return self._summary(self.merged_stats(), self._elapsed())
+
+    def _elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return end - self.started_at
+
+    def _summary(self, stats: WorkerStats, elapsed: float) -> dict:
+        return _summarize(stats.histogram, stats.errors, stats.status_codes, elapsed)
+
+    def _config(self) -> dict:
+        return {"workers": self.workers, "total": self.total, "duration": self.duration}
+
+    def report(self) -> dict:
+        return self._report(self.snapshot())
+
+    def _report(self, snap: dict) -> dict:
+        histograms = {key: value for key, value in snap.items() if isinstance(value, LatencyHistogram)}
+        report = {
+            "endpoint": self.payload.get("name", ""),
+            "url": self.payload.get("url", ""),
+            "method": self.payload.get("method", ""),
+            "mode": self.mode,
+            "transport": self.transport,
+            "timeout": self.timeout,
+        }
+        report.update(self._config())
+        report["result"] = {key: value for key, value in snap.items() if key not in histograms}
+        report.update({key: value.to_dict() for key, value in histograms.items()})
+        return report
+
+
+class OpenLoopStats(WorkerStats):
+    def __init__(self) -> None:
+        super().__init__()
+        self.service_histogram = LatencyHistogram()
+        self.late = 0
+        self.max_lag = 0.0
+
+    def merge(self, other: "OpenLoopStats") -> None:
+        super().merge(other)
+        self.service_histogram.merge(other.service_histogram)
+        self.late += other.late
+        self.max_lag = max(self.max_lag, other.max_lag)
+
+    def to_state(self) -> dict:
+        state = super().to_state()
+        state.update(
+            {
+                "service_histogram": self.service_histogram.to_state(),
+                "late": self.late,
+                "max_lag": self.max_lag,
+            }
+        )
+        return state
+
+    @classmethod
+    def from_state(cls, state: dict) -> "OpenLoopStats":
+        stats = super().from_state(state)
+        stats.service_histogram = LatencyHistogram.from_state(state["service_histogram"])
+        stats.late = state["late"]
+        stats.max_lag = state["max_lag"]
+        return stats
+
+
+class OpenLoopLoadTest(LoadTest):
+    """
+    Carga em circuito aberto: o slot i esta planejado para inicio + i / taxa, independente das respostas.
+    A latencia conta a partir do horario planejado, entao atrasos do servidor aparecem na cauda
+    (correcao de coordinated omission). `workers` limita as requisicoes simultaneas.
+    """
+
+    mode = "open-loop"
+    stats_class = OpenLoopStats
+    batchable = False  # cada envio precisa sair no seu horario planejado
+
+    def __init__(
+        self,
+        payload: dict,
+        rate: float = DEFAULT_RATE,
+        duration: float = 60,
+        transport: str = DEFAULT_LOAD_TRANSPORT,
+        workers: int = DEFAULT_OPEN_LOOP_WORKERS,
+        timeout: float = DEFAULT_TIMEOUT,
+        phase: float = 0.0,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("Informe uma taxa (req/s) maior que zero.")
+        if not duration:
+            raise ValueError("O modo de taxa fixa exige uma duracao.")
+        super().__init__(payload, transport=transport, workers=workers, duration=duration, timeout=timeout)
+        self.rate = rate
+        self.interval = 1.0 / rate
+        # Deslocamento do primeiro slot; usado para intercalar processos que dividem a mesma taxa.
+        self.phase = phase
+        # Slot enviado depois do horario do slot seguinte conta como perdido.
+        self.late_tolerance = min(self.interval, MAX_LATE_TOLERANCE)
+        self.scheduled = int(duration * rate)
+        self._slots = itertools.count()
+
+    def _worker(self, idx: int) -> None:
+        stats = self._stats[idx]
+        while not self._stop.is_set():
+            slot = next(self._slots)
+            if slot >= self.scheduled:
+                break
+            intended = self.started_at + self.phase + slot * self.interval
+            delay = intended - time.monotonic()
+            if delay > 0:
+                if self._stop.wait(delay):
+                    break
+            lag = time.monotonic() - intended
+            if lag > self.late_tolerance:
+                stats.late += 1
+            if lag > stats.max_lag:
+                stats.max_lag = lag
+
+            control = RequestControl(self.timeout)
+            self._controls[idx] = control
+            sent = time.perf_counter()
+            _, output, exit_code = self._transport.execute(self.payload, control)
+            finished = time.perf_counter()
+            if control.cancelled.is_set():
+                break
+            stats.service_histogram.record(finished - sent)
+            # Mede a partir do horario planejado (o envio pode ter atrasado por falta de worker).
+            stats.record(finished - sent + max(0.0, lag), exit_code, response_status(output))
+        self._controls[idx] = None
+
+    def _summary(self, stats: OpenLoopStats, elapsed: float) -> dict:
+        histogram = stats.histogram
+        summary = _summarize(histogram, stats.errors, stats.status_codes, elapsed, OPEN_LOOP_PERCENTILES)
+        due = min(self.scheduled, int(min(elapsed, self.duration) * self.rate) + 1) if elapsed else 0
+        summary.update(
+            {
+                "target_rate": self.rate,
+                "achieved_rate": summary["throughput"],
+                "scheduled": self.scheduled,
+                "due": due,
+                "missed_slots": stats.late,
+                "unsent": max(0, due - histogram.count) if self.finished_at is not None else 0,
+                "max_send_lag_ms": stats.max_lag * 1000.0,
+                "service_histogram": stats.service_histogram,
+            }
+        )
+        for pct in OPEN_LOOP_PERCENTILES:
+            summary[f"service_p{pct:g}_ms"] = stats.service_histogram.percentile(pct)
+        return summary
+
+    def _config(self) -> dict:
+        return {"workers": self.workers, "rate": self.rate, "duration": self.duration}
+
+
+def _split(value: int | None, parts: int, idx: int) -> int | None:
+    if not value:
+        return value
+    return value // parts + (1 if idx < value % parts else 0)
+
+
+def _process_main(test_cls: type, kwargs: dict, idx: int, results, stop_event) -> None:
+    """
+    Ponto de entrada de cada processo gerador: roda o teste local e envia o acumulado a cada segundo.
+    """
+    test = test_cls(**kwargs)
+    test.start()
+    while test.is_running():
+        if stop_event.wait(REPORT_INTERVAL):
+            # Cancelado: um unico stop() e so o envio final, quando os workers terminarem.
+            test.stop()
+            while test.is_running():
+                time.sleep(STOP_POLL_INTERVAL)
+            break
+        results.put((idx, test.merged_stats().to_state(), test._elapsed(), False))
+    results.put((idx, test.merged_stats().to_state(), test._elapsed(), True))
+
+
+class MultiProcessLoadTest:
+    """
+    Divide um LoadTest/OpenLoopLoadTest entre processos, cada um com seus workers, conexoes e histograma.
+    O processo pai junta os acumulados de cada processo (enviados a cada segundo) numa visao agregada.
+    """
+
+    def __init__(self, test: LoadTest, processes: int = DEFAULT_PROCESSES) -> None:
+        if processes < 1:
+            raise ValueError("Informe ao menos 1 processo.")
+        # `test` nunca e iniciado: descreve a carga total e calcula o resumo agregado.
+        self.test = test
+        self.processes = min(processes, test.workers)
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self._states: dict[int, WorkerStats] = {}
+        # Tempo de execucao informado por cada processo (exclui o custo de subir o processo).
+        self._elapsed: dict[int, float] = {}
+        self._lock = threading.Lock()
+        # spawn: nao herda threads nem o estado do Tk do processo pai.
+        self._ctx = multiprocessing.get_context("spawn")
+        self._stop = self._ctx.Event()
+        self._results = self._ctx.Queue()
+        self._procs: list = []
+
+    def _shard_kwargs(self, idx: int) -> dict:
+        test = self.test
+        kwargs = {
+            "payload": test.payload,
+            "transport": test.transport,
+            "workers": _split(test.workers, self.processes, idx),
+            "duration": test.duration,
+            "timeout": test.timeout,
+        }
+        if isinstance(test, OpenLoopLoadTest):
+            kwargs["rate"] = test.rate / self.processes
+            kwargs["phase"] = idx * test.interval
+        else:
+            kwargs["total"] = _split(test.total, self.processes, idx)
+        return kwargs
+
+    def start(self) -> None:
+        self.started_at = time.monotonic()
+        self.test.started_at = self.started_at
+        for idx in range(self.processes):
+            proc = self._ctx.Process(
+                target=_process_main,
+                args=(type(self.test), self._shard_kwargs(idx), idx, self._results, self._stop),
+                name=f"carga-proc-{idx}",
+                daemon=True,
+            )
+            proc.start()
+            self._procs.append(proc)
+        threading.Thread(target=self._collect, name="carga-coleta", daemon=True).start()
+
+    def _collect(self) -> None:
+        done: set[int] = set()
+        while len(done) < self.processes:
+            try:
+                idx, state, elapsed, finished = self._results.get(timeout=REPORT_INTERVAL)
+            except queue.Empty:
+                if not any(proc.is_alive() for proc in self._procs):
+                    break  # processo morreu sem enviar o resultado final
+                continue
+            with self._lock:
+                self._states[idx] = self.test.stats_class.from_state(state)
+                self._elapsed[idx] = elapsed
+            if finished:
+                done.add(idx)
+        for proc in self._procs:
+            proc.join()
+        self.finished_at = time.monotonic()
+        self.test.finished_at = self.finished_at
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def is_running(self) -> bool:
+        return self.started_at is not None and self.finished_at is None
+
+    def merged_stats(self) -> WorkerStats:
+        total = self.test._make_stats()
+        with self._lock:
+            states = list(self._states.values())
+        for stats in states:
+            total.merge(stats)
+        return total
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            elapsed = max(self._elapsed.values(), default=0.0)
+        return self.test._summary(self.merged_stats(), elapsed)
+
+    def report(self) -> dict:
+        report = self.test._report(self.snapshot())
+        report["processes"] = self.processes
+        return report
+
+
+def _summarize(
+    histogram: LatencyHistogram,
+    errors: int,
+    status_codes: dict,
+    elapsed: float,
+    percentiles: tuple[float, ...] = PERCENTILES,
+) -> dict:
+    summary = {
+        "requests": histogram.count,
+        "errors": errors,
+        "error_rate": errors / histogram.count if histogram.count else 0.0,
+        "elapsed": elapsed,
+        "throughput": histogram.count / elapsed if elapsed > 0 else 0.0,
+        "mean_ms": histogram.mean_ms(),
+        "max_ms": histogram.max_us / 1000.0,
+        "status_codes": status_codes,
+        "histogram": histogram,
+    }
+    for pct in percentiles:
+        summary[f"p{pct:g}_ms"] = histogram.percentile(pct)
+    return summary
+
+
+def export_report(report: dict, path) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
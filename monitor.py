@@ -0,0 +1,327 @@
+"""
+Monitoramento dos endpoints salvos com "monitor": {"interval": segundos}.
+Um agendador (thread propria) dispara as sondas num pool pequeno, com transporte proprio; nada roda no loop
+do Tk: a UI le as series e os eventos de mudanca de saude (fila `events`) no seu proprio ritmo.
+Cada endpoint guarda as amostras em arrays de tamanho fixo (modulo array), nao em listas de dicts:
+- recentes: as ultimas RECENT_CAPACITY sondas (latencia float32 em ms, status int16, instante uint32),
+  para o p95 atual e a sparkline;
+- por minuto: DAY_MINUTES baldes (soma e maxima da latencia, sondas e falhas), um dia inteiro.
+Sao ~30 KB por endpoint, qualquer que seja o intervalo: 200 endpoints a 1 s por um dia ocupam ~6 MB.
+Saudavel = resposta com status < 400 (mesmo criterio da Colecao); a troca de estado vira evento na hora.
+"""
+
+import heapq
+import math
+import queue
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+from transport import RequestControl, create_transport, response_status
+
+DEFAULT_MONITOR_TRANSPORT = "http.client"  # sem um processo curl por sonda
+MAX_PROBES = 8
+PROBE_TIMEOUT = 10.0
+MIN_INTERVAL = 0.5
+RECENT_CAPACITY = 600
+DAY_MINUTES = 24 * 60
+SPARK_WIDTH = 12
+SPARK_BLOCKS = "▁▂▃▄▅▆▇█"
+SPARK_FAILURE = "×"
+
+
+def parse_monitor(interval: str) -> dict | None:
+    """
+    Campo do formulario -> "monitor" do payload (None se vazio ou 0). Levanta ValueError.
+    """
+    text = interval.strip().replace(",", ".")
+    try:
+        seconds = float(text or 0)
+    except ValueError:
+        raise ValueError("Intervalo de monitoramento invalido: use segundos (ex.: 5).") from None
+    if seconds < 0:
+        raise ValueError("O intervalo de monitoramento nao pode ser negativo.")
+    if not seconds:
+        return None
+    if seconds < MIN_INTERVAL:
+        raise ValueError(f"O intervalo de monitoramento minimo e {MIN_INTERVAL:g}s.")
+    return {"interval": seconds}
+
+
+def monitor_interval(ep: dict) -> float | None:
+    monitor = ep.get("monitor")
+    if not isinstance(monitor, dict):
+        return None
+    try:
+        seconds = float(monitor.get("interval") or 0)
+    except (TypeError, ValueError):
+        return None
+    return max(seconds, MIN_INTERVAL) if seconds > 0 else None
+
+
+class SampleRing:
+    """
+    Ultimas `capacity` sondas em arrays paralelos; a mais antiga e sobrescrita.
+    """
+
+    def __init__(self, capacity: int = RECENT_CAPACITY) -> None:
+        self.capacity = capacity
+        self.latency = array("f", bytes(4 * capacity))  # ms
+        self.status = array("h", bytes(2 * capacity))  # 0 = sem resposta
+        self.at = array("I", bytes(4 * capacity))  # epoch em segundos
+        self.count = 0  # total ja gravado (a posicao seguinte e count % capacity)
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def append(self, at: float, latency_ms: float, status: int) -> None:
+        pos = self.count % self.capacity
+        self.latency[pos] = latency_ms
+        self.status[pos] = status
+        self.at[pos] = int(at)
+        self.count += 1
+
+    def _positions(self, last: int) -> range:
+        size = min(len(self), last)
+        return range(self.count - size, self.count)
+
+    def last(self, n: int) -> list[tuple[float, int]]:
+        """
+        (latencia, status) das `n` sondas mais recentes, da mais antiga para a mais nova.
+        """
+        cap = self.capacity
+        return [(self.latency[i % cap], self.status[i % cap]) for i in self._positions(n)]
+
+    def nbytes(self) -> int:
+        return sum(a.itemsize * len(a) for a in (self.latency, self.status, self.at))
+
+
+class MinuteRing:
+    """
+    Um balde por minuto, DAY_MINUTES baldes; um balde de um dia antes e reaproveitado.
+    """
+
+    def __init__(self, capacity: int = DAY_MINUTES) -> None:
+        self.capacity = capacity
+        self.minute = array("I", bytes(4 * capacity))  # minuto (epoch // 60) do balde; 0 = vazio
+        self.total = array("f", bytes(4 * capacity))  # soma das latencias (ms)
+        self.peak = array("f", bytes(4 * capacity))
+        self.probes = array("H", bytes(2 * capacity))
+        self.failures = array("H", bytes(2 * capacity))
+
+    def add(self, at: float, latency_ms: float, failed: bool) -> None:
+        minute = int(at // 60)
+        pos = minute % self.capacity
+        if self.minute[pos] != minute:
+            self.minute[pos] = minute
+            self.total[pos] = self.peak[pos] = 0.0
+            self.probes[pos] = self.failures[pos] = 0
+        if self.probes[pos] == 0xFFFF:
+            return
+        self.total[pos] += latency_ms
+        self.peak[pos] = max(self.peak[pos], latency_ms)
+        self.probes[pos] += 1
+        self.failures[pos] += failed
+
+    def buckets(self, since: float = 0.0) -> list[dict]:
+        """
+        Baldes preenchidos a partir de `since` (epoch), em ordem de tempo.
+        """
+        first = int(since // 60)
+        rows = []
+        for pos in range(self.capacity):
+            minute = self.minute[pos]
+            if minute and minute >= first and self.probes[pos]:
+                rows.append(
+                    {
+                        "minute": minute * 60,
+                        "probes": self.probes[pos],
+                        "failures": self.failures[pos],
+                        "mean_ms": self.total[pos] / self.probes[pos],
+                        "max_ms": self.peak[pos],
+                    }
+                )
+        rows.sort(key=lambda row: row["minute"])
+        return rows
+
+    def nbytes(self) -> int:
+        return sum(a.itemsize * len(a) for a in (self.minute, self.total, self.peak, self.probes, self.failures))
+
+
+class EndpointSeries:
+    """
+    Series de um endpoint monitorado e o estado de saude atual (None antes da primeira sonda).
+    """
+
+    __slots__ = ("recent", "minutes", "healthy", "changed_at")
+
+    def __init__(self) -> None:
+        self.recent = SampleRing()
+        self.minutes = MinuteRing()
+        self.healthy: bool | None = None
+        self.changed_at = 0.0
+
+    def add(self, at: float, latency_ms: float, status: int) -> bool:
+        """
+        Grava a sonda; retorna True se o estado de saude mudou (inclusive se a primeira sonda ja falhou).
+        """
+        healthy = 0 < status < 400
+        self.recent.append(at, latency_ms, status)
+        self.minutes.add(at, latency_ms, not healthy)
+        changed = self.healthy != healthy and (self.healthy is not None or not healthy)
+        if self.healthy != healthy:
+            self.healthy, self.changed_at = healthy, at
+        return changed
+
+    def p95(self) -> float | None:
+        """
+        p95 (ms) das sondas recentes que responderam.
+        """
+        recent = self.recent
+        cap = recent.capacity
+        samples = sorted(recent.latency[i % cap] for i in recent._positions(cap) if recent.status[i % cap])
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, math.ceil(len(samples) * 0.95) - 1)]
+
+    def sparkline(self, width: int = SPARK_WIDTH) -> str:
+        """
+        Ultimas `width` latencias em blocos (escala entre a menor e a maior); falha vira SPARK_FAILURE.
+        """
+        samples = self.recent.last(width)
+        answered = [latency for latency, status in samples if 0 < status < 400]
+        if not answered:
+            return SPARK_FAILURE * len(samples)
+        low, high = min(answered), max(answered)
+        span = (high - low) or 1.0
+        top = len(SPARK_BLOCKS) - 1
+        return "".join(
+            SPARK_BLOCKS[round((latency - low) / span * top)] if 0 < status < 400 else SPARK_FAILURE
+            for latency, status in samples
+        )
+
+    def nbytes(self) -> int:
+        return self.recent.nbytes() + self.minutes.nbytes()
+
+
+class Monitor:
+    """
+    Agenda as sondas dos endpoints monitorados. `update(endpoints)` sincroniza com a lista salva;
+    mudancas de saude vao para `events` como (nome, saudavel, status, codigo_de_saida).
+    """
+
+    def __init__(self, transport: str = DEFAULT_MONITOR_TRANSPORT, max_probes: int = MAX_PROBES) -> None:
+        self._transport_name = transport
+        self._max_probes = max_probes
+        self._transport = None
+        self._pool: ThreadPoolExecutor | None = None
+        self._thread: threading.Thread | None = None
+        self._cond = threading.Condition()
+        self._targets: dict[str, tuple[dict, float]] = {}  # nome -> (payload, intervalo)
+        self._due: dict[str, float] = {}  # proxima sonda de cada alvo (entradas velhas do heap sao ignoradas)
+        self._heap: list[tuple[float, str]] = []
+        self._in_flight: set[str] = set()
+        self._series: dict[str, EndpointSeries] = {}
+        self._stopped = False
+        self.events: queue.SimpleQueue = queue.SimpleQueue()
+
+    def update(self, endpoints: list[dict]) -> None:
+        """
+        Entram os endpoints com "monitor" (sondados na hora), saem os que perderam; um intervalo novo vale
+        a partir da proxima sonda. As series de quem saiu sao descartadas.
+        """
+        targets = {}
+        for ep in endpoints:
+            interval = monitor_interval(ep)
+            if interval is not None:
+                targets[ep["name"]] = (ep, interval)
+        with self._cond:
+            if self._stopped:
+                return
+            now = time.monotonic()
+            for name in targets.keys() - self._targets.keys():
+                self._due[name] = now
+                heapq.heappush(self._heap, (now, name))
+            for name in self._targets.keys() - targets.keys():
+                self._due.pop(name, None)
+                self._series.pop(name, None)
+            self._targets = targets
+            self._cond.notify()
+            if targets and self._thread is None:
+                self._transport = create_transport(self._transport_name, self._max_probes)
+                self._pool = ThreadPoolExecutor(max_workers=self._max_probes, thread_name_prefix="monitor")
+                self._thread = threading.Thread(target=self._loop, name="monitor-agenda", daemon=True)
+                self._thread.start()
+
+    def names(self) -> list[str]:
+        with self._cond:
+            return list(self._targets)
+
+    def series(self, name: str) -> EndpointSeries | None:
+        return self._series.get(name)
+
+    def memory_bytes(self) -> int:
+        with self._cond:
+            return sum(series.nbytes() for series in self._series.values())
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopped:
+                        return
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    due, name = self._heap[0]
+                    now = time.monotonic()
+                    if due > now:
+                        self._cond.wait(due - now)
+                        continue
+                    heapq.heappop(self._heap)
+                    if self._due.get(name) != due:
+                        continue  # alvo removido ou reagendado
+                    payload, interval = self._targets[name]
+                    # Mantem a cadencia; se atrasou mais de um intervalo, recomeca a partir de agora.
+                    next_due = due + interval if due + interval > now else now + interval
+                    self._due[name] = next_due
+                    heapq.heappush(self._heap, (next_due, name))
+                    if name in self._in_flight:
+                        continue  # a sonda anterior ainda nao voltou: pula esta
+                    self._in_flight.add(name)
+                    break
+            try:
+                self._pool.submit(self._probe, name, payload)
+            except RuntimeError:  # pool encerrado por stop()
+                return
+
+    def _probe(self, name: str, payload: dict) -> None:
+        control = RequestControl(PROBE_TIMEOUT)
+        start = time.perf_counter()
+        try:
+            _, output, exit_code = self._transport.execute(payload, control)
+        except Exception:  # a sonda nunca derruba o agendador
+            output, exit_code = "", 1
+        latency_ms = (time.perf_counter() - start) * 1000
+        status = response_status(output) if exit_code == 0 else None
+        with self._cond:
+            self._in_flight.discard(name)
+            if name not in self._targets:
+                return
+            series = self._series.get(name)
+            if series is None:
+                series = self._series[name] = EndpointSeries()
+            changed = series.add(time.time(), latency_ms, status or 0)
+            healthy = series.healthy
+        if changed:
+            self.events.put((name, healthy, status, exit_code))
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        if self._transport is not None:
+            self._transport.close()
@@ -0,0 +1,27 @@
+"""
+Arquivos de dados do EndpointTester, todos na pasta do executavel/script.
+"""
+
+import sys
+from pathlib import Path
+
+
+def _resolve_base_dir() -> Path:
+    """
+    Usa a pasta do executavel/script como base para ler/gravar configuracoes.
+    """
+    if getattr(sys, "frozen", False):
+        return Path(sys.executable).resolve().parent
+    if "__file__" in globals():
+        return Path(__file__).resolve().parent
+    return Path.cwd()
+
+
+BASE_DIR = _resolve_base_dir()
+DATA_FILE = BASE_DIR / "endpoints.json"
+ENDPOINTS_LOG_FILE = BASE_DIR / "endpoints.log"
+UI_STATE_FILE = BASE_DIR / "ui_state.json"
+HISTORY_FILE = BASE_DIR / "requests.jsonl"
+CACHE_DIR = BASE_DIR / "cache"
+PROFILE_DIR = BASE_DIR / "profiles"
+RECORDING_FILE = BASE_DIR / "recordings.jsonl"
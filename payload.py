@@ -0,0 +1,98 @@
+"""
+Montagem e validacao do payload de um endpoint (nome, URL, metodo, headers, body), sem depender do Tk.
+"""
+
+import json
+
+from uploads import parse_form
+
+DEFAULT_METHOD = "GET"
+METHODS = ["GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"]
+
+
+def build_payload(
+    name: str,
+    url: str,
+    method: str,
+    headers_text: str,
+    body: str,
+    depends_on: str = "",
+    compressed: bool = False,
+    body_file: str = "",
+    form_text: str = "",
+    resilience: dict | None = None,
+    monitor: dict | None = None,
+) -> dict:
+    """
+    Levanta ValueError com mensagem para o usuario se faltar nome/URL ou algum header for invalido.
+    `depends_on` (nomes separados por virgula) e `compressed` so entram no payload quando informados.
+    Com `body_file` (caminho) ou `form_text` (partes multipart, ver uploads.parse_form) o body vem do disco
+    na hora do envio e `body` fica vazio. `resilience` vem de resilience.parse_policy e `monitor` de
+    monitor.parse_monitor.
+    """
+    name = name.strip()
+    url = url.strip()
+    method = method.strip().upper() or DEFAULT_METHOD
+
+    if not name:
+        raise ValueError("Informe um nome para salvar o endpoint.")
+    if not url:
+        raise ValueError("Informe a URL.")
+
+    payload = {
+        "name": name,
+        "url": url,
+        "method": method if method in METHODS else DEFAULT_METHOD,
+        "headers": parse_headers(headers_text.strip()),
+        "body": body,
+    }
+    deps = [dep.strip() for dep in depends_on.split(",") if dep.strip()]
+    if name in deps:
+        raise ValueError("Um endpoint nao pode depender dele mesmo.")
+    if deps:
+        payload["depends_on"] = deps
+    if compressed:
+        payload["compressed"] = True
+    body_file = body_file.strip()
+    form = parse_form(form_text) if form_text.strip() else []
+    if sum(map(bool, (body, body_file, form))) > 1:
+        raise ValueError("Use so um tipo de body: texto, arquivo ou multipart.")
+    if body_file:
+        payload["body_file"] = body_file
+    if form:
+        payload["form"] = form
+    if resilience:
+        payload["resilience"] = resilience
+    if monitor:
+        payload["monitor"] = monitor
+    return payload
+
+
+def parse_headers(text: str) -> dict:
+    if not text:
+        return {}
+    stripped = text.strip()
+    if not stripped:
+        return {}
+
+    # Tenta JSON primeiro.
+    try:
+        data = json.loads(stripped)
+        if isinstance(data, dict):
+            return {str(k): str(v) for k, v in data.items()}
+    except json.JSONDecodeError:
+        pass
+
+    headers = {}
+    for line in stripped.splitlines():
+        if not line.strip():
+            continue
+        if ":" not in line:
+            raise ValueError(f"Linha de header invalida: {line}")
+        key, value = line.split(":", 1)
+        headers[key.strip()] = value.strip()
+    return headers
+
+
+def headers_to_text(headers: dict) -> str:
+    return "\n".join(f"{k}: {v}" for k, v in headers.items())
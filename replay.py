@@ -0,0 +1,406 @@
+"""
+Gravacao e replay de trocas HTTP reais, para rodar carga e regressao sem depender dos backends.
+- Recorder: com "Gravar" ligado (ou `run --record`), cada envio concluido vira uma linha JSON em
+  recordings.jsonl: metodo, URL, hash do body, status, headers e corpo da resposta e os tempos (total e
+  espera do servidor, do pretransfer ao primeiro byte).
+- ReplayServer: servidor asyncio que responde pelas gravacoes, chaveadas por metodo, URL e hash do body.
+  As respostas sao montadas em bytes uma vez, ao carregar; cada requisicao custa o parse do cabecalho, uma
+  busca num dict e um write. Com `latency`, espera a latencia gravada (as amostras da chave em rodizio) sem
+  segurar as outras conexoes. Com `processes` > 1, varios processos escutam na mesma porta (SO_REUSEPORT).
+A URL casa pelo caminho + query; o host (Host ou URL absoluta, em modo proxy) so desempata gravacoes de
+hosts diferentes, entao basta trocar a origem do endpoint pela do servidor de replay.
+"""
+
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import socket
+import threading
+import time
+from http import HTTPStatus
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from uploads import has_upload
+
+DEFAULT_REPLAY_PORT = 8099
+RECORD_MAX_BYTES = 8 * 1024 * 1024
+WAIT_SAMPLES = 1000  # latencias guardadas por chave
+MAX_HEAD_BYTES = 64 * 1024
+EMPTY_HASH = hashlib.sha256(b"").hexdigest()
+# Recalculados ou sem sentido no replay (o corpo gravado ja esta decodificado e inteiro).
+DROPPED_HEADERS = ("content-length", "transfer-encoding", "content-encoding", "connection", "keep-alive")
+REPLAY_HEADER = "X-Replay"
+
+
+def body_hash(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest() if body else EMPTY_HASH
+
+
+def split_response(text: str) -> tuple[int, str, list[list[str]], str] | None:
+    """
+    (status, motivo, headers na ordem, corpo) da resposta final de uma saida `curl -i`; None se nao ha resposta.
+    """
+    separator = "\r\n\r\n" if "\r\n\r\n" in text else "\n\n"
+    pos, block = 0, None
+    while text.startswith("HTTP/", pos):
+        end = text.find(separator, pos)
+        if end == -1:
+            end = len(text)
+        block, pos = text[pos:end], min(end + len(separator), len(text))
+        fields = block.split("\n", 1)[0].split(None, 2)
+        if len(fields) < 2 or not fields[1].isdigit():
+            return None
+        if not 100 <= int(fields[1]) < 200:
+            break
+    if block is None:
+        return None
+    lines = block.splitlines()
+    fields = lines[0].split(None, 2)
+    headers = [[key.strip(), value.strip()] for key, sep, value in (line.partition(":") for line in lines[1:]) if sep]
+    return int(fields[1]), fields[2].strip() if len(fields) > 2 else "", headers, text[pos:]
+
+
+def _path_of(parts) -> str:
+    return (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+
+class Recorder:
+    """
+    Acrescenta as trocas em `path` (JSONL); pode ser chamado de qualquer thread.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def record(self, payload: dict, response: str, timing: dict | None, elapsed: float) -> bool:
+        """
+        Grava a troca; False se nao ha o que gravar (sem resposta, body do disco ou resposta grande demais).
+        """
+        if has_upload(payload) or len(response) > RECORD_MAX_BYTES:
+            return False
+        parsed = split_response(response)
+        if parsed is None:
+            return False
+        status, reason, headers, body = parsed
+        total = timing.get("time_total", elapsed) if timing else elapsed
+        wait = total
+        if timing and timing.get("time_starttransfer"):
+            wait = max(0.0, timing["time_starttransfer"] - timing.get("time_pretransfer", 0.0))
+        exchange = {
+            "time": time.time(),
+            "name": payload.get("name", ""),
+            "method": payload["method"].upper(),
+            "url": payload["url"],
+            "body_sha256": body_hash(payload["body"].encode("utf-8")),
+            "status": status,
+            "reason": reason,
+            "headers": headers,
+            "body": body,
+            "elapsed_ms": round(total * 1000, 3),
+            "wait_ms": round(wait * 1000, 3),
+            "timing": timing,
+        }
+        line = json.dumps(exchange, ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+            self.count += 1
+        return True
+
+
+class _Exchange:
+    """
+    Resposta pronta (com e sem corpo, para HEAD) e as latencias gravadas da chave.
+    """
+
+    __slots__ = ("full", "head", "waits", "turn")
+
+    def __init__(self) -> None:
+        self.full = self.head = b""
+        self.waits: list[float] = []
+        self.turn = 0
+
+    def next_wait(self) -> float:
+        if not self.waits:
+            return 0.0
+        wait = self.waits[self.turn % len(self.waits)]
+        self.turn += 1
+        return wait
+
+
+def _render(status: int, reason: str, headers: list, body: bytes, head_only: bool = False) -> tuple[bytes, bytes]:
+    """
+    Resposta completa e so o cabecalho (para HEAD). Uma gravacao de HEAD mantem o Content-Length original.
+    """
+    length = len(body)
+    if head_only:
+        length = next((value for name, value in headers if name.lower() == "content-length"), length)
+    if not reason:
+        try:
+            reason = HTTPStatus(status).phrase
+        except ValueError:
+            reason = ""
+    lines = [f"HTTP/1.1 {status} {reason}"]
+    lines += [f"{name}: {value}" for name, value in headers if name.lower() not in DROPPED_HEADERS]
+    lines += [f"{REPLAY_HEADER}: gravado", f"Content-Length: {length}"]
+    head = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1", errors="replace")
+    return head + body, head
+
+
+def load_recordings(path: Path) -> tuple[dict, int]:
+    """
+    Indice (metodo, caminho+query, hash do body) -> {host: _Exchange}, lido linha a linha; a gravacao mais
+    recente de cada chave e a que responde, e todas contribuem com sua latencia. Retorna (indice, trocas).
+    """
+    index: dict[tuple[str, str, str], dict[str, _Exchange]] = {}
+    count = 0
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                parts = urlsplit(record["url"])
+                method = record["method"].upper()
+                key = (method, _path_of(parts), record["body_sha256"])
+                full, head = _render(
+                    int(record["status"]),
+                    record.get("reason", ""),
+                    record.get("headers") or [],
+                    record.get("body", "").encode("utf-8"),
+                    head_only=method == "HEAD",
+                )
+            except (ValueError, KeyError, TypeError, AttributeError):
+                continue  # linha cortada ou de outra versao
+            hosts = index.setdefault(key, {})
+            exchange = hosts.get(parts.netloc.lower())
+            if exchange is None:
+                exchange = hosts[parts.netloc.lower()] = _Exchange()
+            exchange.full, exchange.head = full, head
+            if len(exchange.waits) < WAIT_SAMPLES:
+                exchange.waits.append(float(record.get("wait_ms") or 0.0) / 1000)
+            count += 1
+    return index, count
+
+
+class ReplayServer:
+    """
+    Servidor de replay de um processo. `serve()` roda no loop asyncio atual ate `stop()`.
+    """
+
+    def __init__(self, index: dict, latency: bool = False, latency_scale: float = 1.0) -> None:
+        self.index = index
+        self.latency = latency
+        self.latency_scale = latency_scale
+        self.served = 0
+        self.missed = 0
+        self.port = 0
+        self._server: asyncio.AbstractServer | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def respond(self, method: str, target: str, host: str, body: bytes) -> tuple[bytes, float]:
+        """
+        (resposta, atraso em s) para a requisicao.
+        """
+        if not target.startswith("/"):
+            parts = urlsplit(target)  # URL absoluta (cliente usando o replay como proxy)
+            target, host = _path_of(parts), parts.netloc.lower()
+        hosts = self.index.get((method, target, body_hash(body)))
+        if hosts is None:
+            self.missed += 1
+            return _miss(method, target), 0.0
+        exchange = hosts.get(host) or next(iter(hosts.values()))
+        self.served += 1
+        response = exchange.head if method == "HEAD" else exchange.full
+        if not self.latency:
+            return response, 0.0
+        return response, exchange.next_wait() * self.latency_scale
+
+    async def serve(self, host: str = "127.0.0.1", port: int = DEFAULT_REPLAY_PORT, reuse_port: bool = False) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._server = await self._loop.create_server(
+            lambda: _ReplayProtocol(self), host, port, reuse_port=reuse_port or None, backlog=1024
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        async with self._server:
+            try:
+                await self._server.serve_forever()
+            except asyncio.CancelledError:
+                pass
+
+    def stop(self) -> None:
+        if self._server is not None and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._server.close)
+
+
+def _miss(method: str, target: str) -> bytes:
+    body = json.dumps({"error": "sem gravacao para esta requisicao", "method": method, "url": target}).encode()
+    head = f"HTTP/1.1 404 Not Found\r\nContent-Type: application/json\r\n{REPLAY_HEADER}: sem gravacao\r\n"
+    return (head + f"Content-Length: {len(body)}\r\n\r\n").encode("latin-1", errors="replace") + body
+
+
+class _ReplayProtocol(asyncio.Protocol):
+    """
+    HTTP/1.1 com keep-alive e pipelining; as respostas saem na ordem das requisicoes.
+    """
+
+    def __init__(self, server: ReplayServer) -> None:
+        self.server = server
+        self.transport: asyncio.Transport | None = None
+        self.buffer = bytearray()
+        self.waiting = False  # resposta com atraso pendente: as proximas esperam
+
+    def connection_made(self, transport: asyncio.Transport) -> None:
+        self.transport = transport
+        sock = transport.get_extra_info("socket")
+        if sock is not None:
+            try:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            except OSError:
+                pass
+
+    def data_received(self, data: bytes) -> None:
+        self.buffer += data
+        if not self.waiting:
+            self._process()
+
+    def _process(self) -> None:
+        buffer = self.buffer
+        while not self.waiting and not self.transport.is_closing():
+            while buffer[:2] == b"\r\n":
+                del buffer[:2]
+            end = buffer.find(b"\r\n\r\n")
+            if end == -1:
+                if len(buffer) > MAX_HEAD_BYTES:
+                    self._reject(431, "Request Header Fields Too Large")
+                return
+            lines = buffer[:end].decode("latin-1").split("\r\n")
+            request = lines[0].split(" ")
+            if len(request) != 3:
+                self._reject(400, "Bad Request")
+                return
+            method, target, version = request
+            length, host, close = 0, "", version == "HTTP/1.0"
+            for line in lines[1:]:
+                name, _, value = line.partition(":")
+                name = name.strip().lower()
+                if name == "content-length":
+                    try:
+                        length = int(value)
+                    except ValueError:
+                        self._reject(400, "Bad Request")
+                        return
+                elif name == "host":
+                    host = value.strip().lower()
+                elif name == "connection":
+                    option = value.strip().lower()
+                    close = option == "close" or (close and option != "keep-alive")
+                elif name == "transfer-encoding":
+                    self._reject(411, "Length Required")  # corpo chunked nao e gravado
+                    return
+            total = end + 4 + length
+            if len(buffer) < total:
+                return
+            body = bytes(buffer[end + 4 : total])
+            del buffer[:total]
+            response, delay = self.server.respond(method, target, host, body)
+            if delay > 0:
+                self.waiting = True
+                asyncio.get_running_loop().call_later(delay, self._send_delayed, response, close)
+                return
+            self.transport.write(response)
+            if close:
+                self.transport.close()
+
+    def _send_delayed(self, response: bytes, close: bool) -> None:
+        self.waiting = False
+        if self.transport.is_closing():
+            return
+        self.transport.write(response)
+        if close:
+            self.transport.close()
+        else:
+            self._process()
+
+    def _reject(self, status: int, reason: str) -> None:
+        self.transport.write(f"HTTP/1.1 {status} {reason}\r\nContent-Length: 0\r\nConnection: close\r\n\r\n".encode())
+        self.transport.close()
+
+
+def start_replay(
+    path: Path,
+    host: str = "127.0.0.1",
+    port: int = 0,
+    latency: bool = False,
+    latency_scale: float = 1.0,
+) -> ReplayServer:
+    """
+    Sobe o servidor num loop proprio, em uma thread daemon (porta em `port`). Para uso no mesmo processo
+    (testes, benchmarks); para carga de verdade, `serve_forever` em processo separado.
+    """
+    index, _ = load_recordings(path)
+    server = ReplayServer(index, latency, latency_scale)
+    ready = threading.Event()
+
+    def _run() -> None:
+        async def _main() -> None:
+            task = asyncio.ensure_future(server.serve(host, port))
+            while not server.port and not task.done():
+                await asyncio.sleep(0.01)
+            ready.set()
+            await task
+
+        asyncio.run(_main())
+
+    threading.Thread(target=_run, name="replay", daemon=True).start()
+    ready.wait(10)
+    return server
+
+
+def _serve_process(path: Path, host: str, port: int, latency: bool, latency_scale: float) -> None:
+    index, _ = load_recordings(path)
+    try:
+        asyncio.run(ReplayServer(index, latency, latency_scale).serve(host, port, reuse_port=True))
+    except KeyboardInterrupt:
+        pass
+
+
+def serve_forever(
+    path: Path,
+    host: str = "127.0.0.1",
+    port: int = DEFAULT_REPLAY_PORT,
+    latency: bool = False,
+    latency_scale: float = 1.0,
+    processes: int = 1,
+) -> None:
+    """
+    Serve ate Ctrl+C. Com `processes` > 1, cada processo carrega as gravacoes e escuta na mesma porta
+    (o kernel distribui as conexoes); exige SO_REUSEPORT.
+    """
+    if processes <= 1:
+        index, _ = load_recordings(path)
+        try:
+            asyncio.run(ReplayServer(index, latency, latency_scale).serve(host, port))
+        except KeyboardInterrupt:
+            pass
+        return
+    if not hasattr(socket, "SO_REUSEPORT"):
+        raise ValueError("Varios processos exigem SO_REUSEPORT (Linux/macOS).")
+    ctx = multiprocessing.get_context("spawn")
+    procs = [
+        ctx.Process(target=_serve_process, args=(path, host, port, latency, latency_scale), daemon=True)
+        for _ in range(processes)
+    ]
+    for proc in procs:
+        proc.start()
+    try:
+        for proc in procs:
+            proc.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for proc in procs:
+            proc.terminate()
+            proc.join(5)
@@ -0,0 +1,325 @@
+"""
+Politica de resiliencia por endpoint (campo "resilience" do payload), aplicada por ResilientTransport:
+- repeticao em status escolhidos (padrao 429/502/503/504) e em falhas de rede/timeout, com backoff
+  exponencial e jitter completo (espera sorteada entre 0 e base * 2^n), respeitando Retry-After;
+- prazo total para todas as tentativas juntas;
+- hedge: se a resposta passa do p95 das latencias recentes do endpoint, uma copia e disparada e vale a
+  primeira que voltar bem; a outra e cancelada.
+Metodos nao idempotentes (POST/PATCH) e uploads do disco nao sao duplicados; POST/PATCH so sao repetidos
+quando a conexao nem chegou a ser aberta. Cada tentativa fica em `control.attempts`.
+So uma tentativa sem hedge (politica apenas com prazo) mantem o stream; com repeticao ou hedge, a resposta
+vencedora vai inteira para o sink ao final.
+"""
+
+import math
+import queue
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+
+from cache import parse_response
+from transport import ATTEMPTS_MARKER, RequestControl, response_status
+from uploads import has_upload
+
+DEFAULT_RETRY_STATUS = (429, 502, 503, 504)
+DEFAULT_BACKOFF = 0.1
+MAX_BACKOFF = 10.0
+HEDGE_PERCENTILE = 95.0
+HEDGE_MIN_SAMPLES = 20  # abaixo disso o p95 nao diz nada; sem hedge (a menos de hedge_delay fixo)
+LATENCY_WINDOW = 200
+LATENCY_MAX_KEYS = 1000  # endpoints com hedge acompanhados; o usado ha mais tempo sai primeiro
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+RETRYABLE_EXIT_CODES = (6, 7, 28, 52, 55, 56)  # resolucao, conexao, timeout, resposta vazia, envio, recepcao
+NOT_SENT_EXIT_CODES = (6, 7)  # a requisicao nao saiu: repetir e seguro mesmo para POST
+
+
+def parse_policy(retries: str, statuses: str, backoff: str, deadline: str, hedge: bool) -> dict | None:
+    """
+    Campos do formulario -> politica do payload (None se nada foi pedido). Levanta ValueError.
+    """
+    try:
+        count = int(retries.strip() or 0)
+        codes = [int(code) for code in statuses.replace(",", " ").split()]
+        base = float(backoff.strip().replace(",", ".") or DEFAULT_BACKOFF)
+        total = float(deadline.strip().replace(",", ".") or 0)
+    except ValueError:
+        raise ValueError("Politica de repeticao invalida: use numeros (status separados por virgula).") from None
+    if count < 0 or base < 0 or total < 0:
+        raise ValueError("Tentativas, backoff e prazo nao podem ser negativos.")
+    if not count and not total and not hedge:
+        return None  # status e backoff sozinhos nao mudam nada
+    policy: dict = {"retries": count}
+    if codes and tuple(codes) != DEFAULT_RETRY_STATUS:
+        policy["retry_status"] = codes
+    if base != DEFAULT_BACKOFF:
+        policy["backoff"] = base
+    if total:
+        policy["deadline"] = total
+    if hedge:
+        policy["hedge"] = True
+    return policy
+
+
+def policy_fields(policy: dict | None) -> tuple[str, str, str, str, bool]:
+    """
+    Inverso de parse_policy, para preencher o formulario.
+    """
+    policy = policy or {}
+    return (
+        str(policy.get("retries", 0)),
+        ", ".join(str(code) for code in policy.get("retry_status", DEFAULT_RETRY_STATUS)),
+        f"{policy.get('backoff', DEFAULT_BACKOFF):g}",
+        f"{policy['deadline']:g}" if policy.get("deadline") else "",
+        bool(policy.get("hedge")),
+    )
+
+
+class LatencyTracker:
+    """
+    Ultimas LATENCY_WINDOW latencias (s) por (metodo, URL), para o atraso do hedge; no maximo `max_keys`
+    chaves (LRU).
+    """
+
+    def __init__(self, window: int = LATENCY_WINDOW, max_keys: int = LATENCY_MAX_KEYS) -> None:
+        self.window = window
+        self.max_keys = max_keys
+        self._samples: OrderedDict[tuple[str, str], deque] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, key: tuple[str, str], seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+                if len(self._samples) > self.max_keys:
+                    self._samples.popitem(last=False)
+            else:
+                self._samples.move_to_end(key)
+            samples.append(seconds)
+
+    def percentile(self, key: tuple[str, str], percent: float, min_samples: int = HEDGE_MIN_SAMPLES) -> float | None:
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if len(samples) < min_samples:
+            return None
+        return samples[min(len(samples) - 1, math.ceil(len(samples) * percent / 100) - 1)]
+
+
+LATENCIES = LatencyTracker()
+
+
+def _retry_after(output: str) -> float | None:
+    _, headers, _ = parse_response(output)
+    try:
+        return float(headers.get("retry-after", ""))
+    except ValueError:
+        return None  # ausente ou data HTTP: vale o backoff
+
+
+class _AttemptControl(RequestControl):
+    """
+    Control de uma tentativa: herda o trace do envio e repassa o upload, para o progresso do upload aparecer.
+    """
+
+    def __init__(self, parent: RequestControl, timeout: float | None) -> None:
+        self._parent = parent
+        super().__init__(timeout)
+        self.trace = parent.trace  # etapas (spawn do curl) medidas em cada tentativa
+
+    @property
+    def upload(self):
+        return self._upload
+
+    @upload.setter
+    def upload(self, upload) -> None:
+        self._upload = upload
+        if upload is not None:
+            self._parent.upload = upload
+
+
+class ResilientTransport:
+    """
+    Envolve um transporte com o mesmo contrato de execute; sem "resilience" no payload, so repassa.
+    A latencia so e medida para os endpoints com hedge (e o que o atraso do hedge consulta).
+    Com repeticao ou hedge, as tentativas rodam sem stream e a resposta vencedora vai inteira para o sink.
+    """
+
+    def __init__(self, inner, latencies: LatencyTracker = LATENCIES) -> None:
+        self.inner = inner
+        self.latencies = latencies
+
+    def __getattr__(self, name: str):
+        return getattr(self.inner, name)
+
+    def close(self) -> None:
+        self.inner.close()
+
+    def describe(self, payload: dict) -> str:
+        return self.inner.describe(payload)
+
+    def execute(self, payload: dict, control: RequestControl | None = None, sink=None) -> tuple[str, str, int]:
+        control = control or RequestControl()
+        policy = payload.get("resilience")
+        if not policy:
+            return self.inner.execute(payload, control, sink)
+
+        method = payload["method"].upper()
+        idempotent = method in IDEMPOTENT_METHODS
+        retries = int(policy.get("retries", 0))
+        statuses = set(policy.get("retry_status", DEFAULT_RETRY_STATUS))
+        backoff = float(policy.get("backoff", DEFAULT_BACKOFF))
+        deadline = time.monotonic() + policy["deadline"] if policy.get("deadline") else None
+        hedge = bool(policy.get("hedge")) and idempotent and not has_upload(payload)
+        key = (method, payload["url"]) if hedge else None  # sem hedge, nada a medir
+        # Uma unica tentativa nao precisa esperar a vencedora: a resposta vai direto para o sink.
+        stream = sink if not retries and not hedge else None
+        control.attempts = attempts = []
+        children: list[RequestControl] = []
+        lock = threading.Lock()
+
+        def _cancel_children() -> None:
+            with lock:
+                pending = list(children)
+            for child in pending:
+                child.cancel()
+
+        if not control.attach(_cancel_children):
+            return self.inner.describe(payload), "\n[stderr]\nRequisicao cancelada pelo usuario.\n", 1
+        try:
+            for number in range(1, retries + 2):
+                timeout = control.timeout
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    timeout = min(timeout, remaining) if timeout else remaining
+                hedge_delay = None
+                if hedge:
+                    hedge_delay = policy.get("hedge_delay") or self.latencies.percentile(key, HEDGE_PERCENTILE)
+                cmd, output, exit_code, winner, used = self._attempt(
+                    payload, key, number, timeout, hedge_delay, attempts, children, lock, control, stream
+                )
+                status = response_status(output)
+                control.timing, control.timed_out, control.error = winner.timing, winner.timed_out, winner.error
+                if control.cancelled.is_set() or number > retries:
+                    break
+                retryable = status in statuses if exit_code == 0 else exit_code in RETRYABLE_EXIT_CODES
+                if not retryable or (not idempotent and exit_code not in NOT_SENT_EXIT_CODES):
+                    break
+                # Jitter completo: clientes que falharam juntos nao voltam todos ao mesmo tempo.
+                delay = random.uniform(0, min(MAX_BACKOFF, backoff * 2 ** (number - 1)))
+                if exit_code == 0 and status in (429, 503):
+                    delay = max(delay, min(MAX_BACKOFF, _retry_after(output) or 0.0))
+                if deadline is not None and time.monotonic() + delay >= deadline:
+                    attempts[-1]["note"] = "prazo total esgotado"
+                    break
+                attempts[-1]["note"] = f"repetida apos {delay * 1000:.0f} ms"
+                if control.cancelled.wait(delay):
+                    attempts[-1]["note"] = "cancelada durante a espera"
+                    break
+        finally:
+            control.detach()
+        used["winner"] = True
+
+        at = output.rfind("\n[stderr]\n")
+        response, trailer = (output, "") if at == -1 else (output[:at], output[at:])
+        trailer = self._trailer(attempts) + trailer
+        if sink is None or stream is not None:
+            return cmd, response + trailer, exit_code  # com stream, o corpo ja foi para o sink
+        # A resposta vencedora vai inteira para o sink; tentativas e stderr voltam como trailer.
+        sink.write(response, len(response.encode("utf-8")))
+        return cmd, trailer, exit_code
+
+    def _attempt(
+        self,
+        payload: dict,
+        key: tuple[str, str] | None,
+        number: int,
+        timeout: float | None,
+        hedge_delay: float | None,
+        attempts: list[dict],
+        children: list[RequestControl],
+        lock: threading.Lock,
+        control: RequestControl,
+        sink=None,
+    ) -> tuple[str, str, int, RequestControl, dict]:
+        """
+        Uma tentativa (com hedge, ate duas requisicoes em paralelo): resultado da vencedora, o control e
+        o registro dela em `attempts`. Com `sink` (so sem hedge), a resposta vai em stream para ele.
+        """
+        results: queue.SimpleQueue = queue.SimpleQueue()
+
+        def _launch(hedged: bool) -> RequestControl:
+            child = _AttemptControl(control, timeout)
+            with lock:
+                children.append(child)
+            started = time.perf_counter()
+
+            def _run() -> None:
+                try:
+                    result = self.inner.execute(payload, child, None if hedged else sink)
+                except Exception as exc:  # nao deixa a tentativa sem resposta
+                    result = ("", f"\n[stderr]\n{exc}\n", 1)
+                results.put((child, hedged, time.perf_counter() - started, result))
+
+            if hedge_delay is None:
+                _run()
+            else:
+                threading.Thread(target=_run, name="hedge" if hedged else "tentativa", daemon=True).start()
+            return child
+
+        launched = [_launch(False)]
+        primary_started = time.perf_counter()
+        records: dict[int, dict] = {}
+        winner = None
+        while winner is None:
+            wait = None
+            if hedge_delay is not None and len(launched) == 1:
+                wait = max(0.0, hedge_delay - (time.perf_counter() - primary_started))
+            try:
+                child, hedged, elapsed, result = results.get(timeout=wait)
+            except queue.Empty:
+                launched.append(_launch(True))  # a primeira passou do p95: dispara a copia
+                continue
+            status = response_status(result[1])
+            if status is None and sink is not None and not hedged:
+                status = sink.status  # em stream, o status so passou pelo sink
+            if not hedged and key is not None:
+                self.latencies.record(key, elapsed)
+            records[id(child)] = record = {
+                "attempt": number,
+                "hedge": hedged,
+                "exit_code": result[2],
+                "status": status,
+                "elapsed_ms": round(elapsed * 1000, 3),
+                "timing": child.timing,
+            }
+            attempts.append(record)
+            good = result[2] == 0 and (status is None or status < 500)
+            if good or len(records) == len(launched) or child.cancelled.is_set():
+                winner = (child, result, record)
+        child, (cmd, output, exit_code), record = winner
+        for other in launched:
+            if id(other) in records:
+                continue
+            other.cancel()
+            attempts.append({"attempt": number, "hedge": other is not launched[0], "note": "cancelada"})
+            if other is launched[0] and key is not None:
+                # A primeira, cancelada, tambem conta (pelo menos esse tempo): sem ela o p95 so veria as rapidas.
+                self.latencies.record(key, time.perf_counter() - primary_started)
+        with lock:
+            for other in launched:
+                children.remove(other)
+        return cmd, output, exit_code, child, record
+
+    def _trailer(self, attempts: list[dict]) -> str:
+        lines = []
+        for item in attempts:
+            line = f"#{item['attempt']}{' hedge' if item['hedge'] else ''}"
+            if "exit_code" in item:
+                line += f"  {item['status'] or '-'}  codigo {item['exit_code']}  {item['elapsed_ms']:.1f} ms"
+            if item.get("winner"):
+                line += "  (usada)"
+            if item.get("note"):
+                line += f"  {item['note']}"
+            lines.append(line)
+        return f"{ATTEMPTS_MARKER}\n" + "\n".join(lines) + "\n"
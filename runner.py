@@ -0,0 +1,245 @@
+"""
+Execucao de uma colecao de endpoints salvos, em paralelo e respeitando "depends_on".
+Cada endpoint comeca assim que todas as dependencias passam; se alguma falha, os dependentes sao pulados.
+O tempo total fica proximo ao da cadeia de dependencias mais lenta, e nao da soma das requisicoes.
+Com o motor curl, cada leva de endpoints prontos vai num unico processo `curl --parallel` (curlbatch.py).
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from curlbatch import batch_supported, batchable, run_batch
+from transport import DEFAULT_TRANSPORT, RequestControl, create_transport, response_status
+
+DEFAULT_PARALLELISM = 8
+DEFAULT_TIMEOUT = 30
+
+
+def dependencies(ep: dict) -> list[str]:
+    deps = ep.get("depends_on") or []
+    return [deps] if isinstance(deps, str) else list(deps)
+
+
+def select_with_dependencies(endpoints: list[dict], names: list[str]) -> list[dict]:
+    """
+    Endpoints pedidos mais as dependencias (transitivas), na ordem da colecao.
+    """
+    by_name = {ep.get("name"): ep for ep in endpoints}
+    wanted: set[str] = set()
+    pending = list(names)
+    while pending:
+        name = pending.pop()
+        if name in wanted or name not in by_name:
+            continue
+        wanted.add(name)
+        pending.extend(dependencies(by_name[name]))
+    return [ep for ep in endpoints if ep.get("name") in wanted]
+
+
+def passed(exit_code: int, status: int | None) -> bool:
+    return exit_code == 0 and status is not None and status < 400
+
+
+def check_response(output: str, exit_code: int, transport: str) -> tuple[int | None, str | None]:
+    """
+    Status da resposta e motivo da falha (None se passou), para a Colecao e a execucao com dataset.
+    """
+    status = response_status(output)
+    if passed(exit_code, status):
+        return status, None
+    return status, f"status {status}" if status is not None else f"{transport} retornou codigo {exit_code}"
+
+
+class CollectionRunner:
+    """
+    Resultados (um dict por endpoint, na ordem em que terminam) saem pela fila `results`.
+    """
+
+    def __init__(
+        self,
+        endpoints: list[dict],
+        parallelism: int = DEFAULT_PARALLELISM,
+        timeout: float = DEFAULT_TIMEOUT,
+        transport: str = DEFAULT_TRANSPORT,
+    ) -> None:
+        if parallelism < 1:
+            raise ValueError("Informe ao menos 1 requisicao em paralelo.")
+        self.endpoints = {ep["name"]: ep for ep in endpoints}
+        self.parallelism = parallelism
+        self.timeout = timeout
+        self.transport = transport
+        self._dependents: dict[str, list[str]] = {name: [] for name in self.endpoints}
+        self._waiting: dict[str, int] = {}
+        for name, ep in self.endpoints.items():
+            deps = dependencies(ep)
+            missing = [dep for dep in deps if dep not in self.endpoints]
+            if missing:
+                raise ValueError(f"{name}: dependencia desconhecida: {', '.join(missing)}")
+            self._waiting[name] = len(deps)
+            for dep in deps:
+                self._dependents[dep].append(name)
+        self._check_cycles()
+        self.results: queue.SimpleQueue = queue.SimpleQueue()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self.counts = {"passed": 0, "failed": 0, "skipped": 0}
+        self._remaining = len(self.endpoints)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._controls: dict[str, RequestControl] = {}
+
+    def _check_cycles(self) -> None:
+        # Kahn: se sobrar alguem com dependencias pendentes, ha ciclo.
+        waiting = dict(self._waiting)
+        ready = [name for name, count in waiting.items() if count == 0]
+        seen = 0
+        while ready:
+            name = ready.pop()
+            seen += 1
+            for dependent in self._dependents[name]:
+                waiting[dependent] -= 1
+                if waiting[dependent] == 0:
+                    ready.append(dependent)
+        if seen != len(waiting):
+            cycle = sorted(name for name, count in waiting.items() if count)
+            raise ValueError(f"Dependencias em ciclo: {', '.join(cycle)}")
+
+    def start(self) -> None:
+        self.started_at = time.monotonic()
+        self._transport = create_transport(self.transport, max_idle_per_host=self.parallelism)
+        self._batched = self.transport == "curl" and batch_supported()
+        self._executor = ThreadPoolExecutor(max_workers=self.parallelism, thread_name_prefix="colecao")
+        ready = [name for name, count in self._waiting.items() if count == 0]
+        if not ready:
+            self._finish()
+        self._submit(ready)
+
+    def stop(self) -> None:
+        self._stop.set()
+        with self._lock:
+            controls = list(self._controls.values())
+        for control in controls:
+            control.cancel()
+
+    def is_running(self) -> bool:
+        return self.started_at is not None and self.finished_at is None
+
+    def _submit(self, names: list[str]) -> None:
+        if not names:
+            return
+        if self._batched:
+            batch = [name for name in names if batchable(self.endpoints[name])]
+            if batch:
+                self._executor.submit(self._run_batch, batch)
+            names = [name for name in names if not batchable(self.endpoints[name])]
+        for name in names:
+            self._executor.submit(self._run, name)
+
+    def _run(self, name: str) -> None:
+        if self._stop.is_set():
+            self._done(name, {"name": name, "result": "skipped", "reason": "interrompido"})
+            return
+        control = RequestControl(self.timeout)
+        with self._lock:
+            self._controls[name] = control
+        start = time.perf_counter()
+        try:
+            _, output, exit_code = self._transport.execute(self.endpoints[name], control)
+        except Exception as exc:  # um endpoint com problema nao pode travar a colecao inteira
+            output, exit_code = f"\n[stderr]\n{exc}\n", 1
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._controls.pop(name, None)
+        self._done(name, self._result(name, output, exit_code, elapsed))
+
+    def _run_batch(self, names: list[str]) -> None:
+        """
+        Uma leva de endpoints prontos num unico processo curl; ate `parallelism` transferencias por leva.
+        """
+        if self._stop.is_set():
+            for name in names:
+                self._done(name, {"name": name, "result": "skipped", "reason": "interrompido"})
+            return
+        control = RequestControl()
+        reported: set[int] = set()
+        with self._lock:
+            for name in names:
+                self._controls[name] = control
+
+        def _on_result(index: int, output: str, exit_code: int, timing: dict) -> None:
+            reported.add(index)
+            with self._lock:
+                self._controls.pop(names[index], None)
+            self._done(names[index], self._result(names[index], output, exit_code, timing["time_total"]))
+
+        try:
+            missing = run_batch(
+                [self.endpoints[name] for name in names], self.parallelism, self.timeout, control, _on_result
+            )
+        except OSError as exc:
+            missing, control.error = [i for i in range(len(names)) if i not in reported], str(exc)
+        for index in missing:
+            name = names[index]
+            with self._lock:
+                self._controls.pop(name, None)
+            if self._stop.is_set():
+                self._done(name, {"name": name, "result": "skipped", "reason": "interrompido"})
+            else:
+                reason = control.error or "curl encerrou sem resultado"
+                self._done(name, {"name": name, "result": "failed", "exit_code": 1, "reason": reason})
+
+    def _result(self, name: str, output: str, exit_code: int, elapsed: float) -> dict:
+        status, reason = check_response(output, exit_code, self.transport)
+        result = {
+            "name": name,
+            "result": "failed" if reason else "passed",
+            "status": status,
+            "exit_code": exit_code,
+            "latency_ms": elapsed * 1000,
+        }
+        if reason:
+            result["reason"] = reason
+        return result
+
+    def _done(self, name: str, result: dict) -> None:
+        to_start, to_skip = [], []
+        with self._lock:
+            self.counts[result["result"]] += 1
+            self._remaining -= 1
+            for dependent in self._dependents[name]:
+                if result["result"] != "passed":
+                    to_skip.append(dependent)
+                    continue
+                self._waiting[dependent] -= 1
+                if self._waiting[dependent] == 0:
+                    to_start.append(dependent)
+            finished = self._remaining == 0
+        self.results.put(result)
+        for dependent in to_skip:
+            self._skip(dependent, f"dependencia {name} nao passou")
+        self._submit(to_start)
+        if finished:
+            self._finish()
+
+    def _skip(self, name: str, reason: str) -> None:
+        with self._lock:
+            # Um endpoint com varias dependencias falhando so e pulado uma vez.
+            if self._waiting[name] < 0:
+                return
+            self._waiting[name] = -1
+        self._done(name, {"name": name, "result": "skipped", "reason": reason})
+
+    def _finish(self) -> None:
+        self.finished_at = time.monotonic()
+        self._executor.shutdown(wait=False)
+        self._transport.close()
+
+    def summary(self) -> dict:
+        end = self.finished_at or time.monotonic()
+        return {
+            "total": len(self.endpoints),
+            **self.counts,
+            "elapsed_s": end - self.started_at if self.started_at else 0.0,
+        }
@@ -0,0 +1,187 @@
+"""
+Tempos por etapa de cada envio (formulario, gravacao, lista, fila, spawn do curl, rede, formatacao,
+insercao na tela). Desligado, nenhum Trace e criado e cada etapa custa um `if trace is not None`.
+- Trace: etapas de um envio; ao fechar, entram no agregado de SpanStats.
+- SpanStats: ultimas SPAN_WINDOW amostras por etapa (contagem, media, p95) e os ultimos envios, em JSON.
+- cProfile opcional de um envio: trechos da thread da UI e do transporte, um de cada vez, juntados num .prof.
+"""
+
+import contextlib
+import json
+import math
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+SPAN_WINDOW = 500
+RECENT_TRACES = 50
+PROFILE_TOP = 40
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+class Trace:
+    """
+    Tempos (s) de um envio por etapa; uma etapa repetida (ex.: varios inserts) acumula.
+    Com `profile=True`, os trechos em `profiling()` sao perfilados.
+    """
+
+    def __init__(self, label: str = "", profile: bool = False) -> None:
+        self.label = label
+        self.stages: dict[str, float] = {}
+        self.started = time.perf_counter()
+        self.profiles: list | None = [] if profile else None  # cProfile.Profile de cada trecho
+        self._mark = self.started
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    @contextlib.contextmanager
+    def span(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    def mark(self) -> None:
+        """
+        Marca o instante atual, para uma etapa que comeca numa thread e termina em outra (add_since_mark).
+        """
+        self._mark = time.perf_counter()
+
+    def add_since_mark(self, stage: str) -> None:
+        self.add(stage, time.perf_counter() - self._mark)
+
+    @contextlib.contextmanager
+    def profiling(self):
+        if self.profiles is None:
+            yield
+            return
+        import cProfile  # so quando alguem pede o perfil
+
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            self.profiles.append(profile)
+
+    def total(self) -> float:
+        return time.perf_counter() - self.started
+
+    def readout(self) -> str:
+        parts = [f"{stage} {seconds * 1000:.1f}" for stage, seconds in self.stages.items()]
+        return f"Etapas (ms): {'  '.join(parts)}  | total {self.total() * 1000:.1f}"
+
+
+def span(trace: Trace | None, stage: str):
+    """
+    `with span(trace, "etapa"):` mede a etapa se houver Trace; sem Trace, nao faz nada.
+    """
+    return _NULL_SPAN if trace is None else trace.span(stage)
+
+
+def profiling(trace: Trace | None):
+    return _NULL_SPAN if trace is None else trace.profiling()
+
+
+class SpanStats:
+    """
+    Agregado das etapas dos envios recentes.
+    """
+
+    def __init__(self, window: int = SPAN_WINDOW) -> None:
+        self.window = window
+        self._samples: dict[str, deque] = {}
+        self._counts: dict[str, int] = {}
+        self.recent: deque = deque(maxlen=RECENT_TRACES)
+        self._lock = threading.Lock()
+
+    def close(self, trace: Trace) -> None:
+        """
+        Encerra o envio: cada etapa (e o total) entra no agregado.
+        """
+        stages = dict(trace.stages, total=trace.total())
+        with self._lock:
+            for stage, seconds in stages.items():
+                samples = self._samples.get(stage)
+                if samples is None:
+                    samples = self._samples[stage] = deque(maxlen=self.window)
+                samples.append(seconds)
+                self._counts[stage] = self._counts.get(stage, 0) + 1
+            self.recent.append(
+                {
+                    "time": time.time(),
+                    "label": trace.label,
+                    "stages_ms": {stage: round(seconds * 1000, 3) for stage, seconds in stages.items()},
+                }
+            )
+
+    def summary(self) -> dict[str, dict]:
+        """
+        Por etapa: envios medidos no total e media/p95/max (ms) das ultimas `window` amostras.
+        """
+        with self._lock:
+            snapshot = {stage: sorted(samples) for stage, samples in self._samples.items()}
+            counts = dict(self._counts)
+        summary = {}
+        for stage, samples in snapshot.items():
+            p95 = samples[min(len(samples) - 1, math.ceil(len(samples) * 0.95) - 1)]
+            summary[stage] = {
+                "count": counts[stage],
+                "mean_ms": round(sum(samples) / len(samples) * 1000, 3),
+                "p95_ms": round(p95 * 1000, 3),
+                "max_ms": round(samples[-1] * 1000, 3),
+            }
+        return summary
+
+    def render(self) -> str:
+        lines = [f"{'etapa':14}{'envios':>8}{'media ms':>12}{'p95 ms':>12}{'max ms':>12}"]
+        for stage, stats in self.summary().items():
+            lines.append(
+                f"{stage:14}{stats['count']:>8}{stats['mean_ms']:>12.2f}"
+                f"{stats['p95_ms']:>12.2f}{stats['max_ms']:>12.2f}"
+            )
+        return "\n".join(lines)
+
+    def to_json(self) -> dict:
+        with self._lock:
+            recent = list(self.recent)
+        return {"window": self.window, "stages": self.summary(), "recent": recent}
+
+    def export(self, path) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_json(), f, indent=2)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+            self.recent.clear()
+
+
+def save_profile(trace: Trace, directory: Path) -> Path | None:
+    """
+    Junta os trechos perfilados do envio em <directory>/envio-<hora>.prof (para pstats/snakeviz) e grava ao
+    lado um .txt com as PROFILE_TOP funcoes de maior tempo acumulado. Retorna o .txt (None se nada foi perfilado).
+    """
+    if not trace.profiles:
+        return None
+    import io
+    import pstats
+
+    stats = pstats.Stats(trace.profiles[0])
+    for profile in trace.profiles[1:]:
+        stats.add(profile)
+    directory.mkdir(parents=True, exist_ok=True)
+    base = directory / f"envio-{time.strftime('%Y%m%d-%H%M%S')}"
+    stats.dump_stats(base.with_suffix(".prof"))
+    text = io.StringIO()
+    stats.stream = text
+    stats.sort_stats("cumulative").print_stats(PROFILE_TOP)
+    report = base.with_suffix(".txt")
+    report.write_text(f"{trace.label}\n{trace.readout()}\n{text.getvalue()}", encoding="utf-8")
+    return report
@@ -0,0 +1,131 @@
+"""
+Arquivo temporario para respostas grandes, com indice de linhas e leitura via mmap.
+O indice guarda, a cada bloco de BLOCK_SIZE bytes, quantas quebras de linha existem antes dele:
+localizar qualquer linha custa uma busca no indice mais a varredura de no maximo um bloco.
+"""
+
+import mmap
+import os
+import tempfile
+import threading
+from array import array
+from bisect import bisect_left
+
+BLOCK_SIZE = 16 * 1024
+MAX_LINE_CHARS = 4000  # linhas maiores sao cortadas na exibicao para o Tk nao travar
+
+
+class SpoolFile:
+    def __init__(self, prefix: str = "endpoint_tester_") -> None:
+        fd, self.path = tempfile.mkstemp(prefix=prefix, suffix=".txt")
+        self._file = os.fdopen(fd, "wb")
+        self._lock = threading.Lock()
+        # _block_lines[i]: quebras de linha antes do byte i * BLOCK_SIZE.
+        self._block_lines = array("Q", [0])
+        self._newlines = 0
+        self._block_fill = 0
+        self._last_byte = b""
+        self.size = 0
+        self._map: mmap.mmap | None = None
+        self._map_size = 0
+        self.closed = False
+
+    def write(self, data: bytes) -> None:
+        if not data:
+            return
+        with self._lock:
+            if self.closed:
+                return
+            self._file.write(data)
+            self._file.flush()
+            self._index(data)
+            self.size += len(data)
+            self._last_byte = data[-1:]
+
+    def _index(self, data: bytes) -> None:
+        pos = 0
+        while pos < len(data):
+            take = min(len(data) - pos, BLOCK_SIZE - self._block_fill)
+            self._newlines += data.count(b"\n", pos, pos + take)
+            self._block_fill += take
+            pos += take
+            if self._block_fill == BLOCK_SIZE:
+                self._block_lines.append(self._newlines)
+                self._block_fill = 0
+
+    @property
+    def line_count(self) -> int:
+        with self._lock:
+            if not self.size:
+                return 0
+            return self._newlines + (0 if self._last_byte == b"\n" else 1)
+
+    def _view(self) -> mmap.mmap | None:
+        # O arquivo cresce enquanto a resposta chega; remapeia quando o tamanho muda.
+        if self.size != self._map_size:
+            if self._map is not None:
+                self._map.close()
+            self._map = None
+            if self.size:
+                with open(self.path, "rb") as f:
+                    self._map = mmap.mmap(f.fileno(), self.size, access=mmap.ACCESS_READ)
+            self._map_size = self.size
+        return self._map
+
+    def line_offset(self, line: int) -> int:
+        """
+        Offset em bytes do inicio da linha `line` (base 0).
+        """
+        with self._lock:
+            view = None if self.closed else self._view()
+            if line <= 0 or view is None:
+                return 0
+            block = bisect_left(self._block_lines, line) - 1
+            pos = block * BLOCK_SIZE
+            remaining = line - self._block_lines[block]
+            while remaining:
+                nl = view.find(b"\n", pos)
+                if nl == -1:
+                    return self.size
+                pos = nl + 1
+                remaining -= 1
+            return pos
+
+    def read_bytes(self, start: int, end: int) -> bytes:
+        with self._lock:
+            view = None if self.closed else self._view()
+            if view is None:
+                return b""
+            return view[start : min(end, self.size)]
+
+    def read_lines(self, start: int, count: int) -> list[str]:
+        offset = self.line_offset(start)
+        lines = []
+        with self._lock:
+            view = None if self.closed else self._view()
+            if view is None:
+                return lines
+            while len(lines) < count and offset < self.size:
+                nl = view.find(b"\n", offset)
+                end = self.size if nl == -1 else nl
+                raw = view[offset : min(end, offset + MAX_LINE_CHARS * 4)]
+                text = raw.decode("utf-8", errors="replace").rstrip("\r")
+                if end - offset > len(raw) or len(text) > MAX_LINE_CHARS:
+                    text = text[:MAX_LINE_CHARS] + " [...]"
+                lines.append(text)
+                offset = end + 1
+        return lines
+
+    def close(self) -> None:
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            self._file.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
@@ -0,0 +1,241 @@
+"""
+Servidor HTTP local (stdlib) para testes e benchmarks do EndpointTester.
+Responde qualquer metodo com um corpo JSON de tamanho configuravel. Com --slow-fraction, uma fracao
+sorteada das respostas demora --slow-latency (cauda de latencia, para medir repeticao/hedge).
+Com --chunk-size, o corpo sai com Transfer-Encoding: chunked, em pedacos desse tamanho.
+
+    python stub_server.py --port 8080 --latency 0.05 --size 1024 --processes 4
+    python stub_server.py --size 1048576 --chunk-size 16384 --status 503
+    python stub_server.py --latency 0.005 --slow-fraction 0.05 --slow-latency 0.2
+"""
+
+import argparse
+import json
+import multiprocessing
+import random
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+READ_CHUNK = 256 * 1024
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, para medir reaproveitamento de conexoes
+    disable_nagle_algorithm = True  # headers e corpo saem em writes separados
+
+    def _respond(self) -> None:
+        self.server.last_request_at = time.perf_counter()
+        # Le o body em pedacos e descarta: uploads grandes (1 GB) nao passam pela memoria.
+        remaining = int(self.headers.get("Content-Length") or 0)
+        while remaining > 0:
+            chunk = self.rfile.read(min(remaining, READ_CHUNK))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+        config = self.server.config
+        latency = config["latency"]
+        if config["slow_fraction"] and random.random() < config["slow_fraction"]:
+            latency = config["slow_latency"]
+        if latency:
+            time.sleep(latency)
+        body = config["body"]
+        chunk_size = config["chunk_size"]
+        self.send_response(config["status"])
+        self.send_header("Content-Type", "application/json")
+        if chunk_size:
+            self.send_header("Transfer-Encoding", "chunked")
+        else:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command == "HEAD":
+            return
+        if not chunk_size:
+            self.wfile.write(body)
+            return
+        for start in range(0, len(body), chunk_size):
+            piece = body[start : start + chunk_size]
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(piece), piece))
+        self.wfile.write(b"0\r\n\r\n")
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = do_OPTIONS = _respond
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Com o backlog padrao (5), rajadas de conexoes (curl --parallel) esperam 1s pela retransmissao do SYN.
+    request_queue_size = 128
+
+    def handle_error(self, request, client_address) -> None:
+        # Cliente que desiste no meio da resposta (cancelamento, fim de carga) nao e erro do stub.
+        pass
+
+
+class ReusePortHTTPServer(StubHTTPServer):
+    """
+    Permite varios processos escutando na mesma porta (SO_REUSEPORT), para o servidor nao limitar a carga.
+    """
+
+    def server_bind(self) -> None:
+        if hasattr(socket, "SO_REUSEPORT"):
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+
+
+def make_body(size: int) -> bytes:
+    filler = "x" * max(0, size - len('{"data":""}'))
+    return json.dumps({"data": filler}).encode("utf-8")
+
+
+def start_server(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    latency: float = 0.0,
+    size: int = 64,
+    status: int = 200,
+    reuse_port: bool = False,
+    slow_fraction: float = 0.0,
+    slow_latency: float = 0.0,
+    chunk_size: int = 0,
+) -> StubHTTPServer:
+    """
+    Sobe o servidor em uma thread daemon e devolve a instancia (porta em server_address[1]).
+    """
+    server_cls = ReusePortHTTPServer if reuse_port else StubHTTPServer
+    server = server_cls((host, port), StubHandler)
+    server.config = {
+        "latency": latency,
+        "body": make_body(size),
+        "status": status,
+        "slow_fraction": slow_fraction,
+        "slow_latency": slow_latency,
+        "chunk_size": chunk_size,
+    }
+    server.last_request_at = None
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _serve_forever(
+    host: str,
+    port: int,
+    latency: float,
+    size: int,
+    status: int,
+    slow_fraction: float,
+    slow_latency: float,
+    chunk_size: int,
+) -> None:
+    server = start_server(host, port, latency, size, status, True, slow_fraction, slow_latency, chunk_size)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+def start_server_processes(
+    processes: int,
+    host: str = "127.0.0.1",
+    port: int = 0,
+    latency: float = 0.0,
+    size: int = 64,
+    status: int = 200,
+    slow_fraction: float = 0.0,
+    slow_latency: float = 0.0,
+    chunk_size: int = 0,
+) -> tuple[int, list]:
+    """
+    Sobe `processes` servidores na mesma porta; retorna (porta, processos). Exige SO_REUSEPORT.
+    """
+    if port == 0:
+        # Reserva uma porta livre; o socket fica aberto ate os filhos fazerem bind.
+        probe = ReusePortHTTPServer((host, 0), StubHandler, bind_and_activate=False)
+        probe.server_bind()
+        port = probe.server_address[1]
+    else:
+        probe = None
+    ctx = multiprocessing.get_context("spawn")
+    procs = []
+    for _ in range(processes):
+        proc = ctx.Process(
+            target=_serve_forever,
+            args=(host, port, latency, size, status, slow_fraction, slow_latency, chunk_size),
+            daemon=True,
+        )
+        proc.start()
+        procs.append(proc)
+    _wait_listening(host, port)
+    if probe is not None:
+        probe.server_close()
+    return port, procs
+
+
+def _wait_listening(host: str, port: int, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"Servidor em {host}:{port} nao respondeu.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Servidor HTTP local para testes.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="atraso por resposta, em segundos")
+    parser.add_argument("--size", type=int, default=64, help="tamanho do corpo, em bytes")
+    parser.add_argument("--status", type=int, default=200)
+    parser.add_argument("--slow-fraction", type=float, default=0.0, help="fracao das respostas que demoram mais")
+    parser.add_argument("--slow-latency", type=float, default=0.0, help="atraso dessas respostas, em segundos")
+    parser.add_argument("--chunk-size", type=int, default=0, help="envia o corpo chunked, em pedacos desse tamanho")
+    parser.add_argument("--processes", type=int, default=1, help="processos escutando na mesma porta")
+    args = parser.parse_args()
+
+    if args.processes > 1:
+        port, procs = start_server_processes(
+            args.processes,
+            args.host,
+            args.port,
+            args.latency,
+            args.size,
+            args.status,
+            args.slow_fraction,
+            args.slow_latency,
+            args.chunk_size,
+        )
+        print(f"Servindo em http://{args.host}:{port}/ com {len(procs)} processos (Ctrl+C para sair)")
+        try:
+            for proc in procs:
+                proc.join()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    server = start_server(
+        args.host,
+        args.port,
+        args.latency,
+        args.size,
+        args.status,
+        slow_fraction=args.slow_fraction,
+        slow_latency=args.slow_latency,
+        chunk_size=args.chunk_size,
+    )
+    print(f"Servindo em http://{args.host}:{server.server_address[1]}/ (Ctrl+C para sair)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Tempos por fase de uma requisicao, com os mesmos nomes das variaveis `-w` do curl.
+Os tempos sao acumulados desde o inicio da requisicao (como no curl); `phases` converte em duracoes.
+"""
+
+import re
+import statistics
+
+CURL_VARIABLES = (
+    "time_namelookup",
+    "time_connect",
+    "time_appconnect",
+    "time_pretransfer",
+    "time_starttransfer",
+    "time_total",
+    "size_download",
+    "speed_download",
+    "size_header",
+    "size_upload",
+    "speed_upload",
+)
+CURL_MARKER = "@@endpoint-tester-timing@@"
+# %{stderr} manda o restante do -w para o stderr, sem misturar com o corpo da resposta.
+CURL_WRITE_OUT = "%{stderr}\n" + CURL_MARKER + " " + " ".join("%{" + name + "}" for name in CURL_VARIABLES) + "\n"
+TIMING_MARKER = "\n[tempos]"
+HISTORY_LIMIT = 20
+
+_CURL_LINE = re.compile(r"\n?" + re.escape(CURL_MARKER) + r" ([^\n]*)\n?")
+
+
+def parse_curl_timing(stderr: str) -> tuple[dict | None, str]:
+    """
+    Extrai a linha gerada por CURL_WRITE_OUT; retorna (tempos, stderr sem essa linha).
+    """
+    match = _CURL_LINE.search(stderr)
+    if match is None:
+        return None, stderr
+    values = match.group(1).split()
+    if len(values) != len(CURL_VARIABLES):
+        return None, stderr
+    try:
+        timing = {name: float(value.replace(",", ".")) for name, value in zip(CURL_VARIABLES, values)}
+    except ValueError:
+        return None, stderr
+    return timing, stderr[: match.start()] + stderr[match.end() :]
+
+
+def phases(timing: dict) -> list[tuple[str, float, float]]:
+    """
+    (fase, inicio, duracao) em segundos. Fases sem custo (ex.: TLS em http, conexao reutilizada) ficam com 0.
+    """
+    lookup = timing.get("time_namelookup", 0.0)
+    connect = max(timing.get("time_connect", 0.0), lookup)
+    appconnect = timing.get("time_appconnect", 0.0)
+    tls_end = max(appconnect, connect) if appconnect else connect
+    ready = max(timing.get("time_pretransfer", 0.0), tls_end)
+    first_byte = max(timing.get("time_starttransfer", 0.0), ready)
+    total = max(timing.get("time_total", 0.0), first_byte)
+    return [
+        ("DNS", 0.0, lookup),
+        ("Conexao", lookup, connect - lookup),
+        ("TLS", connect, tls_end - connect),
+        ("Espera (TTFB)", ready, first_byte - ready),
+        ("Transferencia", first_byte, total - first_byte),
+    ]
+
+
+def _human_rate(bytes_per_second: float) -> str:
+    for unit in ("B/s", "KB/s", "MB/s"):
+        if bytes_per_second < 1024:
+            return f"{bytes_per_second:.1f} {unit}"
+        bytes_per_second /= 1024
+    return f"{bytes_per_second:.1f} GB/s"
+
+
+def _compression_line(timing: dict) -> str:
+    wire, decoded = timing.get("size_download", 0.0), timing["size_decoded"]
+    if decoded <= 0 or wire >= decoded:
+        return f"{'Compressao':<14} nenhuma: {int(wire)} bytes sem compressao na rede"
+    line = f"{'Compressao':<14} {int(wire)} bytes na rede -> {int(decoded)} decodificados ({wire / decoded:.0%})"
+    if "time_decode" in timing:
+        line += f", decodificacao {timing['time_decode'] * 1000:.2f} ms"
+    return line
+
+
+def render_waterfall(timing: dict, previous: list[dict] | None = None, width: int = 40) -> str:
+    """
+    Cascata em texto: uma linha por fase, barra posicionada no inicio da fase.
+    Com `previous` (execucoes anteriores do mesmo endpoint), mostra a diferenca para a mediana delas.
+    """
+    rows = phases(timing)
+    total = max(timing.get("time_total", 0.0), rows[-1][1] + rows[-1][2])
+    scale = width / total if total > 0 else 0.0
+    baseline = None
+    if previous:
+        baseline = [statistics.median(durations) for durations in zip(*((d for _, _, d in phases(t)) for t in previous))]
+    lines = []
+    for index, (name, start, duration) in enumerate(rows):
+        offset = min(width - 1, int(start * scale))
+        bar = "#" * max(1, round(duration * scale)) if duration > 0 else ""
+        line = f"{name:<14} {duration * 1000:9.2f} ms |{(' ' * offset + bar)[:width]:<{width}}|"
+        if baseline is not None:
+            line += f" {(duration - baseline[index]) * 1000:+8.2f} ms"
+        lines.append(line)
+    summary = f"{'Total':<14} {total * 1000:9.2f} ms"
+    size = timing.get("size_download")
+    if size is not None:
+        summary += f"  {int(size)} bytes a {_human_rate(timing.get('speed_download', 0.0))}"
+    if baseline is not None:
+        median_total = statistics.median(t.get("time_total", 0.0) for t in previous)
+        summary += f"  (vs. mediana de {len(previous)} execucao(oes) anterior(es): {(total - median_total) * 1000:+.2f} ms)"
+    lines.append(summary)
+    if timing.get("size_upload"):
+        lines.append(
+            f"{'Envio':<14} {int(timing['size_upload'])} bytes a {_human_rate(timing.get('speed_upload', 0.0))}"
+        )
+    if "size_decoded" in timing:
+        lines.append(_compression_line(timing))
+    return "\n".join(lines)
@@ -0,0 +1,492 @@
+"""
+Camada de transporte do EndpointTester.
+- "curl": processo externo por requisicao (comportamento original).
+- "http.client": engine em processo com pool de conexoes persistentes por host (httpclient.py).
+Ambas devolvem (display_cmd, output, exit_code), com a saida no formato de `curl -i`.
+Com um StreamBuffer, a saida vai sendo entregue em pedacos e `output` traz so o bloco [stderr].
+Os tempos por fase (nomes das variaveis -w do curl, ver timing.py) ficam em `control.timing`.
+"""
+
+import codecs
+import os
+import re
+import shlex
+import subprocess
+import threading
+import time
+
+from spans import Trace, span
+from spool import SpoolFile
+from timing import CURL_WRITE_OUT, parse_curl_timing
+from uploads import UploadBody, UploadError, curl_form_args, has_upload
+
+DEFAULT_TRANSPORT = "curl"
+READ_CHUNK = 64 * 1024
+STREAM_KEEP_LIMIT = 2 * 1024 * 1024  # copia mantida para formatar; acima disso vai para arquivo
+HEAD_SCAN_LIMIT = 64 * 1024
+EXIT_READ_ERROR = 26  # mesmo codigo do curl para arquivo de upload ilegivel
+ATTEMPTS_MARKER = "\n[tentativas]"  # bloco das tentativas de ResilientTransport (resilience.py)
+LINE_STREAM_TYPES = re.compile(
+    r"^content-type:\s*(text/event-stream|application/(x-)?ndjson|application/jsonl|application/json-seq)",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+class RequestControl:
+    """
+    Permite cancelar uma requisicao em andamento a partir de outra thread.
+    O transporte registra (attach) uma funcao que aborta o I/O corrente.
+    """
+
+    def __init__(self, timeout: float | None = None) -> None:
+        self.timeout = timeout
+        self.cancelled = threading.Event()
+        self.timed_out = False
+        self.error: str | None = None
+        self.timing: dict | None = None
+        self.cache_result: str | None = None
+        self.upload: UploadBody | None = None
+        self.attempts: list[dict] | None = None
+        self.trace: Trace | None = None  # tempos por etapa (spans.py), so quando a medicao esta ligada
+        self._abort = None
+        self._lock = threading.Lock()
+
+    def attach(self, abort) -> bool:
+        """
+        Registra o abortador; retorna False (e aborta na hora) se ja foi cancelado.
+        """
+        with self._lock:
+            self._abort = abort
+        if self.cancelled.is_set():
+            self._run_abort()
+            return False
+        return True
+
+    def detach(self) -> None:
+        with self._lock:
+            self._abort = None
+
+    def cancel(self) -> None:
+        self.cancelled.set()
+        self._run_abort()
+
+    def _run_abort(self) -> None:
+        with self._lock:
+            abort = self._abort
+        if abort is not None:
+            try:
+                abort()
+            except OSError:
+                pass
+
+
+class StreamBuffer:
+    """
+    Recebe a resposta em pedacos (na thread do transporte) e entrega em lotes para a UI.
+    Para SSE/NDJSON entrega so linhas completas. Mantem uma copia limitada para formatar ao final;
+    passando de keep_limit, a resposta inteira vai para um SpoolFile (se `spill`) e sai da memoria.
+    """
+
+    def __init__(self, keep_limit: int = STREAM_KEEP_LIMIT, spill: bool = True) -> None:
+        self.keep_limit = keep_limit
+        self.spill = spill
+        self.spool: SpoolFile | None = None
+        self.bytes_received = 0
+        self.started_at = time.monotonic()
+        self.first_byte_at: float | None = None
+        self.line_mode = False
+        self.status: int | None = None  # status final, lido do bloco de headers
+        self.truncated = False
+        self.finished = False
+        self.discarded = False
+        self._pending: list[str] = []
+        self._kept: list[str] = []
+        self._kept_size = 0
+        self._head_scan = ""
+        self._head_done = False
+        self._lock = threading.Lock()
+
+    def write(self, text: str, nbytes: int) -> None:
+        if not text and not nbytes:
+            return
+        with self._lock:
+            if self.first_byte_at is None:
+                self.first_byte_at = time.monotonic()
+            self.bytes_received += nbytes
+            if self.discarded:
+                return
+            if self.spool is not None:
+                self.spool.write(text.encode("utf-8"))
+                return
+            self._pending.append(text)
+            if not self.truncated:
+                if self._kept_size + len(text) <= self.keep_limit:
+                    self._kept.append(text)
+                    self._kept_size += len(text)
+                elif self.spill:
+                    self._spill(text)
+                    return
+                else:
+                    self.truncated = True
+                    self._kept = []
+            if not self._head_done:
+                self._scan_head(text)
+
+    def _spill(self, text: str) -> None:
+        self.spool = SpoolFile()
+        self._kept.append(text)
+        for piece in self._kept:
+            self.spool.write(piece.encode("utf-8"))
+        self.truncated = True
+        self._kept = []
+        self._pending = []
+        self._kept_size = 0
+
+    def append_text(self, text: str) -> None:
+        """
+        Acrescenta texto gerado localmente (ex.: bloco [stderr]) ao arquivo da resposta grande.
+        """
+        with self._lock:
+            if self.spool is not None:
+                self.spool.write(text.encode("utf-8"))
+
+    def replace_spool(self, spool) -> None:
+        """
+        Troca o arquivo da resposta grande (ex.: pela versao formatada) e apaga o anterior.
+        """
+        with self._lock:
+            old, self.spool = self.spool, spool
+        if old is not None and old is not spool:
+            old.close()
+
+    def close(self) -> None:
+        """
+        Descarta o conteudo (e o arquivo temporario); o que ainda chegar e ignorado.
+        """
+        with self._lock:
+            self.discarded = True
+            spool, self.spool = self.spool, None
+            self._pending = []
+            self._kept = []
+        if spool is not None:
+            spool.close()
+
+    def _scan_head(self, text: str) -> None:
+        # Procura o Content-Type no bloco de headers final (pula respostas 1xx).
+        self._head_scan += text
+        while not self._head_done:
+            end = self._head_scan.find("\r\n\r\n")
+            if end == -1:
+                if len(self._head_scan) > HEAD_SCAN_LIMIT:
+                    self._head_done = True
+                break
+            block = self._head_scan[:end]
+            self._head_scan = self._head_scan[end + 4 :]
+            if LINE_STREAM_TYPES.search(block):
+                self.line_mode = True
+            fields = block.split(None, 2)
+            if not (len(fields) >= 2 and fields[0].startswith("HTTP/") and fields[1].startswith("1")):
+                self._head_done = True
+                if len(fields) >= 2 and fields[1].isdigit():
+                    self.status = int(fields[1])
+        if self._head_done:
+            self._head_scan = ""
+
+    def finish(self) -> None:
+        with self._lock:
+            self.finished = True
+
+    def drain(self, max_chars: int | None = None) -> str:
+        """
+        Retira o texto pendente (ate max_chars); em modo linha, guarda a linha incompleta.
+        """
+        with self._lock:
+            if not self._pending:
+                return ""
+            text = "".join(self._pending)
+            self._pending = []
+            keep = ""
+            if max_chars is not None and len(text) > max_chars:
+                text, keep = text[:max_chars], text[max_chars:]
+            if self.line_mode and not self.finished:
+                cut = text.rfind("\n") + 1
+                text, keep = text[:cut], text[cut:] + keep
+            if keep:
+                self._pending.append(keep)
+            return text
+
+    def has_pending(self) -> bool:
+        with self._lock:
+            return bool(self._pending)
+
+    def text(self) -> str | None:
+        """
+        Resposta completa recebida, ou None se passou do limite guardado.
+        """
+        with self._lock:
+            return None if self.truncated else "".join(self._kept)
+
+    def speed(self) -> float:
+        """
+        Bytes por segundo desde o primeiro byte.
+        """
+        if self.first_byte_at is None:
+            return 0.0
+        elapsed = time.monotonic() - self.first_byte_at
+        return self.bytes_received / elapsed if elapsed > 0 else 0.0
+
+
+def build_curl_command(payload: dict, streaming: bool = False, upload: UploadBody | None = None) -> list[str]:
+    """
+    Sem `upload`, o comando equivalente para exibir/copiar (`--data-binary @arquivo`, `-F`). Com `upload`,
+    o body vem pelo stdin (`-T -`) com Content-Length fixo, sem chunked, e o progresso pode ser medido.
+    """
+    cmd_parts = ["curl", "-i", "-X", payload["method"]]
+    if streaming:
+        cmd_parts.append("-N")  # sem buffer de saida: SSE/chunked chegam na hora
+    headers = upload.headers(payload["headers"]) if upload is not None else payload["headers"]
+    for key, value in headers.items():
+        cmd_parts.extend(["-H", f"{key}: {value}"])
+    if upload is not None:
+        cmd_parts.extend(["-H", "Transfer-Encoding:", "-T", "-"])
+    elif payload.get("body_file"):
+        cmd_parts.extend(["--data-binary", "@" + payload["body_file"]])
+    elif payload.get("form"):
+        cmd_parts.extend(curl_form_args(payload["form"]))
+    elif payload["body"]:
+        cmd_parts.extend(["--data-raw", payload["body"]])
+    if payload.get("compressed"):
+        cmd_parts.append("--compressed")
+    cmd_parts.append(payload["url"])
+    return cmd_parts
+
+
+def format_command(cmd_parts: list[str]) -> str:
+    return " ".join(shlex.quote(part) for part in cmd_parts)
+
+
+class CurlTransport:
+    name = "curl"
+
+    def close(self) -> None:
+        pass
+
+    def describe(self, payload: dict) -> str:
+        return format_command(build_curl_command(payload, streaming=True))
+
+    def execute(
+        self,
+        payload: dict,
+        control: RequestControl | None = None,
+        sink: StreamBuffer | None = None,
+    ) -> tuple[str, str, int]:
+        control = control or RequestControl()
+        display_cmd = format_command(build_curl_command(payload, streaming=sink is not None))
+        upload = None
+        if has_upload(payload):
+            try:
+                upload = control.upload = UploadBody(payload)
+            except UploadError as exc:
+                return display_cmd, f"\n[stderr]\n{exc}\n", EXIT_READ_ERROR
+        cmd_parts = build_curl_command(payload, streaming=sink is not None, upload=upload)
+
+        stdin_read = stdin_write = None
+        if upload is not None:
+            stdin_read, stdin_write = os.pipe()
+        try:
+            with span(control.trace, "spawn"):
+                process = subprocess.Popen(
+                    cmd_parts + ["-w", CURL_WRITE_OUT],
+                    stdin=stdin_read,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=sink is None,
+                    bufsize=0 if sink is not None else -1,
+                )
+        except FileNotFoundError:
+            msg = "curl nao encontrado no sistema."
+            control.error = msg
+            if upload is not None:
+                os.close(stdin_write)
+            return display_cmd, msg, 1
+        finally:
+            if stdin_read is not None:
+                os.close(stdin_read)
+        upload_errors: list[str] = []
+        feeder = None
+        if upload is not None:
+            feeder = threading.Thread(
+                target=self._feed, args=(process, upload, stdin_write, upload_errors), name="curl-upload", daemon=True
+            )
+            feeder.start()
+
+        def _kill() -> None:
+            if process.poll() is None:
+                process.kill()
+
+        if not control.attach(_kill):
+            process.communicate()
+            return display_cmd, "Requisicao cancelada.", process.returncode
+
+        if sink is not None:
+            trailer = self._stream(process, control, sink)
+            if feeder is not None:
+                feeder.join()
+                if upload_errors:
+                    trailer = (trailer or "\n[stderr]\n") + "".join(upload_errors)
+            record_decoded_size(payload, control.timing, sink.bytes_received)
+            return display_cmd, trailer, EXIT_READ_ERROR if upload_errors else process.returncode
+
+        try:
+            stdout, stderr = process.communicate(timeout=control.timeout)
+        except subprocess.TimeoutExpired:
+            control.timed_out = True
+            process.kill()
+            stdout, stderr = process.communicate()
+            stderr += f"Tempo limite de {control.timeout:g}s excedido; processo encerrado.\n"
+        finally:
+            control.detach()
+            if feeder is not None:
+                feeder.join()
+
+        control.timing, stderr = parse_curl_timing(stderr)
+        stderr += "".join(upload_errors)
+        # Em modo texto o \r dos headers some; devolve esses bytes para a conta bater com size_header.
+        head_end = stdout.find("\n\n")
+        lost = stdout.count("\n", 0, head_end + 2) if head_end != -1 else 0
+        record_decoded_size(payload, control.timing, len(stdout.encode("utf-8")) + lost)
+        if control.cancelled.is_set() and not control.timed_out:
+            stderr += "Requisicao cancelada pelo usuario.\n"
+        output = stdout
+        if stderr:
+            output += "\n[stderr]\n" + stderr
+        return display_cmd, output, EXIT_READ_ERROR if upload_errors else process.returncode
+
+    def _feed(self, process: subprocess.Popen, upload: UploadBody, fd: int, errors: list[str]) -> None:
+        """
+        Escreve o body no stdin do curl (thread propria); um arquivo ilegivel encerra o curl, que de outra
+        forma ficaria esperando o resto do Content-Length.
+        """
+        pipe = open(fd, "wb")
+        try:
+            for chunk in upload.chunks():
+                pipe.write(chunk)
+        except UploadError as exc:
+            errors.append(f"{exc}\n")
+            if process.poll() is None:
+                process.kill()
+        except OSError:
+            pass  # curl encerrou antes (erro, timeout ou cancelamento); o codigo de saida dele explica
+        finally:
+            try:
+                pipe.close()
+            except OSError:
+                pass
+
+    def _stream(self, process: subprocess.Popen, control: RequestControl, sink: StreamBuffer) -> str:
+        """
+        Le stdout em pedacos para o sink; stderr vai para uma thread propria (evita travar o pipe).
+        """
+        stderr_chunks: list[bytes] = []
+        stderr_thread = threading.Thread(
+            target=lambda: stderr_chunks.append(process.stderr.read()), name="curl-stderr", daemon=True
+        )
+        stderr_thread.start()
+
+        def _expire() -> None:
+            if process.poll() is None:
+                control.timed_out = True
+                process.kill()
+
+        timer = threading.Timer(control.timeout, _expire) if control.timeout else None
+        if timer is not None:
+            timer.daemon = True
+            timer.start()
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        try:
+            while True:
+                chunk = process.stdout.read(READ_CHUNK)
+                if not chunk:
+                    break
+                sink.write(decoder.decode(chunk), len(chunk))
+            sink.write(decoder.decode(b"", final=True), 0)
+            process.wait()
+            stderr_thread.join()
+        finally:
+            if timer is not None:
+                timer.cancel()
+            control.detach()
+
+        stderr = b"".join(stderr_chunks).decode("utf-8", errors="replace")
+        control.timing, stderr = parse_curl_timing(stderr)
+        if control.timed_out:
+            stderr += f"Tempo limite de {control.timeout:g}s excedido; processo encerrado.\n"
+        elif control.cancelled.is_set():
+            stderr += "Requisicao cancelada pelo usuario.\n"
+        return "\n[stderr]\n" + stderr if stderr else ""
+
+
+def record_decoded_size(payload: dict, timing: dict | None, output_bytes: int) -> None:
+    """
+    Com --compressed, size_download e o tamanho na rede; o decodificado e a saida menos os headers.
+    """
+    if timing is not None and payload.get("compressed"):
+        timing["size_decoded"] = float(max(0, output_bytes - int(timing.get("size_header", 0))))
+
+
+def response_status(output: str) -> int | None:
+    """
+    Status HTTP final de uma saida no formato `curl -i` (ignora respostas 1xx intermediarias).
+    """
+    status = None
+    pos = 0
+    while output.startswith("HTTP/", pos):
+        line_end = output.find("\n", pos)
+        status_line = output[pos:] if line_end == -1 else output[pos:line_end]
+        fields = status_line.split(None, 2)
+        if len(fields) < 2 or not fields[1].isdigit():
+            break
+        status = int(fields[1])
+        if not 100 <= status < 200:
+            break
+        # Pula o bloco de headers da resposta 1xx (CRLF, ou so LF na saida de texto do curl).
+        block_end = output.find("\r\n\r\n", pos)
+        if block_end != -1:
+            pos = block_end + 4
+            continue
+        block_end = output.find("\n\n", pos)
+        if block_end == -1:
+            break
+        pos = block_end + 2
+    return status
+
+
+TRANSPORTS = ("curl", "http.client")
+_shared: dict = {}
+_shared_lock = threading.Lock()
+
+
+def get_transport(name: str | None):
+    """
+    Instancia compartilhada do transporte (a engine http.client so e importada quando usada).
+    """
+    name = name if name in TRANSPORTS else DEFAULT_TRANSPORT
+    with _shared_lock:
+        transport = _shared.get(name)
+        if transport is None:
+            transport = _shared[name] = create_transport(name)
+    return transport
+
+
+def create_transport(name: str | None, max_idle_per_host: int | None = None):
+    """
+    Instancia nova (com pool proprio), para quem nao deve dividir conexoes com a UI.
+    Vem envolvida em ResilientTransport: a politica de repeticao/hedge do endpoint vale em todo lugar.
+    """
+    from resilience import ResilientTransport
+
+    if name == "http.client":
+        from httpclient import POOL_MAX_IDLE_PER_HOST, ConnectionPool, HttpClientTransport
+
+        return ResilientTransport(HttpClientTransport(ConnectionPool(max_idle_per_host or POOL_MAX_IDLE_PER_HOST)))
+    return ResilientTransport(CurlTransport())
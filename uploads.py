@@ -0,0 +1,195 @@
+"""
+Bodies lidos do disco: um arquivo enviado como esta (`body_file`) ou um formulario multipart (`form`).
+O corpo e gerado em pedacos a partir do disco, nunca inteiro em memoria; o tamanho total e calculado
+antes do envio para ir como Content-Length. Os dois motores usam o mesmo gerador (o curl recebe pelo stdin).
+"""
+
+import mimetypes
+import os
+import secrets
+import threading
+import time
+
+UPLOAD_CHUNK = 256 * 1024
+FORM_FILE_PREFIX = "@"
+
+
+class UploadError(Exception):
+    """
+    Arquivo do body ausente ou ilegivel (separado de OSError para nao ser confundido com erro de rede).
+    """
+
+
+def has_upload(payload: dict) -> bool:
+    return bool(payload.get("body_file") or payload.get("form"))
+
+
+def parse_form(text: str) -> list[dict]:
+    """
+    Uma parte por linha, na sintaxe do `curl -F`: `campo=valor` ou `campo=@arquivo[;type=tipo/mime]`.
+    """
+    parts = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        name, sep, value = line.partition("=")
+        name = name.strip()
+        if not sep or not name:
+            raise ValueError(f"Linha de multipart invalida (use campo=valor ou campo=@arquivo): {line}")
+        if not value.startswith(FORM_FILE_PREFIX):
+            parts.append({"name": name, "value": value})
+            continue
+        path, _, options = value[1:].partition(";type=")
+        if not path.strip():
+            raise ValueError(f"Informe o arquivo da parte {name}.")
+        part = {"name": name, "file": path.strip()}
+        if options.strip():
+            part["type"] = options.strip()
+        parts.append(part)
+    return parts
+
+
+def form_to_text(form: list[dict]) -> str:
+    lines = []
+    for part in form:
+        if "file" in part:
+            line = f"{part['name']}={FORM_FILE_PREFIX}{part['file']}"
+            if part.get("type"):
+                line += f";type={part['type']}"
+        else:
+            line = f"{part['name']}={part['value']}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def curl_form_args(form: list[dict]) -> list[str]:
+    """
+    Argumentos `-F`/`--form-string` equivalentes (para exibir o comando e para o lote do curl).
+    """
+    args = []
+    for part in form:
+        if "file" in part:
+            value = f"{part['name']}=@{part['file']}"
+            if part.get("type"):
+                value += f";type={part['type']}"
+            args.extend(["-F", value])
+        else:
+            args.extend(["--form-string", f"{part['name']}={part['value']}"])
+    return args
+
+
+class UploadProgress:
+    """
+    Bytes ja entregues ao transporte; atualizado pela thread do envio e lido pela UI.
+    """
+
+    def __init__(self, total: int) -> None:
+        self.total = total
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.sent = 0
+            self.started_at = time.monotonic()
+            self.finished_at = None
+
+    def add(self, nbytes: int) -> None:
+        with self._lock:
+            self.sent += nbytes
+            if self.sent >= self.total:
+                self.finished_at = time.monotonic()
+
+    def speed(self) -> float:
+        """
+        Bytes por segundo desde o inicio do envio.
+        """
+        end = self.finished_at or time.monotonic()
+        elapsed = end - self.started_at
+        return self.sent / elapsed if elapsed > 0 else 0.0
+
+
+def _quote_field(value: str) -> str:
+    # Mesmo escape dos navegadores para nomes em Content-Disposition.
+    return value.replace('"', "%22").replace("\r", "%0D").replace("\n", "%0A")
+
+
+class UploadBody:
+    """
+    Corpo de um payload com `body_file` ou `form`. Levanta UploadError se algum arquivo nao puder ser lido.
+    """
+
+    def __init__(self, payload: dict) -> None:
+        try:
+            self._build(payload)
+        except OSError as exc:
+            raise UploadError(f"Arquivo do body inacessivel: {exc}") from None
+        self.progress = UploadProgress(self.length)
+
+    def _build(self, payload: dict) -> None:
+        # Lista de pedacos: bytes fixos ou (caminho, tamanho) lidos do disco na hora do envio.
+        self._pieces: list[bytes | tuple[str, int]] = []
+        if payload.get("body_file"):
+            path = os.path.expanduser(payload["body_file"])
+            self._pieces.append((path, os.path.getsize(path)))
+            self.content_type = None
+        else:
+            boundary = "----EndpointTester" + secrets.token_hex(12)
+            self.content_type = f"multipart/form-data; boundary={boundary}"
+            for part in payload["form"]:
+                disposition = f'form-data; name="{_quote_field(part["name"])}"'
+                if "file" in part:
+                    path = os.path.expanduser(part["file"])
+                    size = os.path.getsize(path)
+                    filename = _quote_field(os.path.basename(path))
+                    mime = part.get("type") or mimetypes.guess_type(path)[0] or "application/octet-stream"
+                    head = f'--{boundary}\r\nContent-Disposition: {disposition}; filename="{filename}"\r\n'
+                    head += f"Content-Type: {mime}\r\n\r\n"
+                    self._pieces.extend([head.encode("utf-8"), (path, size), b"\r\n"])
+                else:
+                    head = f"--{boundary}\r\nContent-Disposition: {disposition}\r\n\r\n"
+                    self._pieces.append(head.encode("utf-8") + part["value"].encode("utf-8") + b"\r\n")
+            self._pieces.append(f"--{boundary}--\r\n".encode("ascii"))
+        self.length = sum(piece[1] if isinstance(piece, tuple) else len(piece) for piece in self._pieces)
+
+    def chunks(self, deadline: float | None = None):
+        """
+        Gera o corpo em pedacos de ate UPLOAD_CHUNK, contando o progresso; pode ser chamado de novo
+        (nova tentativa), recomecando do zero.
+        """
+        progress = self.progress
+        progress.reset()
+        for piece in self._pieces:
+            if isinstance(piece, bytes):
+                progress.add(len(piece))
+                yield piece
+                continue
+            path, remaining = piece
+            try:
+                f = open(path, "rb")
+            except OSError as exc:
+                raise UploadError(f"Arquivo do body inacessivel: {exc}") from None
+            with f:
+                while remaining > 0:
+                    if deadline is not None and time.monotonic() > deadline:
+                        raise TimeoutError("tempo limite excedido durante o envio")
+                    try:
+                        chunk = f.read(min(UPLOAD_CHUNK, remaining))
+                    except OSError as exc:
+                        raise UploadError(f"Falha ao ler {path}: {exc}") from None
+                    if not chunk:
+                        raise UploadError(f"{path} diminuiu durante o envio")
+                    remaining -= len(chunk)
+                    progress.add(len(chunk))
+                    yield chunk
+
+    def headers(self, user_headers: dict) -> dict:
+        """
+        Headers do usuario mais Content-Length (sempre o calculado) e o Content-Type do multipart,
+        se o usuario nao informou outro.
+        """
+        headers = {key: value for key, value in user_headers.items() if key.lower() != "content-length"}
+        headers["Content-Length"] = str(self.length)
+        if self.content_type is not None and not any(key.lower() == "content-type" for key in headers):
+            headers["Content-Type"] = self.content_type
+        return headers